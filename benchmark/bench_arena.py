@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# Memory and collector time of a large program held as node objects versus
+# as an arena, and the cost of converting between the two.
+
+import gc
+import time
+import tracemalloc
+from typing import Callable
+
+from harness import best_of, report
+
+from lox_arena import Arena
+from lox_bytes_scanner import BytesScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+
+FUNCTION = """
+fun f{n}(a, b) {{
+    var total = 0;
+    for (var i = 0; i < a; i = i + 1) {{
+        if (i / 2 > b or i == 3) total = total + i * b - 1;
+        else total = total - f{n}(i, b - 1);
+    }}
+    return total;
+}}
+print f{n}(10, 2);
+"""
+
+SOURCE = "".join(FUNCTION.format(n=n) for n in range(10000)).encode("utf-8")
+
+
+def allocated(build: Callable[[], object]) -> int:
+    # Bytes still allocated after build() returns whatever it keeps.
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def collect() -> float:
+    start = time.process_time()
+    gc.collect()
+    return time.process_time() - start
+
+
+if __name__ == "__main__":
+    resolver = Resolver()
+    statements = Parser(BytesScanner(SOURCE).iter_tokens(), resolver=resolver).parse()
+    arena = Arena.from_statements(statements)
+    print(f"{len(arena)} nodes, {len(arena.token_types)} tokens")
+
+    tree = allocated(lambda: Arena.from_statements(statements).statements())
+    flat = allocated(lambda: Arena.from_statements(statements))
+    print(f"{'object tree':<32} {tree / 2**20:10.1f} MiB")
+    print(f"{'arena':<32} {flat / 2**20:10.1f} MiB  {tree / flat:5.2f}x")
+
+    del statements
+    gc.collect()
+    full = best_of(5, collect)
+    trees = arena.statements()
+    with_tree = best_of(5, collect)
+    del trees
+    report("full collection, arena", full)
+    report("full collection, tree", with_tree)
+
+    report(
+        "tree -> arena", best_of(3, lambda: Arena.from_statements(arena.statements()))
+    )
+    report("arena -> tree", best_of(3, arena.statements))
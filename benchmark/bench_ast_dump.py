@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# Dumping the AST of a large program: time should grow linearly with the
+# number of nodes, and memory not at all.
+
+import os
+import tracemalloc
+
+from harness import best_of, report
+
+from lox_ast_printer import AstPrinter
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+import lox_stmt as STMT
+
+# One long expression per statement, so that subtrees are large.
+STATEMENT = "print " + " + ".join(f"(a{n} * {n} - -b)" for n in range(200)) + ";\n"
+
+
+def dump(statements: list[STMT.Stmt], format: str) -> None:
+    with open(os.devnull, "w", encoding="utf-8") as f:
+        AstPrinter(format).write(statements, f)
+
+
+if __name__ == "__main__":
+    for format in AstPrinter.FORMATS:
+        for count in [250, 1000]:
+            statements = Parser(RegexScanner(STATEMENT * count).iter_tokens()).parse()
+            report(
+                f"{format}, {count} statements",
+                best_of(3, lambda: dump(statements, format)),
+            )
+            tracemalloc.start()
+            dump(statements, format)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{'  peak extra memory':<32} {peak / 1024:10.1f} KiB")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# Front end of a large script: scan, parse and resolve from source versus
+# loading the cached program.
+
+import os
+import tempfile
+
+from harness import best_of, report
+
+from lox_bytes_scanner import BytesScanner
+from lox_cache import Program, ProgramCache
+from lox_parser import Parser
+from lox_resolver import Resolver
+
+FUNCTION = """
+fun f{n}(a, b) {{
+    var total = 0;
+    var i = 0;
+    while (i < a) {{
+        if (i / 2 > b or i == 3) total = total + i * b - 1;
+        else total = total - f{n}(i, b - 1);
+        i = i + 1;
+    }}
+    return total;
+}}
+print f{n}(10, 2);
+"""
+
+SOURCE = "".join(FUNCTION.format(n=n) for n in range(5000)).encode("utf-8")
+
+
+def front_end() -> Program:
+    statements = Parser(BytesScanner(SOURCE).iter_tokens()).parse()
+    Resolver().resolve_statements(statements)
+    return statements
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "large.lox")
+        with open(path, "wb") as f:
+            f.write(SOURCE)
+        cache = ProgramCache(path)
+        cache.store(SOURCE, front_end())
+
+        size = os.path.getsize(path + "c")
+        print(f"{len(SOURCE) // 1024} KiB source, {size // 1024} KiB cache")
+        cold = best_of(5, front_end)
+        report("scan + parse + resolve", cold)
+        report("load cache", best_of(5, lambda: cache.load(SOURCE)), cold)
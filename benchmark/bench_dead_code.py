@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# A generated-looking function with dead branches and unread locals, called
+# in a loop.
+
+import contextlib
+import io
+
+from harness import best_of, report
+
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_interpreter import Interpreter
+from lox_constant_folder import ConstantFolder
+from lox_dead_code import DeadCodeEliminator
+
+SOURCE = """
+var DEBUG = false;
+fun step(n) {
+    var trace = "step";
+    var copy = trace;
+    if (false) { print trace; }
+    while (false) { print "never"; }
+    var scratch = 0;
+    scratch = n;
+    return n + 1;
+    print "unreachable";
+}
+var total = 0;
+for (var i = 0; i < 20000; i = i + 1) total = step(total);
+print total;
+"""
+
+
+def run(optimize: bool) -> None:
+    interpreter = Interpreter()
+    statements = Parser(RegexScanner(SOURCE).iter_tokens(), resolver=Resolver()).parse()
+    statements = ConstantFolder().fold(statements)
+    if optimize:
+        statements = DeadCodeEliminator().eliminate(statements)
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.interpret(statements)
+
+
+if __name__ == "__main__":
+    plain = best_of(5, lambda: run(False))
+    report("folded", plain)
+    report("folded + dead code removed", best_of(5, lambda: run(True)), plain)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# Deeply nested input: StackParser time per nesting level should stay flat as
+# the depth grows, where the recursive Parser gives up early.
+
+from typing import Callable
+
+from harness import best_of
+
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_stack_parser import StackParser
+
+SHAPES: dict[str, Callable[[int], str]] = {
+    "grouping": lambda depth: "(" * depth + "1" + ")" * depth + ";",
+    "unary": lambda depth: "-" * depth + "1;",
+    "blocks": lambda depth: "{" * depth + "print 1;" + "}" * depth,
+    "else if": lambda depth: "if (a) print 0;" + " else if (a) print 1;" * depth,
+    "assignment": lambda depth: "a = " * depth + "1;",
+}
+
+
+if __name__ == "__main__":
+    for name, shape in SHAPES.items():
+        for depth in (1_000, 10_000, 100_000):
+            tokens = RegexScanner(shape(depth)).scanTokens()
+            try:
+                Parser(tokens).parse()
+                recursive = "ok"
+            except RecursionError:
+                recursive = "RecursionError"
+            seconds = best_of(3, lambda: StackParser(tokens).parse())
+            print(
+                f"{name + ' ' + str(depth):<32} {seconds * 1000:10.1f} ms"
+                f" {seconds / depth * 1e6:7.2f} us/level  Parser: {recursive}"
+            )
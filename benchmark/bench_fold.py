@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# Constant expressions in a loop body, with and without folding.
+
+import contextlib
+import io
+
+from harness import best_of, report
+
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_interpreter import Interpreter
+from lox_constant_folder import ConstantFolder
+
+SOURCE = """
+var total = 0;
+for (var i = 0; i < 20000; i = i + 1) {
+    total = total + 60 * 60 * 24 - -(1) + (((2)));
+    if (!false and (1 < 2 or false)) total = total - (60 * 60 * 24);
+}
+print total;
+"""
+
+
+def run(fold: bool) -> None:
+    interpreter = Interpreter()
+    statements = Parser(RegexScanner(SOURCE).iter_tokens(), resolver=Resolver()).parse()
+    if fold:
+        ConstantFolder().fold(statements)
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.interpret(statements)
+
+
+if __name__ == "__main__":
+    plain = best_of(5, lambda: run(False))
+    report("unfolded", plain)
+    report("folded", best_of(5, lambda: run(True)), plain)
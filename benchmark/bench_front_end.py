@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# Parse then resolve, against resolving while parsing. Tokens are scanned up
+# front.
+
+from harness import best_of, report
+
+from lox_parser import Parser
+from lox_regex_scanner import RegexScanner
+from lox_resolver import Resolver
+from lox_token import Token
+
+SOURCE = """\
+fun f(a, b) {
+  var x = a * 2 + b;
+  for (var i = 0; i < x; i = i + 1) {
+    if (i > b) { x = x - i; } else { print x + i; }
+  }
+  return x;
+}
+""" * 5000
+
+
+def two_passes(tokens: list[Token]) -> None:
+    statements = Parser(tokens).parse()
+    Resolver().resolve_statements(statements)
+
+
+def one_pass(tokens: list[Token]) -> None:
+    Parser(tokens, resolver=Resolver()).parse()
+
+
+if __name__ == "__main__":
+    tokens = RegexScanner(SOURCE).scanTokens()
+    separate = best_of(5, lambda: two_passes(tokens))
+    report("parse, then resolve", separate)
+    report("resolve while parsing", best_of(5, lambda: one_pass(tokens)), separate)
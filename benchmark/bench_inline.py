@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# Tiny helper functions called from a loop.
+
+import contextlib
+import io
+
+from harness import best_of, report
+
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_interpreter import Interpreter
+from lox_constant_folder import ConstantFolder
+from lox_inliner import Inliner
+
+SOURCE = """
+var scale = 3;
+fun square(x) { return x * x; }
+fun scaled(x) { return x * scale; }
+fun clamp(x, limit) { return x < limit and x or limit; }
+var total = 0;
+for (var i = 0; i < 10000; i = i + 1) {
+    var s = square(i);
+    total = total + clamp(s, 1000) + scaled(i);
+}
+print total;
+"""
+
+
+def run(inline: bool) -> None:
+    interpreter = Interpreter()
+    statements = Parser(RegexScanner(SOURCE).iter_tokens(), resolver=Resolver()).parse()
+    statements = ConstantFolder().fold(statements)
+    if inline:
+        statements = ConstantFolder().fold(Inliner().inline(statements))
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.interpret(statements)
+
+
+if __name__ == "__main__":
+    plain = best_of(5, lambda: run(False))
+    report("folded", plain)
+    report("folded + inlined", best_of(5, lambda: run(True)), plain)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# Startup cost of a library of functions of which only one is called, with
+# eager and lazy parsing of function bodies.
+
+from harness import best_of, report
+
+from lox_interpreter import Interpreter
+from lox_parser import Parser
+from lox_regex_scanner import RegexScanner
+from lox_resolver import Resolver
+
+SOURCE = "".join(f"""\
+fun f{i}(a, b) {{
+  var x = a * 2 + b;
+  if (x > 10) {{ return x - 1; }} else {{ return x + 1; }}
+}}
+""" for i in range(5000)) + "print f1(1, 2);\n"
+
+
+# Scanning is the same either way, so it is left out.
+TOKENS = list(RegexScanner(SOURCE).iter_tokens())
+
+
+def run(lazy: bool) -> None:
+    interpreter = Interpreter()
+    statements = Parser(TOKENS, lazy).parse()
+    Resolver().resolve_statements(statements)
+    interpreter.interpret(statements)
+
+
+if __name__ == "__main__":
+    eager = best_of(5, lambda: run(False))
+    report("eager", eager)
+    report("lazy", best_of(5, lambda: run(True)), eager)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# Tight for loops: the loop machinery itself dominates.
+
+import contextlib
+import io
+
+from harness import best_of, report
+
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_interpreter import Interpreter
+
+PROGRAMS = {
+    "empty body": """
+        for (var i = 0; i < 100000; i = i + 1) {}
+    """,
+    "sum": """
+        var total = 0;
+        for (var i = 0; i < 50000; i = i + 1) total = total + i;
+        print total;
+    """,
+    "nested": """
+        var total = 0;
+        for (var i = 0; i < 300; i = i + 1)
+            for (var j = 0; j < 300; j = j + 1) total = total + 1;
+        print total;
+    """,
+}
+
+
+def run(source: str) -> None:
+    interpreter = Interpreter()
+    statements = Parser(RegexScanner(source).iter_tokens()).parse()
+    Resolver().resolve_statements(statements)
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.interpret(statements)
+
+
+if __name__ == "__main__":
+    for name, source in PROGRAMS.items():
+        report(name, best_of(3, lambda: run(source)))
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# Serial vs process-parallel parsing of a large generated script.
+
+import os
+import time
+
+from harness import best_of, report
+
+from lox_parallel_parser import ParallelParser
+from lox_parser import Parser
+from lox_regex_scanner import RegexScanner
+
+UNIT = """\
+fun f(a, b) {
+  var x = a * 2.5 + "a string"; // a comment
+  if (x > b) { return x; } else return b;
+}
+"""
+
+if __name__ == "__main__":
+    source = UNIT * 20_000
+    print(f"{len(source) >> 20} MB, {os.cpu_count()} CPUs")
+    serial = best_of(
+        3,
+        lambda: Parser(iter(RegexScanner(source).scan_buffer())).parse(),
+        time.perf_counter,
+    )
+    report("serial", serial)
+    for workers in (2, 4):
+        parallel = best_of(
+            3, lambda: ParallelParser(source, workers).parse(), time.perf_counter
+        )
+        report(f"{workers} workers", parallel, serial)
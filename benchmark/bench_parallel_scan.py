@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# Serial vs process-parallel scanning of a large generated script.
+
+import os
+import time
+
+from harness import best_of, report
+
+from lox_parallel_scanner import ParallelScanner
+from lox_regex_scanner import RegexScanner
+
+UNIT = """\
+fun f(a, b) {
+  var x = a * 2.5 + "a string"; // a comment
+  return x;
+}
+"""
+
+if __name__ == "__main__":
+    source = UNIT * 100_000
+    print(f"{len(source) >> 20} MB, {os.cpu_count()} CPUs")
+    serial = best_of(3, lambda: RegexScanner(source).scan_buffer(), time.perf_counter)
+    report("serial", serial)
+    for workers in (2, 4, 8):
+        parallel = best_of(
+            3,
+            lambda: ParallelScanner(source, workers).scan_buffer(),
+            time.perf_counter,
+        )
+        report(f"{workers} workers", parallel, serial)
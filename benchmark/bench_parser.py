@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# Expression-dense input: parse time only, tokens are scanned up front.
+
+from harness import best_of, report
+
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+
+PROGRAMS = {
+    "literals": 'print 1; print nil; print "s"; print true;\n' * 5000,
+    "arithmetic": "print a * (b + 1) - c / 2 >= d or !e and f == -g;\n" * 5000,
+    "calls": "f(a, g(b, 1), h(c)(d), 2 + 3);\n" * 5000,
+}
+
+
+if __name__ == "__main__":
+    for name, source in PROGRAMS.items():
+        tokens = RegexScanner(source).scanTokens()
+        report(name, best_of(7, lambda: Parser(tokens).parse()))
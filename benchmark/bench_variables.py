@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Variable-heavy loops: local and global reads and writes dominate.
+
+import contextlib
+import io
+
+from harness import best_of, report
+
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_interpreter import Interpreter
+
+PROGRAMS = {
+    "locals": """
+        fun work() {
+            var total = 0;
+            var alpha = 1;
+            var beta = 2;
+            var gamma = 3;
+            var i = 0;
+            while (i < 20000) {
+                total = total + alpha * beta - gamma;
+                alpha = beta;
+                beta = gamma;
+                gamma = alpha;
+                i = i + 1;
+            }
+            return total;
+        }
+        print work();
+    """,
+    "globals": """
+        var total = 0;
+        var alpha = 1;
+        var beta = 2;
+        var i = 0;
+        while (i < 20000) {
+            total = total + alpha * beta;
+            alpha = beta;
+            beta = alpha;
+            i = i + 1;
+        }
+        print total;
+    """,
+    "closures": """
+        fun outer() {
+            var count = 0;
+            var step = 1;
+            fun inner() {
+                count = count + step;
+                return count;
+            }
+            var i = 0;
+            while (i < 10000) {
+                inner();
+                i = i + 1;
+            }
+            return count;
+        }
+        print outer();
+    """,
+}
+
+
+def run(source: str) -> None:
+    statements = Parser(RegexScanner(source).iter_tokens()).parse()
+    interpreter = Interpreter()
+    Resolver().resolve_statements(statements)
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.interpret(statements)
+
+
+if __name__ == "__main__":
+    for name, source in PROGRAMS.items():
+        report(name, best_of(5, lambda: run(source)))
@@ -0,0 +1,30 @@
+import os
+import sys
+import time
+from typing import Callable
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pylox")
+)
+
+
+# CPU time is far less noisy than wall time on a shared machine; benchmarks
+# that spawn processes pass clock=time.perf_counter.
+def best_of(
+    repeat: int,
+    fn: Callable[[], object],
+    clock: Callable[[], float] = time.process_time,
+) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = clock()
+        fn()
+        best = min(best, clock() - start)
+    return best
+
+
+def report(name: str, seconds: float, baseline: float | None = None) -> None:
+    if baseline is None:
+        print(f"{name:<32} {seconds * 1000:10.1f} ms")
+    else:
+        print(f"{name:<32} {seconds * 1000:10.1f} ms  {baseline / seconds:5.2f}x")
@@ -0,0 +1,11 @@
+from typing import Generator
+
+import pytest
+from lox_error import LoxError
+
+
+@pytest.fixture(autouse=True)
+def clear_error() -> Generator[None, None, None]:
+    yield
+    LoxError.had_error = False
+    LoxError.had_runtime_error = False
@@ -1,50 +1,109 @@
 #!/usr/bin/env python3
 
+import argparse
+import mmap
+import os
 import sys
+from typing import Iterator, NoReturn, Optional, TextIO
 
 from lox_error import LoxError
 from lox_ast_printer import AstPrinter
-from lox_scanner import Scanner
+from lox_regex_scanner import RegexScanner
+from lox_bytes_scanner import BytesScanner
+from lox_parallel_parser import ParallelParser
+from lox_parallel_scanner import ParallelScanner
 from lox_parser import Parser
+from lox_stack_parser import StackParser
+from lox_stream_scanner import StreamScanner
 from lox_resolver import Resolver
+from lox_pass_manager import LEVELS, PassManager, verify
 from lox_interpreter import Interpreter
+from lox_cache import Program, ProgramCache, Source
+import lox_stmt as STMT
 
 # from lox_ast_printer import AstPrinter
 
 
+class ArgumentParser(argparse.ArgumentParser):
+    # Report usage errors with EX_USAGE like jlox does.
+    def error(self, message: str) -> NoReturn:
+        self.print_usage(sys.stderr)
+        print(f"{self.prog}: error: {message}", file=sys.stderr)
+        sys.exit(64)
+
+
 class Lox:
     interpreter = Interpreter()
+    jobs = 1
+    stack_parser = False
+    cache = True
+    lazy = False
+    # Format to dump the AST in before running, if any.
+    dump_ast: Optional[str] = None
+    passes = PassManager.for_level(2)
 
     @staticmethod
-    def __run(source: str) -> None:
-        scanner = Scanner(source)
-        tokens = scanner.scanTokens()
-
-        # print("Tokens:", *tokens, sep="\n")
+    def __run(source: Source) -> None:
+        program = Lox.__compile(source)
+        if program is not None:
+            Lox.__execute(program)
 
-        parser = Parser(tokens)
-        statements = parser.parse()
+    @staticmethod
+    def __compile(source: Source) -> Optional[Program]:
+        resolver = Resolver()
+        try:
+            statements = Lox.__parse(source, resolver)
+        except RecursionError:
+            LoxError.nesting_error(runtime=False)
+            return None
 
-        # Stop if there was a syntax error.
+        # Stop if there was a syntax or resolution error.
         if LoxError.had_error:
-            return
+            return None
 
-        resolver = Resolver(Lox.interpreter)
-        resolver.resolve_statements(statements)
-        if LoxError.had_error:
-            return
+        return statements
 
-        # Check expression is not none to avoid mypy error.
-        assert statements is not None
+    @staticmethod
+    def __parse(source: Source, resolver: Resolver) -> list[STMT.Stmt]:
+        # Parses and resolves.
+        parallel = Lox.jobs > 1 and not (Lox.stack_parser or Lox.lazy)
+        if isinstance(source, str) and parallel:
+            statements = ParallelParser(source, Lox.jobs).parse()
+        else:
+            if not isinstance(source, str):
+                tokens = BytesScanner(source).iter_tokens()
+            elif Lox.jobs > 1:
+                tokens = iter(ParallelScanner(source, Lox.jobs).scan_buffer())
+            else:
+                tokens = RegexScanner(source).iter_tokens()
+            if not Lox.stack_parser:
+                # Names are resolved while parsing, in a single pass.
+                return Parser(tokens, Lox.lazy, resolver).parse()
+            statements = StackParser(tokens).parse()
 
-        print("AST:")
-        print(AstPrinter().print(statements))
-        Lox.interpreter.interpret(statements)
+        # Resolve only if there was no syntax error.
+        if not LoxError.had_error:
+            resolver.resolve_statements(statements)
+        return statements
+
+    @staticmethod
+    def __execute(program: Program) -> None:
+        try:
+            statements = Lox.passes.run(program)
+            if Lox.dump_ast is not None:
+                AstPrinter(Lox.dump_ast).write(statements, sys.stdout)
+            Lox.interpreter.interpret(statements)
+        except RecursionError:
+            LoxError.nesting_error(runtime=True)
 
     @staticmethod
     def __run_file(path: str) -> None:
-        with open(path, encoding="utf-8") as f:
-            Lox.__run(f.read())
+        if Lox.jobs > 1:
+            # Worker processes are handed text chunks.
+            with open(path, encoding="utf-8") as f:
+                Lox.__run_cached(path, f.read())
+        else:
+            Lox.__run_mapped_file(path)
 
         # Indicate an error in the exit code.
         if LoxError.had_error:
@@ -52,6 +111,71 @@ class Lox:
         if LoxError.had_runtime_error:
             sys.exit(70)
 
+    @staticmethod
+    def __run_mapped_file(path: str) -> None:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                Lox.__run_cached(path, b"")
+            else:
+                # Scan the mapped file in place instead of reading and decoding
+                # it up front.
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+                    Lox.__run_cached(path, source)
+
+    @staticmethod
+    def __run_cached(path: str, source: Source) -> None:
+        # Unparsed function bodies keep resolver scopes keyed by the symbol
+        # ids of this process, so lazy runs are not cached.
+        if not Lox.cache or Lox.lazy:
+            Lox.__run(source)
+            return
+
+        cache = ProgramCache(path)
+        program = cache.load(source)
+        if program is None:
+            program = Lox.__compile(source)
+            if program is None:
+                return
+            cache.store(source, program)
+        Lox.__execute(program)
+
+    @staticmethod
+    def __run_stream(stream: TextIO) -> None:
+        # Runs each top-level statement as soon as it has been parsed and
+        # resolved (which takes the token after it, in case it is an 'else'),
+        # then drops it. After an error nothing more runs, but the rest of the
+        # input is still checked for syntax errors.
+        resolver = Resolver()
+        tokens = StreamScanner(Lox.__read_lines(stream)).iter_tokens()
+        parser = Parser(tokens, Lox.lazy, resolver)
+        try:
+            for statement in parser.declarations():
+                # Report resolver errors one statement at a time.
+                resolver.release_errors(not LoxError.had_error)
+                resolver.hold_errors()
+
+                failed = LoxError.had_error or LoxError.had_runtime_error
+                if statement is not None and not failed:
+                    Lox.__execute([statement])
+        except RecursionError:
+            # The parser cannot carry on after this.
+            LoxError.nesting_error(runtime=False)
+
+        if LoxError.had_error:
+            sys.exit(65)
+        if LoxError.had_runtime_error:
+            sys.exit(70)
+
+    @staticmethod
+    def __read_lines(stream: TextIO) -> Iterator[str]:
+        # Output is not held back while waiting for input.
+        while True:
+            sys.stdout.flush()
+            line = stream.readline()
+            if not line:
+                return
+            yield line
+
     @staticmethod
     def __run_prompt() -> None:
         while True:
@@ -65,13 +189,91 @@ class Lox:
 
     @staticmethod
     def main(argv: list[str]) -> None:
-        if len(argv) > 2:
-            print("Usage: main.py")
-            sys.exit(64)
-        elif len(argv) == 2:
-            Lox.__run_file(argv[1])
-        else:
-            Lox.__run_prompt()
+        parser = ArgumentParser(prog="lox.py")
+        parser.add_argument("script", nargs="?")
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            help="scan large scripts with this many processes",
+        )
+        parser.add_argument(
+            "--stack-parser",
+            action="store_true",
+            help="parse with an explicit stack instead of recursion (resolving, "
+            "optimizing and running still recurse)",
+        )
+        parser.add_argument(
+            "--no-cache",
+            dest="cache",
+            action="store_false",
+            help="do not read or write the compiled .loxc file next to the script",
+        )
+        parser.add_argument(
+            "--lazy",
+            action="store_true",
+            help="parse function bodies when they are first called",
+        )
+        parser.add_argument(
+            "--dump-ast",
+            choices=AstPrinter.FORMATS,
+            help="print each statement's syntax tree before running it",
+        )
+        parser.add_argument(
+            "-O",
+            dest="level",
+            type=int,
+            choices=sorted(LEVELS),
+            default=2,
+            help="optimization level: 0 runs the tree as parsed, 1 folds "
+            "constants, 2 also inlines small functions and removes dead code "
+            "(default)",
+        )
+        parser.add_argument(
+            "--time-passes",
+            action="store_true",
+            help="report the time spent in each optimization pass",
+        )
+        parser.add_argument(
+            "--verify-passes",
+            action="store_true",
+            help="check the syntax tree after each optimization pass",
+        )
+        parser.add_argument(
+            "--dump-passes",
+            action="store_true",
+            help="print the syntax tree after each optimization pass",
+        )
+        args = parser.parse_args(argv[1:])
+
+        Lox.jobs = args.jobs
+        Lox.stack_parser = args.stack_parser
+        Lox.cache = args.cache
+        Lox.lazy = args.lazy
+        Lox.dump_ast = args.dump_ast
+        Lox.passes = PassManager.for_level(args.level)
+        if args.verify_passes:
+            Lox.passes.add_hook(verify)
+        if args.dump_passes:
+            Lox.passes.add_hook(Lox.__dump_pass)
+
+        try:
+            if args.script is not None:
+                Lox.__run_file(args.script)
+            elif sys.stdin.isatty():
+                Lox.__run_prompt()
+            else:
+                # Piped input is one program, run as it arrives.
+                Lox.__run_stream(sys.stdin)
+        finally:
+            if args.time_passes:
+                Lox.passes.report(sys.stderr)
+
+    @staticmethod
+    def __dump_pass(name: str, statements: list[STMT.Stmt]) -> None:
+        print(f"== {name} ==")
+        AstPrinter(Lox.dump_ast or "sexpr").write(statements, sys.stdout)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,231 @@
+import typing
+from array import array
+from typing import Any, Callable, Generic, Optional, TypeVar, Union
+
+from lox_line_index import LineIndex
+from lox_token import Token, TokenType
+import lox_expr as EXPR
+import lox_stmt as STMT
+
+R = TypeVar("R")
+
+# How a field is stored in the operands column.
+_NODE, _NODES, _TOKEN, _TOKENS, _VALUE = range(5)
+
+
+def _field_kind(hint: Any) -> int:
+    if typing.get_origin(hint) is Union:
+        # Optional fields store -1 for None.
+        (hint,) = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+    if hint is Token:
+        return _TOKEN
+    if typing.get_origin(hint) is list:
+        (hint,) = typing.get_args(hint)
+        if hint is Token:
+            return _TOKENS
+        return _NODES if _is_node(hint) else _VALUE
+    return _NODE if _is_node(hint) else _VALUE
+
+
+def _is_node(hint: Any) -> bool:
+    return isinstance(hint, type) and issubclass(hint, (EXPR.Expr, STMT.Stmt))
+
+
+# Node classes by kind, and the fields of each one, taken from the generated
+# classes so that the layout follows tool/generate_ast.py. Depths have a
+# column of their own, and whether a loop is counted is worked out again when
+# it runs. The resolver scopes of a lazy body are kept in values, like any
+# other field that is not a node or a token.
+_UNSTORED = ("depth", "counted")
+KINDS: list[type[EXPR.Expr] | type[STMT.Stmt]] = (
+    EXPR.Expr.__subclasses__() + STMT.Stmt.__subclasses__()
+)
+_LAYOUTS: list[list[tuple[str, int]]] = []
+for _cls in KINDS:
+    _hints = typing.get_type_hints(_cls.__init__)
+    _LAYOUTS.append(
+        [
+            (name, _field_kind(_hints[name]))
+            for name in _cls.__slots__
+            if name not in _UNSTORED
+        ]
+    )
+_KIND_OF = {cls: kind for kind, cls in enumerate(KINDS)}
+
+
+class Arena:
+    # A program stored as parallel columns instead of a graph of node objects.
+    # Node i has kind kinds[i] and its fields start at operands[starts[i]], in
+    # the order of the node class's fields:
+    #
+    #   child node     index of the child, or -1 for None
+    #   list of nodes  length, then the indexes
+    #   token          index into the token columns
+    #   list of tokens length (or -1 for None), then the indexes
+    #   anything else  index into values
+    #
+    # A parent always comes before its children. depths holds the depth of
+    # Variable and Assign nodes, -1 for globals and other nodes.
+    def __init__(self) -> None:
+        self.kinds = array("B")
+        self.starts = array("i")
+        self.operands = array("i")
+        self.depths = array("i")
+        self.roots = array("i")
+        self.values: list[Any] = []
+
+        self.token_types = array("B")
+        self.token_names = array("i")
+        self.token_literals = array("i")
+        self.token_lines = array("i")
+        self.token_offsets = array("q")
+        self.token_indexes = array("i")
+        # Lexemes and line indexes, each stored once.
+        self.names: list[str] = []
+        self.line_indexes: list[LineIndex] = []
+
+        self.__tokens: list[Optional[Token]] = []
+
+    @staticmethod
+    def from_statements(statements: list[STMT.Stmt]) -> "Arena":
+        arena = Arena()
+        arena.__add(statements)
+        return arena
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def kind(self, node: int) -> type:
+        return KINDS[self.kinds[node]]
+
+    def token(self, index: int) -> Token:
+        token = self.__tokens[index]
+        if token is None:
+            literal = self.token_literals[index]
+            line_index = self.token_indexes[index]
+            token = self.__tokens[index] = Token(
+                TokenType(self.token_types[index]),
+                self.names[self.token_names[index]],
+                None if literal < 0 else self.values[literal],
+                self.token_lines[index],
+                self.token_offsets[index],
+                None if line_index < 0 else self.line_indexes[line_index],
+            )
+        return token
+
+    def statements(self) -> list[STMT.Stmt]:
+        # Children come after their parents, so building the nodes from the
+        # last one back always finds the children built.
+        nodes: list[Any] = [None] * len(self)
+        for node in range(len(self) - 1, -1, -1):
+            position = self.starts[node]
+            args: list[Any] = []
+            for _, field_kind in _LAYOUTS[self.kinds[node]]:
+                operand = self.operands[position]
+                position += 1
+                if field_kind == _NODE:
+                    args.append(None if operand < 0 else nodes[operand])
+                elif field_kind == _VALUE:
+                    args.append(self.values[operand])
+                elif field_kind == _TOKEN:
+                    args.append(self.token(operand))
+                elif operand < 0:
+                    args.append(None)
+                else:
+                    items = self.operands[position : position + operand]
+                    position += operand
+                    if field_kind == _NODES:
+                        args.append([nodes[item] for item in items])
+                    else:
+                        args.append([self.token(item) for item in items])
+            nodes[node] = KINDS[self.kinds[node]](*args)
+            if self.depths[node] >= 0:
+                nodes[node].depth = self.depths[node]
+        return [nodes[root] for root in self.roots]
+
+    def __add(self, roots: list[STMT.Stmt]) -> None:
+        token_ids: dict[Token, int] = {}
+        name_ids: dict[str, int] = {}
+        line_index_ids: dict[int, int] = {}
+
+        def add_token(token: Token) -> int:
+            index = token_ids.get(token)
+            if index is not None:
+                return index
+            _, (token_type, lexeme, literal, line, offset, lines) = token.__reduce__()
+            if lexeme not in name_ids:
+                name_ids[lexeme] = len(self.names)
+                self.names.append(lexeme)
+            if lines is not None and id(lines) not in line_index_ids:
+                line_index_ids[id(lines)] = len(self.line_indexes)
+                self.line_indexes.append(lines)
+            self.token_types.append(token_type.value)
+            self.token_names.append(name_ids[lexeme])
+            self.token_literals.append(-1 if literal is None else add_value(literal))
+            self.token_lines.append(line)
+            self.token_offsets.append(offset)
+            self.token_indexes.append(
+                -1 if lines is None else line_index_ids[id(lines)]
+            )
+            index = token_ids[token] = len(token_ids)
+            return index
+
+        def add_value(value: Any) -> int:
+            self.values.append(value)
+            return len(self.values) - 1
+
+        # Each node is stored when it is popped, with room left for its
+        # children, which are pushed with the position they fill in.
+        operands = self.operands
+        stack: list[tuple[int, Any]] = [(-1, root) for root in reversed(roots)]
+        while stack:
+            slot, node = stack.pop()
+            index = len(self.kinds)
+            if slot < 0:
+                self.roots.append(index)
+            else:
+                operands[slot] = index
+
+            kind = _KIND_OF[type(node)]
+            self.kinds.append(kind)
+            self.starts.append(len(operands))
+            self.depths.append(getattr(node, "depth", -1))
+            children: list[tuple[int, Any]] = []
+            for name, field_kind in _LAYOUTS[kind]:
+                value = getattr(node, name)
+                if field_kind == _VALUE:
+                    operands.append(add_value(value))
+                elif field_kind == _TOKEN:
+                    operands.append(add_token(value))
+                elif value is None:
+                    operands.append(-1)
+                elif field_kind == _NODE:
+                    children.append((len(operands), value))
+                    operands.append(0)
+                else:
+                    operands.append(len(value))
+                    for item in value:
+                        if field_kind == _TOKENS:
+                            operands.append(add_token(item))
+                        else:
+                            children.append((len(operands), item))
+                            operands.append(0)
+            stack.extend(reversed(children))
+
+        self.__tokens = [None] * len(self.token_types)
+
+
+class ArenaVisitor(Generic[R]):
+    # Dispatches on node indexes of an arena to visit methods named like
+    # those of EXPR.Visitor and STMT.Visitor.
+    def __init__(self, arena: Arena) -> None:
+        self.arena = arena
+        self.__visitors: list[Callable[[int], Any]] = []
+        for cls in KINDS:
+            base = cls.__mro__[1].__name__.lower()
+            self.__visitors.append(
+                getattr(self, f"visit_{cls.__name__.lower()}_{base}")
+            )
+
+    def visit(self, node: int) -> R:
+        return self.__visitors[self.arena.kinds[node]](node)
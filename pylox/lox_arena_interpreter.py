@@ -0,0 +1,328 @@
+from typing import Any
+
+from lox_error import LoxError
+from lox_runtime_error import LoxRuntimeError
+from lox_token import TokenType as TT
+from lox_arena import Arena, ArenaVisitor
+from lox_environment import Environment
+from lox_callable import LoxCallable, Clock
+from lox_return import ReturnException
+
+_BANG = TT.BANG.value
+_BANG_EQUAL = TT.BANG_EQUAL.value
+_EQUAL_EQUAL = TT.EQUAL_EQUAL.value
+_GREATER = TT.GREATER.value
+_GREATER_EQUAL = TT.GREATER_EQUAL.value
+_LESS = TT.LESS.value
+_LESS_EQUAL = TT.LESS_EQUAL.value
+_MINUS = TT.MINUS.value
+_OR = TT.OR.value
+_PLUS = TT.PLUS.value
+_SLASH = TT.SLASH.value
+_STAR = TT.STAR.value
+
+
+class ArenaFunction(LoxCallable):
+    def __init__(self, arena: Arena, declaration: int, closure: Environment) -> None:
+        start = arena.starts[declaration]
+        self.__name = arena.names[arena.token_names[arena.operands[start]]]
+        count = arena.operands[start + 1]
+        self.__params = [
+            arena.names[arena.token_names[param]]
+            for param in arena.operands[start + 2 : start + 2 + count]
+        ]
+        start += 2 + count
+        self.__body = arena.operands[start + 1 : start + 1 + arena.operands[start]]
+        self.__closure = closure
+        self.__declaration = declaration
+
+    @property
+    def declaration(self) -> int:
+        return self.__declaration
+
+    def arity(self) -> int:
+        return len(self.__params)
+
+    def call(self, interpreter: "ArenaInterpreter", arguments: list[Any]) -> Any:
+        environment = Environment(self.__closure)
+        for param, arg in zip(self.__params, arguments):
+            environment.define(param, arg)
+
+        try:
+            interpreter.execute_block(self.__body, environment)
+        except ReturnException as r:
+            return r.value
+
+        return None
+
+    def __str__(self) -> str:
+        return "<fn " + self.__name + ">"
+
+
+class ArenaInterpreter(ArenaVisitor[Any]):
+    # Runs a program stored in an arena, as Interpreter runs the node objects.
+    # Depths come from the arena rather than from resolve(). Functions must
+    # have been parsed; lazy bodies are not supported.
+    def __init__(self, arena: Arena) -> None:
+        super().__init__(arena)
+        self.__globals = Environment()
+        self.__environment = self.__globals
+        self.__starts = arena.starts
+        self.__operands = arena.operands
+        self.__depths = arena.depths
+        self.__values = arena.values
+        self.__token_types = arena.token_types
+
+        self.__globals.define("clock", Clock())
+
+    def interpret(self) -> None:
+        try:
+            for statement in self.arena.roots:
+                self.visit(statement)
+        except LoxRuntimeError as e:
+            LoxError.runtime_error(e)
+
+    def execute_block(self, statements: Any, environment: Environment) -> None:
+        previous = self.__environment
+
+        try:
+            self.__environment = environment
+
+            for statement in statements:
+                self.visit(statement)
+        finally:
+            self.__environment = previous
+
+    def __name(self, token: int) -> str:
+        return self.arena.names[self.arena.token_names[token]]
+
+    def visit_block_stmt(self, node: int) -> None:
+        start = self.__starts[node]
+        count = self.__operands[start]
+        self.execute_block(
+            self.__operands[start + 1 : start + 1 + count],
+            Environment(self.__environment),
+        )
+
+    def visit_expression_stmt(self, node: int) -> None:
+        self.visit(self.__operands[self.__starts[node]])
+
+    def visit_for_stmt(self, node: int) -> None:
+        start = self.__starts[node]
+        initializer, condition, increment, body = self.__operands[start : start + 4]
+
+        previous = self.__environment
+        try:
+            if initializer >= 0:
+                self.__environment = Environment(previous)
+                self.visit(initializer)
+            while condition < 0 or self.__is_truthy(self.visit(condition)):
+                self.visit(body)
+                if increment >= 0:
+                    self.visit(increment)
+        finally:
+            self.__environment = previous
+
+    def visit_function_stmt(self, node: int) -> None:
+        start = self.__starts[node]
+        name = self.__operands[start]
+        tokens = start + 2 + self.__operands[start + 1]
+        tokens += 1 + self.__operands[tokens]
+        if self.__operands[tokens] >= 0:
+            raise LoxRuntimeError(
+                self.arena.token(name), "Function body was not parsed."
+            )
+
+        function = ArenaFunction(self.arena, node, self.__environment)
+        self.__environment.define(self.__name(name), function)
+
+    def visit_if_stmt(self, node: int) -> None:
+        start = self.__starts[node]
+        condition, then_branch, else_branch = self.__operands[start : start + 3]
+        if self.__is_truthy(self.visit(condition)):
+            self.visit(then_branch)
+        elif else_branch >= 0:
+            self.visit(else_branch)
+
+    def visit_print_stmt(self, node: int) -> None:
+        value = self.visit(self.__operands[self.__starts[node]])
+        print(self.__stringify(value))
+
+    def visit_return_stmt(self, node: int) -> None:
+        expr = self.__operands[self.__starts[node] + 1]
+        value = None
+        if expr >= 0:
+            value = self.visit(expr)
+
+        raise ReturnException(value)
+
+    def visit_var_stmt(self, node: int) -> None:
+        start = self.__starts[node]
+        name, initializer = self.__operands[start : start + 2]
+        value = None
+        if initializer >= 0:
+            value = self.visit(initializer)
+
+        self.__environment.define(self.__name(name), value)
+
+    def visit_while_stmt(self, node: int) -> None:
+        start = self.__starts[node]
+        condition, body = self.__operands[start : start + 2]
+        while self.__is_truthy(self.visit(condition)):
+            self.visit(body)
+
+    def visit_assign_expr(self, node: int) -> Any:
+        start = self.__starts[node]
+        name, expr = self.__operands[start : start + 2]
+        value = self.visit(expr)
+        distance = self.__depths[node]
+        if distance >= 0:
+            self.__environment.assign_at(distance, self.arena.token(name), value)
+        else:
+            self.__globals.assign(self.arena.token(name), value)
+        return value
+
+    def visit_binary_expr(self, node: int) -> Any:
+        start = self.__starts[node]
+        left_node, operator, right_node = self.__operands[start : start + 3]
+        left = self.visit(left_node)
+        right = self.visit(right_node)
+        token_type = self.__token_types[operator]
+
+        if token_type == _BANG_EQUAL:
+            return not self.__is_equal(left, right)
+        if token_type == _EQUAL_EQUAL:
+            return self.__is_equal(left, right)
+
+        if token_type == _PLUS:
+            if isinstance(left, float) and isinstance(right, float):
+                return left + right
+            if isinstance(left, str) and isinstance(right, str):
+                return left + right
+            raise LoxRuntimeError(
+                self.arena.token(operator),
+                "Operands must be two numbers or two strings.",
+            )
+
+        if not (isinstance(left, float) and isinstance(right, float)):
+            raise LoxRuntimeError(
+                self.arena.token(operator), "Operands must be numbers."
+            )
+        if token_type == _GREATER:
+            return left > right
+        if token_type == _GREATER_EQUAL:
+            return left >= right
+        if token_type == _LESS:
+            return left < right
+        if token_type == _LESS_EQUAL:
+            return left <= right
+        if token_type == _MINUS:
+            return left - right
+        if token_type == _SLASH:
+            return left / right
+        if token_type == _STAR:
+            return left * right
+
+        # Unreachable.
+        return None
+
+    def visit_call_expr(self, node: int) -> Any:
+        start = self.__starts[node]
+        callee_node, paren, count = self.__operands[start : start + 3]
+        callee = self.visit(callee_node)
+
+        arguments: list[Any] = []
+        for argument in self.__operands[start + 3 : start + 3 + count]:
+            arguments.append(self.visit(argument))
+
+        if not isinstance(callee, LoxCallable):
+            raise LoxRuntimeError(
+                self.arena.token(paren), "Can only call functions and classes."
+            )
+
+        if len(arguments) != callee.arity():
+            raise LoxRuntimeError(
+                self.arena.token(paren),
+                f"Expected {callee.arity()} arguments but got {len(arguments)}.",
+            )
+
+        return callee.call(self, arguments)
+
+    def visit_grouping_expr(self, node: int) -> Any:
+        return self.visit(self.__operands[self.__starts[node]])
+
+    def visit_inline_expr(self, node: int) -> Any:
+        start = self.__starts[node]
+        call, declared, body = self.__operands[start : start + 3]
+        callee = self.visit(self.__operands[self.__starts[call]])
+        if (
+            isinstance(callee, ArenaFunction)
+            and self.__operands[self.__starts[callee.declaration]] == declared
+        ):
+            return self.visit(body)
+        return self.visit(call)
+
+    def visit_literal_expr(self, node: int) -> Any:
+        return self.__values[self.__operands[self.__starts[node]]]
+
+    def visit_logical_expr(self, node: int) -> Any:
+        start = self.__starts[node]
+        left_node, operator, right_node = self.__operands[start : start + 3]
+        left = self.visit(left_node)
+
+        if self.__token_types[operator] == _OR:
+            if self.__is_truthy(left):
+                return left
+        else:
+            if not self.__is_truthy(left):
+                return left
+
+        return self.visit(right_node)
+
+    def visit_unary_expr(self, node: int) -> Any:
+        start = self.__starts[node]
+        operator, right_node = self.__operands[start : start + 2]
+        right = self.visit(right_node)
+
+        if self.__token_types[operator] == _BANG:
+            return not self.__is_truthy(right)
+        if self.__token_types[operator] == _MINUS:
+            if not isinstance(right, float):
+                raise LoxRuntimeError(
+                    self.arena.token(operator), "Operand must be a number."
+                )
+            return -right
+
+        # Unreachable.
+        return None
+
+    def visit_variable_expr(self, node: int) -> Any:
+        name = self.__operands[self.__starts[node]]
+        distance = self.__depths[node]
+        if distance >= 0:
+            return self.__environment.get_at(distance, self.__name(name))
+        else:
+            return self.__globals.get(self.arena.token(name))
+
+    def __is_truthy(self, obj: Any) -> bool:
+        if obj is None:
+            return False
+        if isinstance(obj, bool):
+            return obj
+        return True
+
+    def __is_equal(self, a: Any, b: Any) -> bool:
+        # pylint: disable=unidiomatic-typecheck # cannot check by isinstance
+        return type(a) == type(b) and a == b
+
+    def __stringify(self, obj: Any) -> str:
+        if obj is None:
+            return "nil"
+        if isinstance(obj, bool):
+            return "true" if obj is True else "false"
+        if isinstance(obj, float):
+            text = str(obj)
+            if text.endswith(".0"):
+                text = text[:-2]
+            return text
+        return str(obj)
@@ -0,0 +1,73 @@
+import pytest
+from lox_error import LoxError
+from lox_scanner import Scanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_interpreter import Interpreter
+from lox_arena import Arena
+from lox_arena_interpreter import ArenaInterpreter
+from lox_inliner import Inliner
+import lox_interpreter_test
+
+
+@pytest.mark.parametrize(
+    "source, out_expected, err_expected, had_error, had_runtime_error",
+    [case for case in lox_interpreter_test.statements if not case[3]],
+)
+def test_statements(
+    source: str,
+    out_expected: str,
+    err_expected: str,
+    had_error: bool,
+    had_runtime_error: bool,
+    capfd: pytest.CaptureFixture[str],
+) -> None:
+    stmts = Parser(Scanner(source).scanTokens(), resolver=Resolver()).parse()
+    assert LoxError.had_error is False
+    ArenaInterpreter(Arena.from_statements(stmts)).interpret()
+
+    out, err = capfd.readouterr()
+    assert out.strip() == out_expected
+    assert err.strip().startswith(err_expected)
+    assert LoxError.had_runtime_error == had_runtime_error
+
+
+def test_same_as_interpreter(capfd: pytest.CaptureFixture[str]) -> None:
+    source = """
+    fun fib(n) { if (n < 2) return n; return fib(n - 2) + fib(n - 1); }
+    var counter = 0;
+    fun make() { var i = 0; fun inc() { i = i + 1; counter = counter + i; return i; } return inc; }
+    var c = make();
+    for (var i = 0; i < 10; i = i + 1) { c(); print fib(i); }
+    print counter; print c; print clock;
+    while (counter > 0) counter = counter - 7;
+    print counter or "none"; print nil and 1; print !counter;
+    """
+    interpreter = Interpreter()
+    stmts = Parser(Scanner(source).scanTokens(), resolver=Resolver()).parse()
+    interpreter.interpret(stmts)
+    expected = capfd.readouterr()
+
+    stmts = Parser(Scanner(source).scanTokens(), resolver=Resolver()).parse()
+    ArenaInterpreter(Arena.from_statements(stmts)).interpret()
+    assert capfd.readouterr() == expected
+
+
+def test_lazy_function(capfd: pytest.CaptureFixture[str]) -> None:
+    stmts = Parser(Scanner("fun f() { print 1; }").scanTokens(), lazy=True).parse()
+    ArenaInterpreter(Arena.from_statements(stmts)).interpret()
+    assert capfd.readouterr().err.strip() == "Function body was not parsed.\n[line 1:5]"
+    assert LoxError.had_runtime_error
+
+
+def test_inlined_calls(capfd: pytest.CaptureFixture[str]) -> None:
+    # After sq is declared again, as a later line in the prompt could, the
+    # call is made.
+    source = "fun sq(x) { return x * x; } fun f() { return sq(3); } print f();"
+    stmts = Inliner().inline(
+        Parser(Scanner(source).scanTokens(), resolver=Resolver()).parse()
+    )
+    source = "fun sq(x) { return x; } print f();"
+    stmts += Parser(Scanner(source).scanTokens(), resolver=Resolver()).parse()
+    ArenaInterpreter(Arena.from_statements(stmts)).interpret()
+    assert capfd.readouterr().out.split() == ["9", "3"]
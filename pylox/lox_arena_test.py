@@ -0,0 +1,114 @@
+from typing import Any, cast
+
+import pytest
+from lox_interpreter import Interpreter
+from lox_arena import Arena
+from lox_ast_printer import AstPrinter
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_stack_parser import StackParser
+from lox_stream_scanner import StreamScanner
+from lox_token import Token
+import lox_expr as EXPR
+import lox_stmt as STMT
+import lox_interpreter_test
+import lox_parser_test
+
+
+def fields(node: Any) -> list[tuple[Any, ...]]:
+    # Every token and depth under node, in the order of the fields.
+    found: list[tuple[Any, ...]] = []
+    stack: list[Any] = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(reversed(cast(list[Any], item)))
+        elif isinstance(item, (EXPR.Variable, EXPR.Assign)):
+            found.append((type(item).__name__, item.depth))
+        if isinstance(item, (EXPR.Expr, STMT.Stmt)):
+            stack.extend(getattr(item, name) for name in reversed(item.__slots__))
+        elif isinstance(item, Token):
+            found.append(
+                (item.token_type, item.lexeme, item.literal, item.line, item.column)
+            )
+    return found
+
+
+sources = [statement[0] for statement in lox_parser_test.statements] + [
+    statement[0] for statement in lox_interpreter_test.statements
+]
+
+
+@pytest.mark.parametrize("source", sources)
+@pytest.mark.parametrize("lazy", [False, True])
+def test_round_trip(source: str, lazy: bool) -> None:
+    resolver = Resolver()
+    statements = Parser(RegexScanner(source).iter_tokens(), lazy, resolver).parse()
+    actual = Arena.from_statements(statements).statements()
+    assert AstPrinter().print(actual) == AstPrinter().print(statements)
+    assert fields(actual) == fields(statements)
+
+
+def test_columns() -> None:
+    statements = Parser(RegexScanner("print 1 + a;").iter_tokens()).parse()
+    arena = Arena.from_statements(statements)
+    assert [arena.kind(node) for node in range(len(arena))] == [
+        STMT.Print,
+        EXPR.Binary,
+        EXPR.Literal,
+        EXPR.Variable,
+    ]
+    assert list(arena.roots) == [0]
+    assert list(arena.operands) == [1, 2, 0, 3, 0, 1]
+    assert arena.values == [1.0]
+    assert arena.names == ["+", "a"]
+    assert list(arena.depths) == [-1, -1, -1, -1]
+
+
+def test_shared_tokens() -> None:
+    # One token object per token, however many nodes refer to it.
+    token = RegexScanner("a").scan_buffer()[0]
+    statements: list[STMT.Stmt] = [
+        STMT.Expression(EXPR.Assign(token, EXPR.Variable(token)))
+    ]
+    arena = Arena.from_statements(statements)
+    assert len(arena.token_types) == 1
+    (statement,) = arena.statements()
+    assert isinstance(statement, STMT.Expression)
+    assign = statement.expression
+    assert isinstance(assign, EXPR.Assign) and isinstance(assign.value, EXPR.Variable)
+    assert assign.name is assign.value.name
+
+
+def test_stream_line_indexes() -> None:
+    lines = ["print a;\n", 'print "a\n', 'b" + a;\n', "print c;\n"]
+    statements = Parser(StreamScanner(lines).iter_tokens()).parse()
+    arena = Arena.from_statements(statements)
+    assert len(arena.line_indexes) == 3
+    assert fields(arena.statements()) == fields(statements)
+
+
+def test_deep_tree() -> None:
+    # Neither conversion recurses.
+    source = "print " + "(" * 50000 + "1" + ")" * 50000 + ";"
+    statements = StackParser(RegexScanner(source).iter_tokens()).parse()
+    arena = Arena.from_statements(statements)
+    assert len(arena) == 50002
+    (statement,) = arena.statements()
+    assert isinstance(statement, STMT.Print)
+    expr = statement.expression
+    for _ in range(50000):
+        assert isinstance(expr, EXPR.Grouping)
+        expr = expr.expression
+    assert isinstance(expr, EXPR.Literal) and expr.value == 1.0
+
+
+def test_lazy_program(capfd: pytest.CaptureFixture[str]) -> None:
+    # Lazy bodies keep their tokens and scopes, and run from the arena.
+    source = "var a = 1; fun f(x) { fun g() { return x + a; } return g(); } print f(2);"
+    tokens = RegexScanner(source).iter_tokens()
+    statements = Parser(tokens, True, Resolver()).parse()
+    Interpreter().interpret(Arena.from_statements(statements).statements())
+    out, err = capfd.readouterr()
+    assert (out, err) == ("3\n", "")
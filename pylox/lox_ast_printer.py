@@ -1,72 +1,149 @@
+import io
+import json
+import sys
+from typing import Any, Iterable, Iterator, TextIO, cast
+
 from lox_token import Token, TokenType as TT
 import lox_expr as EXPR
 import lox_stmt as STMT
 
 
-class AstPrinter(EXPR.Visitor[str], STMT.Visitor[str]):
+class AstPrinter(EXPR.Visitor[Iterator[Any]], STMT.Visitor[Iterator[Any]]):
+    # Writes each statement on a line of its own, as an S-expression or as a
+    # JSON object. The output goes to the file piece by piece: each node is
+    # expanded into strings and child nodes, and a stack of the expansions
+    # under way replaces recursion.
+    FORMATS = ["sexpr", "json"]
+
+    def __init__(self, format: str = "sexpr") -> None:
+        self.__expand = self.__sexpr if format == "sexpr" else self.__json
+
     def print(self, stmts: list[STMT.Stmt]) -> list[str]:
-        return [stmt.accept(self) for stmt in stmts]
+        lines: list[str] = []
+        for stmt in stmts:
+            f = io.StringIO()
+            self.__write(stmt, f)
+            lines.append(f.getvalue())
+        return lines
+
+    def write(self, stmts: Iterable[STMT.Stmt], f: TextIO) -> None:
+        for stmt in stmts:
+            self.__write(stmt, f)
+            f.write("\n")
+
+    def __write(self, node: EXPR.Expr | STMT.Stmt, f: TextIO) -> None:
+        stack = [self.__expand(node)]
+        while stack:
+            piece = next(stack[-1], None)
+            if piece is None:
+                stack.pop()
+            elif isinstance(piece, str):
+                f.write(piece)
+            else:
+                stack.append(self.__expand(piece))
+
+    def __sexpr(self, node: EXPR.Expr | STMT.Stmt) -> Iterator[Any]:
+        if isinstance(node, EXPR.Expr):
+            return self.expr_visitors[type(node)](self, node)
+        return self.stmt_visitors[type(node)](self, node)
+
+    def __json(self, node: EXPR.Expr | STMT.Stmt) -> Iterator[Any]:
+        # The fields of the node class, with tokens as their lexemes.
+        yield f'{{"node": "{type(node).__name__}"'
+        for name in node.__slots__:
+            yield f', "{name}": '
+            value: Any = getattr(node, name)
+            if isinstance(value, list):
+                yield "["
+                for i, item in enumerate(cast(list[Any], value)):
+                    if i > 0:
+                        yield ", "
+                    if isinstance(item, Token):
+                        yield json.dumps(item.lexeme)
+                    elif isinstance(item, (EXPR.Expr, STMT.Stmt)):
+                        yield item
+                    else:
+                        yield json.dumps(item)
+                yield "]"
+            elif isinstance(value, (EXPR.Expr, STMT.Stmt)):
+                yield value
+            elif isinstance(value, Token):
+                yield json.dumps(value.lexeme)
+            else:
+                yield json.dumps(value)
+        yield "}"
 
-    def visit_block_stmt(self, stmt: STMT.Block) -> str:
+    def visit_block_stmt(self, stmt: STMT.Block) -> Iterator[Any]:
         return self.__parenthesize("block", *stmt.statements)
 
-    def visit_expression_stmt(self, stmt: STMT.Expression) -> str:
+    def visit_expression_stmt(self, stmt: STMT.Expression) -> Iterator[Any]:
         return self.__parenthesize("expr", stmt.expression)
 
-    def visit_function_stmt(self, stmt: STMT.Function) -> str:
+    def visit_for_stmt(self, stmt: STMT.For) -> Iterator[Any]:
+        return self.__parenthesize(
+            "for", stmt.initializer, stmt.condition, stmt.increment, stmt.body
+        )
+
+    def visit_function_stmt(self, stmt: STMT.Function) -> Iterator[Any]:
         return self.__parenthesize("function", stmt.name, *stmt.params, *stmt.body)
 
-    def visit_if_stmt(self, stmt: STMT.If) -> str:
+    def visit_if_stmt(self, stmt: STMT.If) -> Iterator[Any]:
         return self.__parenthesize(
             "if", stmt.condition, stmt.then_branch, stmt.else_branch
         )
 
-    def visit_print_stmt(self, stmt: STMT.Print) -> str:
+    def visit_print_stmt(self, stmt: STMT.Print) -> Iterator[Any]:
         return self.__parenthesize("print", stmt.expression)
 
-    def visit_return_stmt(self, stmt: STMT.Return) -> str:
+    def visit_return_stmt(self, stmt: STMT.Return) -> Iterator[Any]:
         return self.__parenthesize("return", stmt.value)
 
-    def visit_var_stmt(self, stmt: STMT.Var) -> str:
+    def visit_var_stmt(self, stmt: STMT.Var) -> Iterator[Any]:
         return self.__parenthesize("vardecl", stmt.name, stmt.initializer)
 
-    def visit_while_stmt(self, stmt: STMT.While) -> str:
+    def visit_while_stmt(self, stmt: STMT.While) -> Iterator[Any]:
         return self.__parenthesize("while", stmt.condition, stmt.body)
 
-    def visit_assign_expr(self, expr: EXPR.Assign) -> str:
+    def visit_assign_expr(self, expr: EXPR.Assign) -> Iterator[Any]:
         return self.__parenthesize("assign", expr.name, expr.value)
 
-    def visit_binary_expr(self, expr: EXPR.Binary) -> str:
+    def visit_binary_expr(self, expr: EXPR.Binary) -> Iterator[Any]:
         return self.__parenthesize(expr.operator.lexeme, expr.left, expr.right)
 
-    def visit_call_expr(self, expr: EXPR.Call) -> str:
+    def visit_call_expr(self, expr: EXPR.Call) -> Iterator[Any]:
         return self.__parenthesize("call", expr.callee, *expr.arguments)
 
-    def visit_grouping_expr(self, expr: EXPR.Grouping) -> str:
+    def visit_grouping_expr(self, expr: EXPR.Grouping) -> Iterator[Any]:
         return self.__parenthesize("group", expr.expression)
 
-    def visit_literal_expr(self, expr: EXPR.Literal) -> str:
-        return "nil" if expr.value is None else str(expr.value)
+    def visit_inline_expr(self, expr: EXPR.Inline) -> Iterator[Any]:
+        return self.__parenthesize("inline", expr.call, expr.body)
 
-    def visit_logical_expr(self, expr: EXPR.Logical) -> str:
+    def visit_literal_expr(self, expr: EXPR.Literal) -> Iterator[Any]:
+        return iter(["nil" if expr.value is None else str(expr.value)])
+
+    def visit_logical_expr(self, expr: EXPR.Logical) -> Iterator[Any]:
         return self.__parenthesize(expr.operator.lexeme, expr.left, expr.right)
 
-    def visit_unary_expr(self, expr: EXPR.Unary) -> str:
+    def visit_unary_expr(self, expr: EXPR.Unary) -> Iterator[Any]:
         return self.__parenthesize(expr.operator.lexeme, expr.right)
 
-    def visit_variable_expr(self, expr: EXPR.Variable) -> str:
-        return expr.name.lexeme
+    def visit_variable_expr(self, expr: EXPR.Variable) -> Iterator[Any]:
+        return iter([expr.name.lexeme])
 
-    def __parenthesize(self, name: str, *items: Token | EXPR.Expr | STMT.Stmt | None) -> str:
-        s = f"({name}"
+    def __parenthesize(
+        self, name: str, *items: Token | EXPR.Expr | STMT.Stmt | None
+    ) -> Iterator[Any]:
+        yield f"({name}"
         for item in items:
             if isinstance(item, Token):
-                s += " " + item.lexeme
+                yield " " + item.lexeme
+            elif item is None:
+                yield " nil"
             else:
-                s += " " + (item.accept(self) if item is not None else "nil")
-        s += ")"
-        return s
-
+                yield " "
+                yield item
+        yield ")"
 
 if __name__ == "__main__":
     statements: list[STMT.Stmt] = [
@@ -96,4 +173,5 @@ if __name__ == "__main__":
         ),
     ]
 
-    print(*AstPrinter().print(statements), sep="\n")
+    AstPrinter().write(statements, sys.stdout)
+    AstPrinter("json").write(statements, sys.stdout)
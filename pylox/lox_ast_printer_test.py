@@ -0,0 +1,82 @@
+import io
+import json
+
+import pytest
+from lox_ast_printer import AstPrinter
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_stack_parser import StackParser
+import lox_parser_test
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [(case[0], case[1]) for case in lox_parser_test.statements if not case[3]],
+)
+def test_write_sexpr(source: str, expected: list[str]) -> None:
+    statements = Parser(RegexScanner(source).iter_tokens()).parse()
+    f = io.StringIO()
+    AstPrinter().write(statements, f)
+    assert f.getvalue() == "".join(line + "\n" for line in expected)
+
+
+def test_write_json() -> None:
+    source = 'fun f(a) { return -a; } { var s = "a\\b"; } f(nil, true);'
+    statements = Parser(RegexScanner(source).iter_tokens()).parse()
+    f = io.StringIO()
+    AstPrinter("json").write(statements, f)
+    lines = f.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {
+            "node": "Function",
+            "name": "f",
+            "params": ["a"],
+            "body": [
+                {
+                    "node": "Return",
+                    "keyword": "return",
+                    "value": {
+                        "node": "Unary",
+                        "operator": "-",
+                        "right": {"node": "Variable", "name": "a", "depth": -1},
+                    },
+                }
+            ],
+            "tokens": None,
+            "scopes": None,
+        },
+        {
+            "node": "Block",
+            "statements": [
+                {
+                    "node": "Var",
+                    "name": "s",
+                    "initializer": {"node": "Literal", "value": "a\\b"},
+                }
+            ],
+        },
+        {
+            "node": "Expression",
+            "expression": {
+                "node": "Call",
+                "callee": {"node": "Variable", "name": "f", "depth": -1},
+                "paren": ")",
+                "arguments": [
+                    {"node": "Literal", "value": None},
+                    {"node": "Literal", "value": True},
+                ],
+            },
+        },
+    ]
+
+
+@pytest.mark.parametrize("format", AstPrinter.FORMATS)
+def test_deep_tree(format: str) -> None:
+    source = "print " + "-" * 50000 + "1;"
+    statements = StackParser(RegexScanner(source).iter_tokens()).parse()
+    f = io.StringIO()
+    AstPrinter(format).write(statements, f)
+    if format == "sexpr":
+        assert f.getvalue() == "(print " + "(- " * 50000 + "1.0" + ")" * 50001 + "\n"
+    else:
+        assert f.getvalue().count('"Unary"') == 50000
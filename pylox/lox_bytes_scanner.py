@@ -0,0 +1,109 @@
+import mmap
+import re
+from typing import Iterator
+
+from lox_error import LoxError
+from lox_line_index import LineIndex
+from lox_regex_scanner import RegexScanner
+from lox_token import KEYWORDS, Token, TokenType as TT
+
+
+class BytesScanner:
+    # Same lexical grammar as RegexScanner, but matched directly against UTF-8
+    # bytes (bytes, memoryview or mmap), so the source is never decoded as a
+    # whole. Only identifiers and string literals are decoded, one token at a
+    # time. A run of word characters that contains a non-ASCII byte is decoded
+    # and handed to RegexScanner, which knows the Unicode rules.
+    __PATTERN = re.compile(
+        rb"""
+        (?:[ \r\t\n]|//[^\n]*)*
+        (?:
+              ([\w.]*+[\x80-\xff][\w.\x80-\xff]*)
+            | ([A-Za-z_]\w*)
+            | ([!=<>]=?|[(){},.\-+;*/])
+            | (\d+(?:\.\d+)?)
+            | ("[^"]*"?)
+            | (\Z)
+            | .
+        )
+        """,
+        re.VERBOSE,
+    )
+
+    __OPERATORS = {
+        b"(": TT.LEFT_PAREN,
+        b")": TT.RIGHT_PAREN,
+        b"{": TT.LEFT_BRACE,
+        b"}": TT.RIGHT_BRACE,
+        b",": TT.COMMA,
+        b".": TT.DOT,
+        b"-": TT.MINUS,
+        b"+": TT.PLUS,
+        b";": TT.SEMICOLON,
+        b"/": TT.SLASH,
+        b"*": TT.STAR,
+        b"!": TT.BANG,
+        b"!=": TT.BANG_EQUAL,
+        b"=": TT.EQUAL,
+        b"==": TT.EQUAL_EQUAL,
+        b">": TT.GREATER,
+        b">=": TT.GREATER_EQUAL,
+        b"<": TT.LESS,
+        b"<=": TT.LESS_EQUAL,
+    }
+
+    def __init__(self, source: bytes | memoryview | mmap.mmap) -> None:
+        self.__source = source
+        self.__lines = LineIndex(source)
+
+    def scanTokens(self) -> list[Token]:
+        return list(self.iter_tokens())
+
+    def iter_tokens(self) -> Iterator[Token]:
+        lines = self.__lines
+
+        for match in self.__PATTERN.finditer(self.__source):
+            unicode, identifier, operator, number, string, end = match.groups()
+
+            if identifier is not None:
+                text = identifier.decode("ascii")
+                token_type = KEYWORDS.get(text, TT.IDENTIFIER)
+                yield Token(token_type, text, None, 0, match.start(2), lines)
+            elif operator is not None:
+                text = operator.decode("ascii")
+                yield Token(
+                    self.__OPERATORS[operator], text, None, 0, match.start(3), lines
+                )
+            elif number is not None:
+                text = number.decode("ascii")
+                yield Token(TT.NUMBER, text, float(text), 0, match.start(4), lines)
+            elif string is not None:
+                if len(string) < 2 or string[-1] != ord('"'):
+                    self.__error(match.end(), "Unterminated string.")
+                else:
+                    text = string.decode("utf-8")
+                    # Trim the surrounding quotes.
+                    yield Token(TT.STRING, text, text[1:-1], 0, match.start(5), lines)
+            elif unicode is not None:
+                # The run holds no whitespace, so it stays on the current line.
+                # It is scanned with its own index positioned where it starts,
+                # and offsets are converted back from characters to bytes.
+                text = unicode.decode("utf-8")
+                run = match.start(1)
+                run_lines = LineIndex(text, lines.line(run), lines.column(run))
+                for token in RegexScanner(text, 0, run_lines).iter_tokens():
+                    if token.token_type != TT.EOF:
+                        prefix = text[: token.offset].encode("utf-8")
+                        token.locate(run + len(prefix), lines)
+                        yield token
+            elif end is not None:
+                break
+            else:
+                self.__error(match.end() - 1, "Unexpected character.")
+
+        yield Token(TT.EOF, "", None, 0, len(self.__source), lines)
+
+    def __error(self, offset: int, message: str) -> None:
+        LoxError.scan_error(
+            self.__lines.line(offset), message, self.__lines.column(offset)
+        )
@@ -0,0 +1,71 @@
+import mmap
+import random
+from pathlib import Path
+from typing import Any
+
+import pytest
+from lox_error import LoxError
+from lox_bytes_scanner import BytesScanner
+from lox_regex_scanner import RegexScanner
+from lox_token import Token
+
+
+def summarize(tokens: list[Token]) -> list[tuple[Any, ...]]:
+    return [(t.token_type, t.lexeme, t.literal, t.line) for t in tokens]
+
+
+def assert_same_scan(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    LoxError.had_error = False
+    expected = summarize(RegexScanner(source).scanTokens())
+    expected_err = capfd.readouterr().err
+    expected_had_error = LoxError.had_error
+    LoxError.had_error = False
+
+    encoded = source.encode("utf-8")
+    tokens = BytesScanner(encoded).scanTokens()
+    actual = summarize(tokens)
+    actual_err = capfd.readouterr().err
+    for token in tokens:
+        lexeme = token.lexeme.encode("utf-8")
+        assert encoded[token.offset : token.offset + len(lexeme)] == lexeme
+
+    assert actual == expected
+    assert actual_err == expected_err
+    assert LoxError.had_error is expected_had_error
+
+
+sources = [
+    "",
+    "var a = 1; print a + 2.5 * (3 - .4) / 5.;",
+    'print "héllo\nwörld"; // ünïcode comment',
+    "var café = 1; print café+café;",
+    "éa aé a.é 1é 1.é é1.5 1.5é",
+    "x € y ² ١٢.٣",
+    "a½b ½1.5 ½",
+    '"unterminated é',
+    "@ # é$",
+]
+
+
+@pytest.mark.parametrize("source", sources)
+def test_same_as_regex_scanner(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    assert_same_scan(source, capfd)
+
+
+def test_same_as_regex_scanner_random(capfd: pytest.CaptureFixture[str]) -> None:
+    alphabet = [*'(){},.-+;*!=<>/ \n"_@', "//", "var", "x", "0", "3.14", "é", "€", "١"]
+    rng = random.Random(1)
+    for _ in range(300):
+        source = "".join(rng.choice(alphabet) for _ in range(rng.randrange(40)))
+        assert_same_scan(source, capfd)
+
+
+def test_mmap(tmp_path: Path) -> None:
+    source = "fun f(é) {\n  return é;\n}\nprint f(1);\n"
+    path = tmp_path / "source.lox"
+    path.write_text(source, encoding="utf-8")
+    expected = summarize(RegexScanner(source).scanTokens())
+
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            assert summarize(BytesScanner(mapped).scanTokens()) == expected
@@ -0,0 +1,146 @@
+import gc
+import hashlib
+import io
+import mmap
+import os
+import pickle
+import sys
+import tempfile
+from typing import Any, Optional
+
+from lox_line_index import LineIndex
+import lox_stmt as STMT
+
+# Resolved statements, with the depths of local variables on their nodes.
+Program = list[STMT.Stmt]
+
+Source = str | bytes | mmap.mmap
+
+# Modules whose classes end up in a cache file, and the front end that
+# decides what they hold: the shape of the trees, the tokens and literals in
+# them and the depths the resolver stored. Changing any of them invalidates
+# every cache.
+VERSIONED_MODULES = [
+    "lox_cache",
+    "lox_expr",
+    "lox_stmt",
+    "lox_token",
+    "lox_line_index",
+    "lox_symbol",
+    "lox_regex_scanner",
+    "lox_bytes_scanner",
+    "lox_parallel_scanner",
+    "lox_token_buffer",
+    "lox_parser",
+    "lox_stack_parser",
+    "lox_parallel_parser",
+    "lox_resolver",
+]
+
+
+def _version() -> bytes:
+    version = hashlib.sha256(sys.version.encode())
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in VERSIONED_MODULES:
+        with open(os.path.join(directory, name + ".py"), "rb") as f:
+            version.update(f.read())
+    return version.digest()
+
+
+class TreePickler(pickle.Pickler):
+    # Line indexes refer to the source, which is not stored. The unpickler is
+    # given the index of the source the trees are loaded for.
+    def persistent_id(self, obj: Any) -> Optional[str]:
+        return "lines" if isinstance(obj, LineIndex) else None
+
+
+class TreeUnpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO, lines: LineIndex) -> None:
+        super().__init__(file)
+        self.__lines = lines
+
+    def persistent_load(self, pid: Any) -> LineIndex:
+        if pid != "lines":
+            raise pickle.UnpicklingError(f"unknown persistent id {pid!r}")
+        return self.__lines
+
+    def load(self) -> Any:
+        # Unpickling allocates whole trees at once, and every collection
+        # triggered along the way would only rescan the new nodes.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return super().load()
+        finally:
+            if enabled:
+                gc.enable()
+
+
+class ProgramCache:
+    # A script's program is cached next to it as <script>c, behind a header
+    # holding a hash of the source and of the interpreter. Files are replaced
+    # atomically, so concurrent runs see either a whole old file or a whole
+    # new one, and anything that does not match is ignored and rewritten.
+    __MAGIC = b"LOXC"
+    __version: Optional[bytes] = None
+
+    def __init__(self, path: str) -> None:
+        self.__script = path
+        self.__path = path + "c"
+
+    def load(self, source: Source) -> Optional[Program]:
+        try:
+            with open(self.__path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        header = self.__header(source)
+        if not data.startswith(header):
+            return None
+        try:
+            program: Program = TreeUnpickler(
+                io.BytesIO(data[len(header) :]), LineIndex(source)
+            ).load()
+        except Exception:
+            # A damaged file is as good as a missing one.
+            return None
+        return program
+
+    def store(self, source: Source, program: Program) -> None:
+        payload = io.BytesIO()
+        try:
+            TreePickler(payload, pickle.HIGHEST_PROTOCOL).dump(program)
+        except RecursionError:
+            # Too deeply nested to pickle; run without a cache.
+            return
+
+        directory = os.path.dirname(self.__path) or "."
+        try:
+            fd, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(self.__header(source))
+                    f.write(payload.getbuffer())
+                # Readable by whoever can read the script.
+                os.chmod(temp, os.stat(self.__script).st_mode & 0o666)
+                os.replace(temp, self.__path)
+            except BaseException:
+                os.unlink(temp)
+                raise
+        except OSError:
+            # A read-only directory just means no caching.
+            pass
+
+    def __header(self, source: Source) -> bytes:
+        if ProgramCache.__version is None:
+            ProgramCache.__version = _version()
+        key = hashlib.sha256(ProgramCache.__version)
+        # Token offsets count characters in text and bytes in byte sources.
+        if isinstance(source, str):
+            key.update(b"text")
+            key.update(source.encode("utf-8"))
+        else:
+            key.update(b"bytes")
+            key.update(source)
+        return self.__MAGIC + key.digest()
@@ -0,0 +1,124 @@
+import os
+import threading
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+from lox_ast_printer import AstPrinter
+from lox_bytes_scanner import BytesScanner
+from lox_cache import VERSIONED_MODULES, Program, ProgramCache
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_symbol import SymbolTable
+import lox_expr as EXPR
+import lox_stmt as STMT
+
+source = """\
+var a = "é";
+fun f(x) {
+  var y = x;
+  fun g() { return y + a; }
+  return g();
+}
+print f("b");
+"""
+
+
+def compile_program(source: bytes) -> Program:
+    statements = Parser(BytesScanner(source).iter_tokens()).parse()
+    Resolver().resolve_statements(statements)
+    return statements
+
+
+def variables(program: Program) -> list[tuple[str, int, int, int]]:
+    # The name, position and depth of every variable, in tree order.
+    found: list[tuple[str, int, int, int]] = []
+    stack: list[Any] = list(reversed(program))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (EXPR.Variable, EXPR.Assign)):
+            token = node.name
+            assert token.symbol == SymbolTable.intern(token.lexeme)
+            found.append((token.lexeme, token.line, token.column, node.depth))
+        for slot in reversed(node.__slots__):
+            value: Any = getattr(node, slot)
+            children = cast(list[Any], value) if isinstance(value, list) else [value]
+            for child in reversed(children):
+                if isinstance(child, (EXPR.Expr, STMT.Stmt)):
+                    stack.append(child)
+    return found
+
+
+@pytest.fixture
+def script(tmp_path: Path) -> str:
+    path = tmp_path / "script.lox"
+    path.write_text(source, encoding="utf-8")
+    return str(path)
+
+
+def test_round_trip(script: str) -> None:
+    encoded = source.encode("utf-8")
+    program = compile_program(encoded)
+    cache = ProgramCache(script)
+    assert cache.load(encoded) is None
+    cache.store(encoded, program)
+
+    loaded = cache.load(encoded)
+    assert loaded is not None
+    assert AstPrinter().print(loaded) == AstPrinter().print(program)
+    assert variables(loaded) == variables(program)
+    assert ("y", 4, 20, 1) in variables(loaded)
+
+
+def test_version_covers_front_end() -> None:
+    # A change to anything that shapes the cached trees misses every cache.
+    for name in ["lox_parser", "lox_resolver", "lox_regex_scanner", "lox_symbol"]:
+        assert name in VERSIONED_MODULES
+    directory = Path(__file__).parent
+    assert all((directory / f"{name}.py").exists() for name in VERSIONED_MODULES)
+
+
+def test_changed_source_misses(script: str) -> None:
+    encoded = source.encode("utf-8")
+    cache = ProgramCache(script)
+    cache.store(encoded, compile_program(encoded))
+    changed = encoded.replace(b'"b"', b'"c"')
+    assert cache.load(changed) is None
+    assert cache.load(encoded.decode("utf-8")) is None
+
+
+def test_damaged_file_misses(script: str) -> None:
+    encoded = source.encode("utf-8")
+    cache = ProgramCache(script)
+    cache.store(encoded, compile_program(encoded))
+    data = Path(script + "c").read_bytes()
+    Path(script + "c").write_bytes(data[: len(data) // 2])
+    assert cache.load(encoded) is None
+
+
+def test_concurrent_writers(script: str) -> None:
+    encoded = source.encode("utf-8")
+    program = compile_program(encoded)
+    failures: list[str] = []
+
+    def write() -> None:
+        for _ in range(20):
+            ProgramCache(script).store(encoded, program)
+
+    def read() -> None:
+        for _ in range(40):
+            if os.path.exists(script + "c"):
+                if ProgramCache(script).load(encoded) is None:
+                    failures.append("partial file")
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    threads.append(threading.Thread(target=read))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    # No temporary files are left behind.
+    names = sorted(path.name for path in Path(script).parent.iterdir())
+    assert names == ["script.lox", "script.loxc"]
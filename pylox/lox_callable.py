@@ -1,8 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, TYPE_CHECKING
-
-if TYPE_CHECKING:
-    from lox_interpreter import Interpreter
+from typing import Any
 
 
 class LoxCallable(ABC):
@@ -10,8 +7,10 @@ class LoxCallable(ABC):
     def arity(self) -> int:
         raise NotImplementedError()
 
+    # The interpreter is an Interpreter, or an ArenaInterpreter for functions
+    # declared in an arena.
     @abstractmethod
-    def call(self, interpreter: "Interpreter", arguments: list[Any]) -> Any:
+    def call(self, interpreter: Any, arguments: list[Any]) -> Any:
         raise NotImplementedError()
 
 
@@ -22,7 +21,7 @@ class Clock(LoxCallable):
     def arity(self) -> int:
         return 0
 
-    def call(self, interpreter: "Interpreter", arguments: list[Any]) -> Any:
+    def call(self, interpreter: Any, arguments: list[Any]) -> Any:
         return time.time()
 
     def __str__(self) -> str:
@@ -0,0 +1,165 @@
+from typing import Any, Optional
+
+from lox_token import TokenType as TT
+import lox_expr as EXPR
+import lox_stmt as STMT
+
+
+class ConstantFolder(EXPR.Visitor[EXPR.Expr], STMT.Visitor[None]):
+    # Replaces expressions on literals with their value and drops groupings,
+    # rewriting statements in place. An expression whose evaluation would
+    # raise an error is kept, so that the error still happens at run time at
+    # the same place. Runs after the resolver; variables are not touched.
+
+    def fold(self, statements: list[STMT.Stmt]) -> list[STMT.Stmt]:
+        for statement in statements:
+            try:
+                self.__fold_statement(statement)
+            except RecursionError:
+                # Too deep to fold. What was folded so far is still valid.
+                pass
+        return statements
+
+    def __fold(self, expr: EXPR.Expr) -> EXPR.Expr:
+        return self.expr_visitors[type(expr)](self, expr)
+
+    def __fold_optional(self, expr: Optional[EXPR.Expr]) -> Optional[EXPR.Expr]:
+        return None if expr is None else self.__fold(expr)
+
+    def __fold_statement(self, stmt: STMT.Stmt) -> None:
+        self.stmt_visitors[type(stmt)](self, stmt)
+
+    def visit_block_stmt(self, stmt: STMT.Block) -> None:
+        for statement in stmt.statements:
+            self.__fold_statement(statement)
+
+    def visit_expression_stmt(self, stmt: STMT.Expression) -> None:
+        stmt.expression = self.__fold(stmt.expression)
+
+    def visit_for_stmt(self, stmt: STMT.For) -> None:
+        if stmt.initializer is not None:
+            self.__fold_statement(stmt.initializer)
+        stmt.condition = self.__fold_optional(stmt.condition)
+        stmt.increment = self.__fold_optional(stmt.increment)
+        self.__fold_statement(stmt.body)
+
+    def visit_function_stmt(self, stmt: STMT.Function) -> None:
+        # A lazy body is not there yet and stays as it is.
+        for statement in stmt.body:
+            self.__fold_statement(statement)
+
+    def visit_if_stmt(self, stmt: STMT.If) -> None:
+        stmt.condition = self.__fold(stmt.condition)
+        self.__fold_statement(stmt.then_branch)
+        if stmt.else_branch is not None:
+            self.__fold_statement(stmt.else_branch)
+
+    def visit_print_stmt(self, stmt: STMT.Print) -> None:
+        stmt.expression = self.__fold(stmt.expression)
+
+    def visit_return_stmt(self, stmt: STMT.Return) -> None:
+        stmt.value = self.__fold_optional(stmt.value)
+
+    def visit_var_stmt(self, stmt: STMT.Var) -> None:
+        stmt.initializer = self.__fold_optional(stmt.initializer)
+
+    def visit_while_stmt(self, stmt: STMT.While) -> None:
+        stmt.condition = self.__fold(stmt.condition)
+        self.__fold_statement(stmt.body)
+
+    def visit_assign_expr(self, expr: EXPR.Assign) -> EXPR.Expr:
+        expr.value = self.__fold(expr.value)
+        return expr
+
+    def visit_binary_expr(self, expr: EXPR.Binary) -> EXPR.Expr:
+        expr.left = self.__fold(expr.left)
+        expr.right = self.__fold(expr.right)
+        if not (
+            isinstance(expr.left, EXPR.Literal) and isinstance(expr.right, EXPR.Literal)
+        ):
+            return expr
+
+        left, right = expr.left.value, expr.right.value
+        token_type = expr.operator.token_type
+        if token_type == TT.BANG_EQUAL:
+            return EXPR.Literal(not self.__is_equal(left, right))
+        if token_type == TT.EQUAL_EQUAL:
+            return EXPR.Literal(self.__is_equal(left, right))
+        if token_type == TT.PLUS and isinstance(left, str) and isinstance(right, str):
+            return EXPR.Literal(left + right)
+
+        if not (isinstance(left, float) and isinstance(right, float)):
+            return expr
+        if token_type == TT.GREATER:
+            return EXPR.Literal(left > right)
+        if token_type == TT.GREATER_EQUAL:
+            return EXPR.Literal(left >= right)
+        if token_type == TT.LESS:
+            return EXPR.Literal(left < right)
+        if token_type == TT.LESS_EQUAL:
+            return EXPR.Literal(left <= right)
+        if token_type == TT.MINUS:
+            return EXPR.Literal(left - right)
+        if token_type == TT.PLUS:
+            return EXPR.Literal(left + right)
+        if token_type == TT.STAR:
+            return EXPR.Literal(left * right)
+        # Division by zero is left to happen at run time.
+        if token_type == TT.SLASH and right != 0.0:
+            return EXPR.Literal(left / right)
+        return expr
+
+    def visit_call_expr(self, expr: EXPR.Call) -> EXPR.Expr:
+        expr.callee = self.__fold(expr.callee)
+        expr.arguments = [self.__fold(argument) for argument in expr.arguments]
+        return expr
+
+    def visit_grouping_expr(self, expr: EXPR.Grouping) -> EXPR.Expr:
+        return self.__fold(expr.expression)
+
+    def visit_inline_expr(self, expr: EXPR.Inline) -> EXPR.Expr:
+        # The call is still made if the guard fails, so it stays as well. A
+        # call is folded in place.
+        self.visit_call_expr(expr.call)
+        expr.body = self.__fold(expr.body)
+        return expr
+
+    def visit_literal_expr(self, expr: EXPR.Literal) -> EXPR.Expr:
+        return expr
+
+    def visit_logical_expr(self, expr: EXPR.Logical) -> EXPR.Expr:
+        expr.left = self.__fold(expr.left)
+        expr.right = self.__fold(expr.right)
+        if not isinstance(expr.left, EXPR.Literal):
+            return expr
+
+        # The left operand decides, or the value is the right operand's.
+        if self.__is_truthy(expr.left.value) == (expr.operator.token_type == TT.OR):
+            return expr.left
+        return expr.right
+
+    def visit_unary_expr(self, expr: EXPR.Unary) -> EXPR.Expr:
+        expr.right = self.__fold(expr.right)
+        if not isinstance(expr.right, EXPR.Literal):
+            return expr
+
+        right = expr.right.value
+        if expr.operator.token_type == TT.BANG:
+            return EXPR.Literal(not self.__is_truthy(right))
+        if expr.operator.token_type == TT.MINUS and isinstance(right, float):
+            return EXPR.Literal(-right)
+        return expr
+
+    def visit_variable_expr(self, expr: EXPR.Variable) -> EXPR.Expr:
+        return expr
+
+    def __is_truthy(self, obj: Any) -> bool:
+        if obj is None:
+            return False
+        if isinstance(obj, bool):
+            return obj
+        return True
+
+    def __is_equal(self, a: Any, b: Any) -> bool:
+        # pylint: disable=unidiomatic-typecheck # cannot check by isinstance
+        return type(a) == type(b) and a == b
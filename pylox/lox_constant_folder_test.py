@@ -0,0 +1,87 @@
+import random
+
+import pytest
+from lox_error import LoxError
+from lox_ast_printer import AstPrinter
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_constant_folder import ConstantFolder
+from lox_pass_testing import run
+import lox_interpreter_test
+
+folds = [
+    ("print 60 * 60 * 24;", "(print 86400.0)"),
+    ("print -(1);", "(print -1.0)"),
+    ('print "a" + "b";', "(print ab)"),
+    ("print !true;", "(print False)"),
+    ("print !nil;", "(print True)"),
+    ("print ((((1))));", "(print 1.0)"),
+    ("print (a);", "(print a)"),
+    ("print 1 == true;", "(print False)"),
+    ("print 1 == 1;", "(print True)"),
+    ('print "1" != 1;', "(print True)"),
+    ("print nil == nil;", "(print True)"),
+    ("print 2 > 1 == 1 < 2;", "(print True)"),
+    ("print 1 - 2 - 3;", "(print -4.0)"),
+    ("print 6 / 4;", "(print 1.5)"),
+    ("print 1 + 2 * a;", "(print (+ 1.0 (* 2.0 a)))"),
+    ("print a + (2 * 3);", "(print (+ a 6.0))"),
+    ("print true or a;", "(print True)"),
+    ("print false or a;", "(print a)"),
+    ("print nil and a;", "(print nil)"),
+    ('print "" and a;', "(print a)"),
+    ("print (1 > 2) or (3 < 4);", "(print True)"),
+    ("print a or true;", "(print (or a True))"),
+    # These fail at run time, where they are.
+    ('print "a" - 1;', "(print (- a 1.0))"),
+    ("print -true;", "(print (- True))"),
+    ("print 1 + nil;", "(print (+ 1.0 nil))"),
+    ('print 1 < "2";', "(print (< 1.0 2))"),
+    ("print 1 / 0;", "(print (/ 1.0 0.0))"),
+    ("print 1 / (1 - 1);", "(print (/ 1.0 0.0))"),
+    ("print -(-true);", "(print (- (- True)))"),
+    # Inside statements.
+    ("var a = 1 + 1; a = 2 * (3);", "(vardecl a 2.0)|(expr (assign a 6.0))"),
+    (
+        "fun f() { if (!false) return (1); while (1 < 0) {} }",
+        "(function f (if True (return 1.0) nil) (while False (block)))",
+    ),
+    (
+        "for (var i = 0 * 1; i < 2 + 3; i = i + (1)) { f(-1, (2)); }",
+        "(for (vardecl i 0.0) (< i 5.0) (assign i (+ i 1.0))"
+        " (block (expr (call f -1.0 2.0))))",
+    ),
+]
+
+
+@pytest.mark.parametrize("source, expected", folds)
+def test_fold(source: str, expected: str) -> None:
+    statements = Parser(RegexScanner(source).iter_tokens()).parse()
+    assert LoxError.had_error is False
+    folded = ConstantFolder().fold(statements)
+    assert "|".join(AstPrinter().print(folded)) == expected
+
+
+@pytest.mark.parametrize(
+    "source", [case[0] for case in lox_interpreter_test.statements if not case[3]]
+)
+def test_same_output(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    assert run([source], ["fold"], capfd) == run([source], [], capfd)
+
+
+def test_same_output_random(capfd: pytest.CaptureFixture[str]) -> None:
+    operands = ["1", "2", "0", "-1", "true", "false", "nil", '"a"', '""', "x"]
+    operators = ["+", "-", "*", "/", "==", "!=", "<", "<=", ">", ">=", "and", "or"]
+    rng = random.Random(1)
+
+    def expression(depth: int) -> str:
+        if depth == 0 or rng.random() < 0.3:
+            return rng.choice(operands)
+        if rng.random() < 0.2:
+            return rng.choice(["-", "!"]) + expression(depth - 1)
+        left, right = expression(depth - 1), expression(depth - 1)
+        return f"({left} {rng.choice(operators)} {right})"
+
+    for _ in range(1000):
+        source = f"var x = 3;\nprint {expression(4)};"
+        assert run([source], ["fold"], capfd) == run([source], [], capfd), source
@@ -0,0 +1,346 @@
+from typing import Any, Optional
+
+import lox_expr as EXPR
+import lox_stmt as STMT
+
+
+def _is_pure(expr: Optional[EXPR.Expr]) -> bool:
+    # Whether evaluating expr can neither fail nor have an effect. Reading a
+    # local cannot fail; reading a global can.
+    if expr is None or isinstance(expr, EXPR.Literal):
+        return True
+    if isinstance(expr, EXPR.Variable):
+        return expr.depth >= 0
+    if isinstance(expr, EXPR.Grouping):
+        return _is_pure(expr.expression)
+    return False
+
+
+def _is_truthy(obj: Any) -> bool:
+    if obj is None:
+        return False
+    if isinstance(obj, bool):
+        return obj
+    return True
+
+
+class _Liveness(EXPR.Visitor[None], STMT.Visitor[None]):
+    # Finds the local variables and functions that are never read, and the
+    # assignments to them. Walks the scopes the way the resolver does, so
+    # that a depth the resolver stored leads to the declaration it meant.
+
+    def __init__(self) -> None:
+        # Name to declaring statement, or None for parameters.
+        self.__scopes: list[dict[str, Optional[STMT.Stmt]]] = []
+        self.__declarations: list[STMT.Stmt] = []
+        self.__read: set[STMT.Stmt] = set()
+        self.__assigns: list[tuple[EXPR.Assign, Optional[STMT.Stmt]]] = []
+
+    def dead(self, statements: list[STMT.Stmt]) -> set[Any]:
+        try:
+            self.__visit_all(statements)
+        except RecursionError:
+            return set()
+
+        dead: set[Any] = {
+            declaration
+            for declaration in self.__declarations
+            if declaration not in self.__read
+        }
+        dead.update(assign for assign, binding in self.__assigns if binding in dead)
+        return dead
+
+    def __visit_all(self, statements: list[STMT.Stmt]) -> None:
+        for statement in statements:
+            self.stmt_visitors[type(statement)](self, statement)
+
+    def __visit(self, expr: Optional[EXPR.Expr]) -> None:
+        if expr is not None:
+            self.expr_visitors[type(expr)](self, expr)
+
+    def __declare(self, name: str, declaration: Optional[STMT.Stmt]) -> None:
+        if len(self.__scopes) == 0:
+            # Globals may be read by anything that runs later.
+            return
+        self.__scopes[-1][name] = declaration
+        if declaration is not None:
+            self.__declarations.append(declaration)
+
+    def __binding(self, name: str, depth: int) -> Optional[STMT.Stmt]:
+        if depth < 0 or depth >= len(self.__scopes):
+            return None
+        return self.__scopes[-1 - depth].get(name)
+
+    def visit_block_stmt(self, stmt: STMT.Block) -> None:
+        self.__scopes.append({})
+        self.__visit_all(stmt.statements)
+        self.__scopes.pop()
+
+    def visit_expression_stmt(self, stmt: STMT.Expression) -> None:
+        self.__visit(stmt.expression)
+
+    def visit_for_stmt(self, stmt: STMT.For) -> None:
+        if stmt.initializer is not None:
+            self.__scopes.append({})
+            self.stmt_visitors[type(stmt.initializer)](self, stmt.initializer)
+        self.__visit(stmt.condition)
+        self.__visit(stmt.increment)
+        self.stmt_visitors[type(stmt.body)](self, stmt.body)
+        if stmt.initializer is not None:
+            self.__scopes.pop()
+
+    def visit_function_stmt(self, stmt: STMT.Function) -> None:
+        self.__declare(stmt.name.lexeme, stmt)
+        if stmt.tokens is not None:
+            # Not parsed yet: any name in the body may be read.
+            names = {token.lexeme for token in stmt.tokens}
+            for scope in self.__scopes:
+                for name, declaration in scope.items():
+                    if name in names and declaration is not None:
+                        self.__read.add(declaration)
+            return
+
+        self.__scopes.append({})
+        for param in stmt.params:
+            self.__declare(param.lexeme, None)
+        self.__visit_all(stmt.body)
+        self.__scopes.pop()
+
+    def visit_if_stmt(self, stmt: STMT.If) -> None:
+        self.__visit(stmt.condition)
+        self.stmt_visitors[type(stmt.then_branch)](self, stmt.then_branch)
+        if stmt.else_branch is not None:
+            self.stmt_visitors[type(stmt.else_branch)](self, stmt.else_branch)
+
+    def visit_print_stmt(self, stmt: STMT.Print) -> None:
+        self.__visit(stmt.expression)
+
+    def visit_return_stmt(self, stmt: STMT.Return) -> None:
+        self.__visit(stmt.value)
+
+    def visit_var_stmt(self, stmt: STMT.Var) -> None:
+        self.__visit(stmt.initializer)
+        self.__declare(stmt.name.lexeme, stmt)
+
+    def visit_while_stmt(self, stmt: STMT.While) -> None:
+        self.__visit(stmt.condition)
+        self.stmt_visitors[type(stmt.body)](self, stmt.body)
+
+    def visit_assign_expr(self, expr: EXPR.Assign) -> None:
+        self.__visit(expr.value)
+        self.__assigns.append((expr, self.__binding(expr.name.lexeme, expr.depth)))
+
+    def visit_binary_expr(self, expr: EXPR.Binary) -> None:
+        self.__visit(expr.left)
+        self.__visit(expr.right)
+
+    def visit_call_expr(self, expr: EXPR.Call) -> None:
+        self.__visit(expr.callee)
+        for argument in expr.arguments:
+            self.__visit(argument)
+
+    def visit_grouping_expr(self, expr: EXPR.Grouping) -> None:
+        self.__visit(expr.expression)
+
+    def visit_inline_expr(self, expr: EXPR.Inline) -> None:
+        self.__visit(expr.call)
+        self.__visit(expr.body)
+
+    def visit_literal_expr(self, expr: EXPR.Literal) -> None:
+        pass
+
+    def visit_logical_expr(self, expr: EXPR.Logical) -> None:
+        self.__visit(expr.left)
+        self.__visit(expr.right)
+
+    def visit_unary_expr(self, expr: EXPR.Unary) -> None:
+        self.__visit(expr.right)
+
+    def visit_variable_expr(self, expr: EXPR.Variable) -> None:
+        binding = self.__binding(expr.name.lexeme, expr.depth)
+        if binding is not None:
+            self.__read.add(binding)
+
+
+class DeadCodeEliminator(EXPR.Visitor[EXPR.Expr], STMT.Visitor[Optional[STMT.Stmt]]):
+    # Removes statements that can never run or have no effect: branches of
+    # ifs on literals, loops whose condition is a false literal, statements
+    # after a return and expression statements with pure expressions. Then
+    # removes local variables and functions that are never read, keeping
+    # the initializers that have effects, and the assignments to those
+    # variables, keeping their values. Runs after the resolver, and best
+    # after the constant folder, which turns conditions into literals.
+
+    def __init__(self) -> None:
+        self.__dead: set[Any] = set()
+
+    def eliminate(self, statements: list[STMT.Stmt]) -> list[STMT.Stmt]:
+        self.__dead = set()
+        statements = self.__eliminate_all(statements)
+        while True:
+            # Removing a variable may leave the ones its initializer read
+            # unread in turn. Stop once a round finds nothing new, which is
+            # also where a tree too deep to rewrite ends up.
+            dead = _Liveness().dead(statements)
+            if dead <= self.__dead:
+                return statements
+            self.__dead = dead
+            statements = self.__eliminate_all(statements)
+
+    def __eliminate_all(self, statements: list[STMT.Stmt]) -> list[STMT.Stmt]:
+        kept: list[STMT.Stmt] = []
+        for statement in statements:
+            try:
+                result = self.__eliminate(statement)
+                returns = result is not None and self.__returns(result)
+            except RecursionError:
+                # Too deep to look into. Whatever was done so far stays valid.
+                result, returns = statement, False
+            if result is not None:
+                kept.append(result)
+            if returns:
+                break
+        return kept
+
+    def __eliminate(self, stmt: STMT.Stmt) -> Optional[STMT.Stmt]:
+        return self.stmt_visitors[type(stmt)](self, stmt)
+
+    def __eliminate_branch(self, stmt: Optional[STMT.Stmt]) -> STMT.Stmt:
+        # Where a single statement is needed.
+        result = None if stmt is None else self.__eliminate(stmt)
+        return STMT.Block([]) if result is None else result
+
+    def __rewrite(self, expr: EXPR.Expr) -> EXPR.Expr:
+        return self.expr_visitors[type(expr)](self, expr)
+
+    def __rewrite_optional(self, expr: Optional[EXPR.Expr]) -> Optional[EXPR.Expr]:
+        return None if expr is None else self.__rewrite(expr)
+
+    def __returns(self, stmt: STMT.Stmt) -> bool:
+        # Whether stmt always ends with a return.
+        if isinstance(stmt, STMT.Return):
+            return True
+        if isinstance(stmt, STMT.Block):
+            return any(self.__returns(statement) for statement in stmt.statements)
+        if isinstance(stmt, STMT.If):
+            return (
+                stmt.else_branch is not None
+                and self.__returns(stmt.then_branch)
+                and self.__returns(stmt.else_branch)
+            )
+        return False
+
+    def visit_block_stmt(self, stmt: STMT.Block) -> Optional[STMT.Stmt]:
+        stmt.statements = self.__eliminate_all(stmt.statements)
+        return stmt
+
+    def visit_expression_stmt(self, stmt: STMT.Expression) -> Optional[STMT.Stmt]:
+        stmt.expression = self.__rewrite(stmt.expression)
+        return None if _is_pure(stmt.expression) else stmt
+
+    def visit_for_stmt(self, stmt: STMT.For) -> Optional[STMT.Stmt]:
+        if stmt.initializer is not None:
+            # Something has to stay, so that the loop keeps its scope.
+            initializer = self.__eliminate(stmt.initializer)
+            stmt.initializer = initializer or STMT.Expression(EXPR.Literal(None))
+        stmt.condition = self.__rewrite_optional(stmt.condition)
+        stmt.increment = self.__rewrite_optional(stmt.increment)
+
+        if isinstance(stmt.condition, EXPR.Literal) and not _is_truthy(
+            stmt.condition.value
+        ):
+            if stmt.initializer is None or self.__is_pure_statement(stmt.initializer):
+                return None
+        stmt.body = self.__eliminate_branch(stmt.body)
+        return stmt
+
+    def __is_pure_statement(self, stmt: STMT.Stmt) -> bool:
+        if isinstance(stmt, STMT.Var):
+            return _is_pure(stmt.initializer)
+        return isinstance(stmt, STMT.Expression) and _is_pure(stmt.expression)
+
+    def visit_function_stmt(self, stmt: STMT.Function) -> Optional[STMT.Stmt]:
+        if stmt in self.__dead:
+            return None
+        stmt.body = self.__eliminate_all(stmt.body)
+        return stmt
+
+    def visit_if_stmt(self, stmt: STMT.If) -> Optional[STMT.Stmt]:
+        stmt.condition = self.__rewrite(stmt.condition)
+        if isinstance(stmt.condition, EXPR.Literal):
+            if _is_truthy(stmt.condition.value):
+                return self.__eliminate(stmt.then_branch)
+            if stmt.else_branch is None:
+                return None
+            return self.__eliminate(stmt.else_branch)
+
+        stmt.then_branch = self.__eliminate_branch(stmt.then_branch)
+        if stmt.else_branch is not None:
+            stmt.else_branch = self.__eliminate(stmt.else_branch)
+        return stmt
+
+    def visit_print_stmt(self, stmt: STMT.Print) -> Optional[STMT.Stmt]:
+        stmt.expression = self.__rewrite(stmt.expression)
+        return stmt
+
+    def visit_return_stmt(self, stmt: STMT.Return) -> Optional[STMT.Stmt]:
+        stmt.value = self.__rewrite_optional(stmt.value)
+        return stmt
+
+    def visit_var_stmt(self, stmt: STMT.Var) -> Optional[STMT.Stmt]:
+        stmt.initializer = self.__rewrite_optional(stmt.initializer)
+        if stmt not in self.__dead:
+            return stmt
+        if _is_pure(stmt.initializer):
+            return None
+        assert stmt.initializer is not None
+        return STMT.Expression(stmt.initializer)
+
+    def visit_while_stmt(self, stmt: STMT.While) -> Optional[STMT.Stmt]:
+        stmt.condition = self.__rewrite(stmt.condition)
+        if isinstance(stmt.condition, EXPR.Literal) and not _is_truthy(
+            stmt.condition.value
+        ):
+            return None
+        stmt.body = self.__eliminate_branch(stmt.body)
+        return stmt
+
+    def visit_assign_expr(self, expr: EXPR.Assign) -> EXPR.Expr:
+        expr.value = self.__rewrite(expr.value)
+        # The value of an assignment is the value assigned.
+        return expr.value if expr in self.__dead else expr
+
+    def visit_binary_expr(self, expr: EXPR.Binary) -> EXPR.Expr:
+        expr.left = self.__rewrite(expr.left)
+        expr.right = self.__rewrite(expr.right)
+        return expr
+
+    def visit_call_expr(self, expr: EXPR.Call) -> EXPR.Expr:
+        expr.callee = self.__rewrite(expr.callee)
+        expr.arguments = [self.__rewrite(argument) for argument in expr.arguments]
+        return expr
+
+    def visit_grouping_expr(self, expr: EXPR.Grouping) -> EXPR.Expr:
+        expr.expression = self.__rewrite(expr.expression)
+        return expr
+
+    def visit_inline_expr(self, expr: EXPR.Inline) -> EXPR.Expr:
+        # A call is rewritten in place.
+        self.visit_call_expr(expr.call)
+        expr.body = self.__rewrite(expr.body)
+        return expr
+
+    def visit_literal_expr(self, expr: EXPR.Literal) -> EXPR.Expr:
+        return expr
+
+    def visit_logical_expr(self, expr: EXPR.Logical) -> EXPR.Expr:
+        expr.left = self.__rewrite(expr.left)
+        expr.right = self.__rewrite(expr.right)
+        return expr
+
+    def visit_unary_expr(self, expr: EXPR.Unary) -> EXPR.Expr:
+        expr.right = self.__rewrite(expr.right)
+        return expr
+
+    def visit_variable_expr(self, expr: EXPR.Variable) -> EXPR.Expr:
+        return expr
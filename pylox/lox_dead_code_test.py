@@ -0,0 +1,178 @@
+import random
+
+import pytest
+from lox_error import LoxError
+from lox_ast_printer import AstPrinter
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_constant_folder import ConstantFolder
+from lox_dead_code import DeadCodeEliminator
+from lox_pass_testing import run
+import lox_interpreter_test
+
+
+def optimize(source: str, lazy: bool = False) -> list[str]:
+    statements = Parser(RegexScanner(source).iter_tokens(), lazy, Resolver()).parse()
+    assert LoxError.had_error is False
+    statements = DeadCodeEliminator().eliminate(ConstantFolder().fold(statements))
+    return AstPrinter().print(statements)
+
+
+eliminations: list[tuple[str, list[str]]] = [
+    # Unreachable code.
+    ("if (false) print 1; print 2;", ["(print 2.0)"]),
+    ("if (1 > 2) print 1; else print 2;", ["(print 2.0)"]),
+    ("if (true) { print 1; } else print 2;", ["(block (print 1.0))"]),
+    ("if (nil) print 1;", []),
+    ("while (false) print 1;", []),
+    ("while (a) if (false) print 1;", ["(while a (block))"]),
+    ("for (;false;) print 1;", []),
+    ("for (var i = 0; false;) print 1;", []),
+    ("for (f(); false;) print 1;", ["(for (expr (call f)) False nil (print 1.0))"]),
+    (
+        "fun f() { print 1; return 2; print 3; }",
+        ["(function f (print 1.0) (return 2.0))"],
+    ),
+    (
+        "fun f(a) { if (a) return 1; else { return 2; } print 3; }",
+        ["(function f a (if a (return 1.0) (block (return 2.0))))"],
+    ),
+    (
+        "fun f(a) { if (a) return 1; print 3; }",
+        ["(function f a (if a (return 1.0) nil) (print 3.0))"],
+    ),
+    # Statements without effects.
+    ("1; (true); a; print a;", ["(expr a)", "(print a)"]),
+    ("{ var a = 1; a; print a; }", ["(block (vardecl a 1.0) (print a))"]),
+    # Dead stores.
+    ("{ var a = 1; }", ["(block)"]),
+    ("{ var a = f(); }", ["(block (expr (call f)))"]),
+    (
+        "{ var a = 1; a = 2; a = f(); print a = 3; }",
+        ["(block (expr (call f)) (print 3.0))"],
+    ),
+    ("{ var a = 1; var b = a; var c = b; }", ["(block)"]),
+    (
+        "{ var a = 1; { var a = 2; a = 3; } print a; }",
+        ["(block (vardecl a 1.0) (block) (print a))"],
+    ),
+    ("{ fun f() { print 1; } }", ["(block)"]),
+    ("{ fun f() { return f(); } }", ["(block (function f (return (call f))))"]),
+    (
+        "{ var a = 1; fun f() { return a; } print f(); }",
+        ["(block (vardecl a 1.0) (function f (return a)) (print (call f)))"],
+    ),
+    ("fun f(a) { var b = a; return a; }", ["(function f a (return a))"]),
+    (
+        "{ for (var i = 0; i < 3; i = i + 1) { var j = i; } }",
+        ["(block (for (vardecl i 0.0) (< i 3.0) (assign i (+ i 1.0)) (block)))"],
+    ),
+    (
+        "{ for (var i = f(); false;) {} }",
+        ["(block (for (expr (call f)) False nil (block)))"],
+    ),
+    # Globals may be read later.
+    ("var a = 1; fun f() {}", ["(vardecl a 1.0)", "(function f)"]),
+]
+
+
+@pytest.mark.parametrize("source, expected", eliminations)
+def test_eliminate(source: str, expected: list[str]) -> None:
+    assert optimize(source) == expected
+
+
+def test_lazy_body_reads() -> None:
+    source = "{ var a = 1; var b = 2; fun f() { return a; } print f(); }"
+    assert optimize(source, lazy=True) == [
+        "(block (vardecl a 1.0) (function f) (print (call f)))"
+    ]
+
+
+def same_output(sources: list[str], capfd: pytest.CaptureFixture[str]) -> bool:
+    # Each program runs twice, so that running a rewritten tree again is
+    # checked too.
+    optimized = run(sources, ["fold", "dead-code"], capfd, times=2)
+    return optimized == run(sources, [], capfd, times=2)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [case[0] for case in lox_interpreter_test.statements if not case[3]]
+    + [source for source, _ in eliminations],
+)
+def test_same_output(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    assert same_output([source], capfd)
+
+
+def program(rng: random.Random) -> str:
+    # Random programs over a few names, with locals, closures, dead branches
+    # and early returns. Functions only call functions declared before them.
+    functions: list[str] = []
+
+    def expression(depth: int) -> str:
+        choice = rng.randrange(18 if depth > 0 else 10)
+        if choice < 9:
+            return ["1", "2", "nil", "true", "false", '"s"', "a", "b", "c"][choice]
+        if choice == 9:
+            if not functions:
+                return "a"
+            return f"{rng.choice(functions)}({expression(depth - 1) if depth else 1})"
+        if choice >= 16:
+            return rng.choice(["-", "!"]) + expression(depth - 1)
+        left, right = expression(depth - 1), expression(depth - 1)
+        return [
+            "({} + {})",
+            "({} < {})",
+            "({} or {})",
+            "({} and {})",
+            "(a = {}{})",
+            "(b = {}{})",
+        ][choice - 10].format(left, right if choice < 14 else "")
+
+    def block(depth: int, in_function: bool) -> str:
+        return " ".join(statement(depth, in_function) for _ in range(rng.randrange(4)))
+
+    def statement(depth: int, in_function: bool) -> str:
+        choice = rng.randrange(10 if depth > 0 else 5)
+        if choice == 0:
+            return f"print {expression(2)};"
+        if choice == 1:
+            return f"{expression(2)};"
+        if choice == 2:
+            return f"var {rng.choice('abc')} = {expression(2)};"
+        if choice == 3:
+            return f"var {rng.choice('abc')};"
+        if choice == 4:
+            if in_function:
+                return f"return {expression(1)};"
+            return f"print {expression(1)};"
+        depth -= 1
+        if choice == 5:
+            return f"{{ {block(depth, in_function)} }}"
+        if choice == 6:
+            condition = rng.choice(["false", "true", "1 > 2", expression(1)])
+            then_branch = block(depth, in_function)
+            else_branch = statement(depth, in_function)
+            return f"if ({condition}) {{ {then_branch} }} else {else_branch}"
+        if choice == 7:
+            return f"while (false) {{ {block(depth, in_function)} }}"
+        if choice == 8:
+            return (
+                f"for (var i = 0; i < 2; i = i + 1) {{ {block(depth, in_function)} }}"
+            )
+        if in_function:
+            return f"{{ {block(depth, in_function)} }}"
+        name = f"f{len(functions)}"
+        body = block(depth, True)
+        functions.append(name)
+        return f"fun {name}(a) {{ {body} }}"
+
+    return " ".join(statement(3, False) for _ in range(rng.randrange(1, 6)))
+
+
+def test_same_output_random(capfd: pytest.CaptureFixture[str]) -> None:
+    rng = random.Random(1)
+    for _ in range(1000):
+        source = "{ " + program(rng) + " }" if rng.random() < 0.7 else program(rng)
+        assert same_output([source], capfd), source
@@ -10,8 +10,10 @@ class Environment:
         self.__values: dict[str, Any] = {}
 
     def get(self, name: Token) -> Any:
-        if name.lexeme in self.__values:
+        try:
             return self.__values[name.lexeme]
+        except KeyError:
+            pass
 
         if self.__enclosing is not None:
             return self.__enclosing.get(name)
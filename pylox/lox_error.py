@@ -9,22 +9,38 @@ class LoxError:
     had_runtime_error: bool = False
 
     @staticmethod
-    def report(line: int, where: str, message: str) -> None:
-        print(f"[line {line}] Error{where}: {message}", file=sys.stderr)
+    def report(line: int, where: str, message: str, column: int = 0) -> None:
+        position = LoxError.__position(line, column)
+        print(f"[line {position}] Error{where}: {message}", file=sys.stderr)
         LoxError.had_error = True
 
     @staticmethod
-    def scan_error(line: int, message: str) -> None:
-        LoxError.report(line, "", message)
+    def scan_error(line: int, message: str, column: int = 0) -> None:
+        LoxError.report(line, "", message, column)
 
     @staticmethod
     def parse_error(token: Token, message: str) -> None:
         if token.token_type == TT.EOF:
-            LoxError.report(token.line, " at end", message)
+            LoxError.report(token.line, " at end", message, token.column)
         else:
-            LoxError.report(token.line, f" at '{token.lexeme}'", message)
+            LoxError.report(token.line, f" at '{token.lexeme}'", message, token.column)
 
     @staticmethod
     def runtime_error(error: LoxRuntimeError) -> None:
-        print(f"{error.message}\n[line {error.token.line}]", file=sys.stderr)
+        position = LoxError.__position(error.token.line, error.token.column)
+        print(f"{error.message}\n[line {position}]", file=sys.stderr)
         LoxError.had_runtime_error = True
+
+    @staticmethod
+    def nesting_error(runtime: bool) -> None:
+        # Python ran out of stack, so there is no token to point at.
+        print("Error: Too deeply nested.", file=sys.stderr)
+        if runtime:
+            LoxError.had_runtime_error = True
+        else:
+            LoxError.had_error = True
+
+    @staticmethod
+    def __position(line: int, column: int) -> str:
+        # Tokens made up by hand have no column.
+        return f"{line}:{column}" if column else f"{line}"
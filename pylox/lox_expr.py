@@ -1,6 +1,7 @@
+# Generated by tool/generate_ast.py. Do not edit.
+
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Any, Generic, TypeVar
+from typing import Any, Callable, ClassVar, Generic, TypeVar
 
 from lox_token import Token
 
@@ -8,6 +9,24 @@ R = TypeVar("R")
 
 
 class Visitor(ABC, Generic[R]):
+    # The visit methods of each subclass by node class, so that
+    # self.expr_visitors[type(node)](self, node) dispatches with a single call.
+    expr_visitors: ClassVar[dict[type["Expr"], Callable[[Any, Any], Any]]]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.expr_visitors = {
+            Assign: cls.visit_assign_expr,
+            Binary: cls.visit_binary_expr,
+            Call: cls.visit_call_expr,
+            Grouping: cls.visit_grouping_expr,
+            Inline: cls.visit_inline_expr,
+            Literal: cls.visit_literal_expr,
+            Logical: cls.visit_logical_expr,
+            Unary: cls.visit_unary_expr,
+            Variable: cls.visit_variable_expr,
+        }
+
     @abstractmethod
     def visit_assign_expr(self, expr: "Assign") -> R:
         raise NotImplementedError()
@@ -24,6 +43,10 @@ class Visitor(ABC, Generic[R]):
     def visit_grouping_expr(self, expr: "Grouping") -> R:
         raise NotImplementedError()
 
+    @abstractmethod
+    def visit_inline_expr(self, expr: "Inline") -> R:
+        raise NotImplementedError()
+
     @abstractmethod
     def visit_literal_expr(self, expr: "Literal") -> R:
         raise NotImplementedError()
@@ -42,90 +65,120 @@ class Visitor(ABC, Generic[R]):
 
 
 class Expr:
+    __slots__: tuple[str, ...] = ()
+
     @abstractmethod
     def accept(self, visitor: Visitor[R]) -> R:
         raise NotImplementedError()
 
+    def __repr__(self) -> str:
+        fields = (repr(getattr(self, name)) for name in self.__slots__)
+        return f"{type(self).__name__}({', '.join(fields)})"
+
 
-@dataclass
 class Assign(Expr):
-    name: Token
-    value: Expr
+    # Set by the resolver: how many scopes out the variable is, or -1 if
+    # it is global.
+    __slots__ = ("name", "value", "depth")
+
+    def __init__(self, name: Token, value: Expr, depth: int = -1) -> None:
+        self.name = name
+        self.value = value
+        self.depth = depth
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_assign_expr(self)
 
-    def __hash__(self) -> int:
-        return id(self)
-
-    def __eq__(self, other: object):
-        return self.__hash__() == other.__hash__()
 
-
-@dataclass
 class Binary(Expr):
-    left: Expr
-    operator: Token
-    right: Expr
+    __slots__ = ("left", "operator", "right")
+
+    def __init__(self, left: Expr, operator: Token, right: Expr) -> None:
+        self.left = left
+        self.operator = operator
+        self.right = right
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_binary_expr(self)
 
 
-@dataclass
 class Call(Expr):
-    callee: Expr
-    paren: Token
-    arguments: list[Expr]
+    __slots__ = ("callee", "paren", "arguments")
+
+    def __init__(self, callee: Expr, paren: Token, arguments: list[Expr]) -> None:
+        self.callee = callee
+        self.paren = paren
+        self.arguments = arguments
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_call_expr(self)
 
 
-@dataclass
 class Grouping(Expr):
-    expression: Expr
+    __slots__ = ("expression",)
+
+    def __init__(self, expression: Expr) -> None:
+        self.expression = expression
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_grouping_expr(self)
 
 
-@dataclass
+class Inline(Expr):
+    # A call whose function's body was substituted by the inliner. body
+    # runs if the callee is still the function whose name token is
+    # declared; otherwise the call is made.
+    __slots__ = ("call", "declared", "body")
+
+    def __init__(self, call: Call, declared: Token, body: Expr) -> None:
+        self.call = call
+        self.declared = declared
+        self.body = body
+
+    def accept(self, visitor: Visitor[R]) -> R:
+        return visitor.visit_inline_expr(self)
+
+
 class Literal(Expr):
-    value: Any
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_literal_expr(self)
 
 
-@dataclass
 class Logical(Expr):
-    left: Expr
-    operator: Token
-    right: Expr
+    __slots__ = ("left", "operator", "right")
+
+    def __init__(self, left: Expr, operator: Token, right: Expr) -> None:
+        self.left = left
+        self.operator = operator
+        self.right = right
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_logical_expr(self)
 
 
-@dataclass
 class Unary(Expr):
-    operator: Token
-    right: Expr
+    __slots__ = ("operator", "right")
+
+    def __init__(self, operator: Token, right: Expr) -> None:
+        self.operator = operator
+        self.right = right
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_unary_expr(self)
 
 
-@dataclass
 class Variable(Expr):
-    name: Token
+    # Set by the resolver, as for Assign.
+    __slots__ = ("name", "depth")
+
+    def __init__(self, name: Token, depth: int = -1) -> None:
+        self.name = name
+        self.depth = depth
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_variable_expr(self)
-
-    def __hash__(self) -> int:
-        return id(self)
-
-    def __eq__(self, other: object):
-        return self.__hash__() == other.__hash__()
@@ -14,10 +14,17 @@ class LoxFunction(LoxCallable):
         self.__declaration = declaration
         self.__closure = closure
 
+    @property
+    def declaration(self) -> Function:
+        return self.__declaration
+
     def arity(self) -> int:
         return len(self.__declaration.params)
 
     def call(self, interpreter: "Interpreter", arguments: list[Any]) -> Any:
+        if self.__declaration.tokens is not None:
+            interpreter.load_body(self.__declaration)
+
         environment = Environment(self.__closure)
         for param, arg in zip(self.__declaration.params, arguments):
             environment.define(param.lexeme, arg)
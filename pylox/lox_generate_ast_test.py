@@ -0,0 +1,34 @@
+import importlib.util
+import io
+import os
+
+import lox_expr as EXPR
+import lox_stmt as STMT
+
+TOOL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tool")
+spec = importlib.util.spec_from_file_location(
+    "generate_ast", os.path.join(TOOL, "generate_ast.py")
+)
+assert spec is not None and spec.loader is not None
+generate_ast = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(generate_ast)
+
+
+def test_modules_are_up_to_date() -> None:
+    # Run tool/generate_ast.py after changing its schema.
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for file_name, base, imports, schema in generate_ast.MODULES:
+        f = io.StringIO()
+        generate_ast.define_ast(f, base, imports, schema)
+        with open(os.path.join(directory, file_name), encoding="utf-8") as module:
+            assert module.read() == f.getvalue()
+
+
+def test_nodes() -> None:
+    literal = EXPR.Literal(1.0)
+    assert not hasattr(literal, "__dict__")
+    assert repr(EXPR.Grouping(literal)) == "Grouping(Literal(1.0))"
+    # Nodes are compared and hashed by identity.
+    assert literal != EXPR.Literal(1.0)
+    assert {literal: 1}[literal] == 1
+    assert STMT.Function.__init__.__defaults__ == (None, None)
@@ -0,0 +1,120 @@
+import operator
+from typing import Iterator, Optional
+
+from lox_cache import Program
+from lox_error import LoxError
+from lox_incremental_scanner import IncrementalScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_token import Token
+import lox_stmt as STMT
+
+
+class _Declaration:
+    __slots__ = ("tokens", "statement", "clean", "resolved")
+
+    def __init__(
+        self, tokens: list[Token], statement: Optional[STMT.Stmt], clean: bool
+    ) -> None:
+        # The declaration's tokens followed by the one after it, which the
+        # parser looked at to decide where the declaration ends.
+        self.tokens = tokens
+        self.statement = statement
+        # Parsed without syntax errors, so there are none to report again.
+        self.clean = clean
+        # Resolved without errors, so the depths on its nodes are final.
+        self.resolved = False
+
+
+class IncrementalParser:
+    # Keeps the top-level declarations of a source with the tokens each was
+    # parsed from. After an edit, a declaration whose tokens the incremental
+    # scanner reused unchanged keeps its statement and resolver results. Global
+    # variables are not resolved, so top-level declarations never affect each
+    # other's resolution. As with IncrementalScanner, scan errors are only
+    # reported for the text that was scanned again.
+    def __init__(self, source: str) -> None:
+        self.__scanner = IncrementalScanner(source)
+        self.__declarations: list[_Declaration] = []
+        self.__parse()
+
+    @property
+    def source(self) -> str:
+        return self.__scanner.source
+
+    def program(self) -> Program:
+        return [
+            declaration.statement
+            for declaration in self.__declarations
+            if declaration.statement is not None
+        ]
+
+    def edit(self, offset: int, removed: int, inserted: str) -> Program:
+        self.__scanner.edit(offset, removed, inserted)
+        self.__parse()
+        return self.program()
+
+    def __parse(self) -> None:
+        tokens = self.__scanner.tokens
+        reusable = {
+            declaration.tokens[0]: declaration
+            for declaration in self.__declarations
+            if declaration.clean
+        }
+
+        had_error = LoxError.had_error
+        LoxError.had_error = False
+
+        declarations: list[_Declaration] = []
+        start = 0
+        while start < len(tokens) - 1:
+            declaration = reusable.get(tokens[start])
+            end = start + len(declaration.tokens) if declaration is not None else 0
+            if (
+                declaration is None
+                or end > len(tokens)
+                or not all(map(operator.is_, declaration.tokens, tokens[start:end]))
+            ):
+                declaration = self.__parse_declaration(tokens, start)
+                end = start + len(declaration.tokens)
+            declarations.append(declaration)
+            start = end - 1
+
+        # Like a full run, resolve only when there was no syntax error.
+        if not LoxError.had_error:
+            for declaration in declarations:
+                if not declaration.resolved:
+                    self.__resolve(declaration)
+
+        LoxError.had_error = had_error or LoxError.had_error
+        self.__declarations = declarations
+
+    def __parse_declaration(self, tokens: list[Token], start: int) -> _Declaration:
+        position = start
+
+        def pull() -> Iterator[Token]:
+            nonlocal position
+            for position in range(start, len(tokens)):
+                yield tokens[position]
+
+        had_error = LoxError.had_error
+        LoxError.had_error = False
+
+        # The parser stops holding the token after the declaration.
+        statement = next(Parser(pull()).declarations())
+        clean = not LoxError.had_error
+
+        LoxError.had_error = had_error or LoxError.had_error
+        return _Declaration(tokens[start : position + 1], statement, clean)
+
+    def __resolve(self, declaration: _Declaration) -> None:
+        if declaration.statement is None:
+            return
+        had_error = LoxError.had_error
+        LoxError.had_error = False
+
+        resolver = Resolver()
+        resolver.resolve_statements([declaration.statement])
+        declaration.resolved = not LoxError.had_error
+
+        LoxError.had_error = had_error or LoxError.had_error
@@ -0,0 +1,125 @@
+import random
+from typing import Any, cast
+
+import pytest
+from lox_error import LoxError
+from lox_ast_printer import AstPrinter
+from lox_cache import Program
+from lox_incremental_parser import IncrementalParser
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+import lox_expr as EXPR
+import lox_stmt as STMT
+
+
+def locals_of(program: Program) -> list[tuple[int, str, int]]:
+    # The offset, name and depth of every resolved local variable.
+    found: list[tuple[int, str, int]] = []
+    stack: list[Any] = list(program)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (EXPR.Variable, EXPR.Assign)) and node.depth >= 0:
+            found.append((node.name.offset, node.name.lexeme, node.depth))
+        for slot in node.__slots__:
+            value: Any = getattr(node, slot)
+            children = cast(list[Any], value) if isinstance(value, list) else [value]
+            for child in children:
+                if isinstance(child, (EXPR.Expr, STMT.Stmt)):
+                    stack.append(child)
+    return sorted(found)
+
+
+def summarize(program: Program) -> tuple[list[str], list[tuple[int, str, int]]]:
+    return AstPrinter().print(program), locals_of(program)
+
+
+def full_parse(source: str) -> Program:
+    statements = Parser(RegexScanner(source).iter_tokens()).parse()
+    if not LoxError.had_error:
+        Resolver().resolve_statements(statements)
+    return statements
+
+
+def parse_errors(err: str) -> list[str]:
+    # Scan errors only come from the text the incremental scanner rescanned.
+    return [line for line in err.splitlines() if "] Error: " not in line]
+
+
+def assert_same_as_full_parse(
+    program: Program, source: str, err: str, capfd: pytest.CaptureFixture[str]
+) -> None:
+    LoxError.had_error = False
+    expected = full_parse(source)
+    expected_err = capfd.readouterr().err
+    assert parse_errors(err) == parse_errors(expected_err)
+    if not LoxError.had_error:
+        assert summarize(program) == summarize(expected)
+
+
+source = """\
+var a = 1;
+fun add(x, y) {
+  var z = x + y;
+  return z + a;
+}
+fun twice(f, x) {
+  fun inner() { return f(f(x)); }
+  return inner();
+}
+if (a > 0) print add(1, 2);
+else print "no";
+print twice(add, 3);
+"""
+
+
+def test_parse(capfd: pytest.CaptureFixture[str]) -> None:
+    parser = IncrementalParser(source)
+    assert_same_as_full_parse(parser.program(), source, capfd.readouterr().err, capfd)
+
+
+def test_edit_reuses_untouched_declarations(monkeypatch: pytest.MonkeyPatch) -> None:
+    parser = IncrementalParser(source)
+    before = parser.program()
+
+    resolved: list[STMT.Stmt] = []
+    resolve = Resolver.resolve_statements
+
+    def record(self: Resolver, statements: list[STMT.Stmt]) -> None:
+        resolved.extend(statement for statement in statements if statement in before)
+        resolve(self, statements)
+
+    monkeypatch.setattr(Resolver, "resolve_statements", record)
+    after = parser.edit(source.index("x + y"), 1, "y")
+    assert after[0] is before[0]
+    assert after[1] is not before[1]
+    assert all(new is old for new, old in zip(after[2:], before[2:]))
+
+    # The others are not resolved again and keep the depths on their nodes.
+    assert resolved == []
+    assert locals_of(after[2:]) == locals_of(before[2:])
+
+
+def test_edit_following_token(capfd: pytest.CaptureFixture[str]) -> None:
+    # The if statement ends where it does because of the token after it.
+    text = "if (true) print 1; print 2;"
+    parser = IncrementalParser(text)
+    program = parser.edit(text.index("print 2"), 0, "else ")
+    assert_same_as_full_parse(program, parser.source, capfd.readouterr().err, capfd)
+
+
+def test_edit_sequence_random(capfd: pytest.CaptureFixture[str]) -> None:
+    pieces = [*"(){};=+ \n", "x", "y", "1", "var", "fun", "return", "print", "if"]
+    pieces += ["else", "a"]
+    rng = random.Random(1)
+    parser = IncrementalParser(source)
+    capfd.readouterr()
+    for _ in range(300):
+        LoxError.had_error = False
+        current = parser.source
+        offset = rng.randrange(len(current) + 1)
+        removed = rng.randrange(min(4, len(current) - offset) + 1)
+        inserted = "".join(rng.choice(pieces) for _ in range(rng.randrange(3)))
+        program = parser.edit(offset, removed, inserted)
+        err = capfd.readouterr().err
+        assert_same_as_full_parse(program, parser.source, err, capfd)
@@ -0,0 +1,65 @@
+from bisect import bisect_left
+
+from lox_line_index import LineIndex
+from lox_regex_scanner import RegexScanner
+from lox_token import Token
+
+
+class IncrementalScanner:
+    # The scanner never looks more than two characters past a lexeme ("1."
+    # followed by a digit), so a token ending this far before an edit is
+    # unaffected by it.
+    __LOOKAHEAD = 2
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        # Shared by every token and edited in place, so tokens never need their
+        # lines updated.
+        self.__lines = LineIndex(source)
+        self.tokens = RegexScanner(source, 0, self.__lines).scanTokens()
+
+    def edit(self, offset: int, removed: int, inserted: str) -> list[Token]:
+        old_tokens = self.tokens
+        source = self.source[:offset] + inserted + self.source[offset + removed :]
+        delta = len(inserted) - removed
+        damage_end = offset + len(inserted)
+        self.__lines.edit(offset, removed, inserted)
+
+        # Restart at the end of the last token the edit cannot have changed.
+        # Token boundaries are always outside strings and comments.
+        first = bisect_left(
+            old_tokens,
+            offset,
+            key=lambda t: t.offset + len(t.lexeme) + self.__LOOKAHEAD,
+        )
+        start = 0
+        if first > 0:
+            previous = old_tokens[first - 1]
+            start = previous.offset + len(previous.lexeme)
+
+        # Old tokens past the removed text are candidates for resynchronizing.
+        old = bisect_left(old_tokens, offset + removed, key=lambda t: t.offset)
+
+        tokens = old_tokens[:first]
+        for token in RegexScanner(source, start, self.__lines).iter_tokens():
+            if token.offset >= damage_end:
+                while old_tokens[old].offset + delta < token.offset:
+                    old += 1
+                match = old_tokens[old]
+                if (
+                    match.offset + delta == token.offset
+                    and match.token_type == token.token_type
+                    and match.lexeme == token.lexeme
+                ):
+                    # The rest of the source is unchanged from here on, so the
+                    # old tail is reused in place with shifted offsets.
+                    tail = old_tokens[old:]
+                    for reused in tail:
+                        reused.offset += delta
+                    tokens.extend(tail)
+                    break
+            tokens.append(token)
+
+        self.source = source
+        self.tokens = tokens
+        return tokens
@@ -0,0 +1,72 @@
+import random
+from typing import Any
+
+import pytest
+from lox_incremental_scanner import IncrementalScanner
+from lox_regex_scanner import RegexScanner
+from lox_token import Token
+
+
+def summarize(tokens: list[Token]) -> list[tuple[Any, ...]]:
+    return [(t.token_type, t.lexeme, t.literal, t.line, t.offset) for t in tokens]
+
+
+source = """\
+var a = 1.5;
+// a comment with "quotes"
+fun add(a, b) {
+  return a + b; // trailing
+}
+print "multi
+line";
+print add(a, 2);
+"""
+
+edits: list[tuple[int, int, str]] = [
+    (0, 0, "// "),
+    (0, 3, "fun"),
+    (9, 0, "23"),
+    (10, 0, "."),
+    (11, 0, "5"),
+    (13, 2, ""),
+    (13, 0, "/"),
+    (source.index("add("), 3, "plus"),
+    (source.index("return"), 0, '"'),
+    (source.index('"multi'), 1, ""),
+    (source.index("line"), 0, "\n\n"),
+    (source.index("}"), 1, "}\n}"),
+    (len(source), 0, "print 1;"),
+    (0, len(source), ""),
+]
+
+
+@pytest.mark.parametrize("offset, removed, inserted", edits)
+def test_edit(offset: int, removed: int, inserted: str) -> None:
+    scanner = IncrementalScanner(source)
+    tokens = scanner.edit(offset, removed, inserted)
+
+    edited = source[:offset] + inserted + source[offset + removed :]
+    assert scanner.source == edited
+    assert summarize(tokens) == summarize(RegexScanner(edited).scanTokens())
+
+
+def test_edit_sequence_random() -> None:
+    pieces = [*'(){};.=+ \n"/', "//", "1", "2.5", "var", "x", "print"]
+    rng = random.Random(1)
+    scanner = IncrementalScanner(source)
+    for _ in range(500):
+        current = scanner.source
+        offset = rng.randrange(len(current) + 1)
+        removed = rng.randrange(min(4, len(current) - offset) + 1)
+        inserted = "".join(rng.choice(pieces) for _ in range(rng.randrange(3)))
+        tokens = scanner.edit(offset, removed, inserted)
+        expected = RegexScanner(scanner.source).scanTokens()
+        assert summarize(tokens) == summarize(expected)
+
+
+def test_edit_reuses_tail() -> None:
+    scanner = IncrementalScanner(source)
+    tail = scanner.tokens[-5]
+    tokens = scanner.edit(0, 0, "\n")
+    assert tokens[-5] is tail
+    assert tail.line == summarize(RegexScanner(scanner.source).scanTokens())[-5][3]
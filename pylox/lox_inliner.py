@@ -0,0 +1,233 @@
+from typing import Any, Iterator, Optional, cast
+
+from lox_token import TokenType as TT
+import lox_expr as EXPR
+import lox_stmt as STMT
+
+# The most nodes the returned expression of a function may have for calls to
+# it to be inlined.
+MAX_NODES = 16
+
+
+def _nodes(roots: list[Any]) -> Iterator[Any]:
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        yield node
+        for slot in node.__slots__:
+            value: Any = getattr(node, slot)
+            children = cast(list[Any], value) if isinstance(value, list) else [value]
+            for child in children:
+                if isinstance(child, (EXPR.Expr, STMT.Stmt)):
+                    stack.append(child)
+
+
+def _inlinable_body(function: STMT.Function) -> Optional[EXPR.Expr]:
+    # The expression function returns, if its body is a single return of an
+    # expression that reads only its parameters and globals and neither
+    # assigns nor calls anything. Without calls it cannot be recursive, and
+    # nothing can run between reading the arguments and using them.
+    if function.tokens is not None or len(function.body) != 1:
+        return None
+    body = function.body[0]
+    if not isinstance(body, STMT.Return):
+        return None
+    value = EXPR.Literal(None) if body.value is None else body.value
+
+    nodes = list(_nodes([value]))
+    if len(nodes) > MAX_NODES:
+        return None
+    for node in nodes:
+        if isinstance(node, (EXPR.Assign, EXPR.Call, EXPR.Inline)):
+            return None
+        if isinstance(node, EXPR.Variable) and node.depth > 0:
+            return None
+    return value
+
+
+def _is_trivial(argument: EXPR.Expr) -> bool:
+    # Literals and locals may be read where the parameter is, however often:
+    # neither can fail, and nothing in the body can change a local.
+    if isinstance(argument, EXPR.Literal):
+        return True
+    return isinstance(argument, EXPR.Variable) and argument.depth >= 0
+
+
+class Inliner(EXPR.Visitor[EXPR.Expr], STMT.Visitor[None]):
+    # Replaces calls to small top-level functions with the expression they
+    # return, the parameters replaced by the arguments, rewriting statements
+    # in place. Only functions declared once and never assigned to are
+    # inlined, at calls whose arguments are literals or locals. The call is
+    # kept in an Inline node and still made if the global no longer holds
+    # the function when it runs, as when a later line in the prompt
+    # declares it again. Runs after the resolver.
+
+    def __init__(self) -> None:
+        self.__functions: dict[str, tuple[STMT.Function, EXPR.Expr]] = {}
+
+    def inline(self, statements: list[STMT.Stmt]) -> list[STMT.Stmt]:
+        self.__functions = self.__find_functions(statements)
+        if len(self.__functions) == 0:
+            return statements
+
+        for statement in statements:
+            try:
+                self.__inline_statement(statement)
+            except RecursionError:
+                # Too deep to look into. What was inlined so far is still valid.
+                pass
+        return statements
+
+    def __find_functions(
+        self, statements: list[STMT.Stmt]
+    ) -> dict[str, tuple[STMT.Function, EXPR.Expr]]:
+        declarations: dict[str, int] = {}
+        for statement in statements:
+            if isinstance(statement, (STMT.Function, STMT.Var)):
+                name = statement.name.lexeme
+                declarations[name] = declarations.get(name, 0) + 1
+
+        functions: dict[str, tuple[STMT.Function, EXPR.Expr]] = {}
+        for statement in statements:
+            if not isinstance(statement, STMT.Function):
+                continue
+            body = _inlinable_body(statement)
+            if body is not None and declarations[statement.name.lexeme] == 1:
+                functions[statement.name.lexeme] = (statement, body)
+
+        for node in _nodes(list(statements)):
+            if isinstance(node, EXPR.Assign) and node.depth < 0:
+                functions.pop(node.name.lexeme, None)
+            elif isinstance(node, STMT.Function) and node.tokens is not None:
+                # Not parsed yet: look for anything that could be an
+                # assignment to a global.
+                for name, equal in zip(node.tokens, node.tokens[1:]):
+                    if equal.token_type == TT.EQUAL:
+                        functions.pop(name.lexeme, None)
+        return functions
+
+    def __inline(self, expr: EXPR.Expr) -> EXPR.Expr:
+        return self.expr_visitors[type(expr)](self, expr)
+
+    def __inline_optional(self, expr: Optional[EXPR.Expr]) -> Optional[EXPR.Expr]:
+        return None if expr is None else self.__inline(expr)
+
+    def __inline_statement(self, stmt: STMT.Stmt) -> None:
+        self.stmt_visitors[type(stmt)](self, stmt)
+
+    def __substitute(
+        self, expr: EXPR.Expr, arguments: dict[str, EXPR.Expr]
+    ) -> EXPR.Expr:
+        # A copy of expr with the parameters, the only locals a body can
+        # read, replaced by copies of the arguments.
+        if isinstance(expr, EXPR.Variable) and expr.depth == 0:
+            expr = arguments[expr.name.lexeme]
+        if isinstance(expr, EXPR.Literal):
+            return EXPR.Literal(expr.value)
+        if isinstance(expr, EXPR.Variable):
+            return EXPR.Variable(expr.name, expr.depth)
+        if isinstance(expr, EXPR.Grouping):
+            return EXPR.Grouping(self.__substitute(expr.expression, arguments))
+        if isinstance(expr, EXPR.Unary):
+            return EXPR.Unary(expr.operator, self.__substitute(expr.right, arguments))
+        if isinstance(expr, EXPR.Binary):
+            left = self.__substitute(expr.left, arguments)
+            right = self.__substitute(expr.right, arguments)
+            return EXPR.Binary(left, expr.operator, right)
+        if isinstance(expr, EXPR.Logical):
+            left = self.__substitute(expr.left, arguments)
+            right = self.__substitute(expr.right, arguments)
+            return EXPR.Logical(left, expr.operator, right)
+        # _inlinable_body lets no other nodes through.
+        raise TypeError(f"Cannot substitute into {type(expr).__name__}")
+
+    def visit_block_stmt(self, stmt: STMT.Block) -> None:
+        for statement in stmt.statements:
+            self.__inline_statement(statement)
+
+    def visit_expression_stmt(self, stmt: STMT.Expression) -> None:
+        stmt.expression = self.__inline(stmt.expression)
+
+    def visit_for_stmt(self, stmt: STMT.For) -> None:
+        if stmt.initializer is not None:
+            self.__inline_statement(stmt.initializer)
+        stmt.condition = self.__inline_optional(stmt.condition)
+        stmt.increment = self.__inline_optional(stmt.increment)
+        self.__inline_statement(stmt.body)
+
+    def visit_function_stmt(self, stmt: STMT.Function) -> None:
+        # A lazy body is not there yet and stays as it is.
+        for statement in stmt.body:
+            self.__inline_statement(statement)
+
+    def visit_if_stmt(self, stmt: STMT.If) -> None:
+        stmt.condition = self.__inline(stmt.condition)
+        self.__inline_statement(stmt.then_branch)
+        if stmt.else_branch is not None:
+            self.__inline_statement(stmt.else_branch)
+
+    def visit_print_stmt(self, stmt: STMT.Print) -> None:
+        stmt.expression = self.__inline(stmt.expression)
+
+    def visit_return_stmt(self, stmt: STMT.Return) -> None:
+        stmt.value = self.__inline_optional(stmt.value)
+
+    def visit_var_stmt(self, stmt: STMT.Var) -> None:
+        stmt.initializer = self.__inline_optional(stmt.initializer)
+
+    def visit_while_stmt(self, stmt: STMT.While) -> None:
+        stmt.condition = self.__inline(stmt.condition)
+        self.__inline_statement(stmt.body)
+
+    def visit_assign_expr(self, expr: EXPR.Assign) -> EXPR.Expr:
+        expr.value = self.__inline(expr.value)
+        return expr
+
+    def visit_binary_expr(self, expr: EXPR.Binary) -> EXPR.Expr:
+        expr.left = self.__inline(expr.left)
+        expr.right = self.__inline(expr.right)
+        return expr
+
+    def visit_call_expr(self, expr: EXPR.Call) -> EXPR.Expr:
+        expr.callee = self.__inline(expr.callee)
+        expr.arguments = [self.__inline(argument) for argument in expr.arguments]
+
+        callee = expr.callee
+        if not (isinstance(callee, EXPR.Variable) and callee.depth < 0):
+            return expr
+        if callee.name.lexeme not in self.__functions:
+            return expr
+        function, body = self.__functions[callee.name.lexeme]
+        if len(expr.arguments) != len(function.params):
+            # Left to fail at run time.
+            return expr
+        if not all(_is_trivial(argument) for argument in expr.arguments):
+            return expr
+
+        arguments = {
+            param.lexeme: argument
+            for param, argument in zip(function.params, expr.arguments)
+        }
+        return EXPR.Inline(expr, function.name, self.__substitute(body, arguments))
+
+    def visit_grouping_expr(self, expr: EXPR.Grouping) -> EXPR.Expr:
+        expr.expression = self.__inline(expr.expression)
+        return expr
+
+    def visit_inline_expr(self, expr: EXPR.Inline) -> EXPR.Expr:
+        return expr
+
+    def visit_literal_expr(self, expr: EXPR.Literal) -> EXPR.Expr:
+        return expr
+
+    def visit_logical_expr(self, expr: EXPR.Logical) -> EXPR.Expr:
+        expr.left = self.__inline(expr.left)
+        expr.right = self.__inline(expr.right)
+        return expr
+
+    def visit_unary_expr(self, expr: EXPR.Unary) -> EXPR.Expr:
+        expr.right = self.__inline(expr.right)
+        return expr
+
+    def visit_variable_expr(self, expr: EXPR.Variable) -> EXPR.Expr:
+        return expr
@@ -0,0 +1,202 @@
+import random
+
+import pytest
+from lox_error import LoxError
+from lox_ast_printer import AstPrinter
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_constant_folder import ConstantFolder
+from lox_inliner import Inliner
+from lox_pass_manager import LEVELS, verify
+from lox_pass_testing import run
+import lox_interpreter_test
+import lox_stmt as STMT
+
+
+def parse(source: str, lazy: bool = False) -> list[STMT.Stmt]:
+    statements = Parser(RegexScanner(source).iter_tokens(), lazy, Resolver()).parse()
+    assert LoxError.had_error is False
+    return statements
+
+
+def inline(source: str, lazy: bool = False) -> list[str]:
+    statements = Inliner().inline(ConstantFolder().fold(parse(source, lazy)))
+    verify("inline", statements)
+    return AstPrinter().print(statements)
+
+
+square = "fun sq(x) { return x * x; }"
+
+inlinings = [
+    (square + " print sq(3);", "(print (inline (call sq 3.0) (* 3.0 3.0)))"),
+    (square + " print sq(-3);", "(print (inline (call sq -3.0) (* -3.0 -3.0)))"),
+    (
+        square + " { var a = 2; print sq(a); }",
+        "(block (vardecl a 2.0) (print (inline (call sq a) (* a a))))",
+    ),
+    (
+        "var g = 1; fun f(x, y) { return y - x + g; } print f(1, 2);",
+        "(print (inline (call f 1.0 2.0) (+ (- 2.0 1.0) g)))",
+    ),
+    ("fun f(x) { return 1; } print f(2);", "(print (inline (call f 2.0) 1.0))"),
+    ("fun f() { return; } print f();", "(print (inline (call f) nil))"),
+    (
+        "fun f(x) { return x or y; } print f(nil);",
+        "(print (inline (call f nil) (or nil y)))",
+    ),
+    (
+        square + " fun g(a) { for (;;) print sq(a); }",
+        "(function g a (for nil nil nil (print (inline (call sq a) (* a a)))))",
+    ),
+    (
+        # The body reads the global x, not the local one of the call.
+        "fun f() { return x; } { var x = 1; print f(); }",
+        "(block (vardecl x 1.0) (print (inline (call f) x)))",
+    ),
+    (
+        square + " print sq(sq(2));",
+        "(print (call sq (inline (call sq 2.0) (* 2.0 2.0))))",
+    ),
+]
+
+
+@pytest.mark.parametrize("source, expected", inlinings)
+def test_inline(source: str, expected: str) -> None:
+    assert inline(source)[-1] == expected
+
+
+kept = [
+    # Calls that are not to a candidate function.
+    square + " print sq(g);",
+    square + " print sq(f());",
+    square + " print sq(1, 2);",
+    square + " { fun sq(x) { return x; } print sq(1); }",
+    square + " fun f(sq) { return sq(1); }",
+    "{ " + square + " print sq(1); }",
+    # Functions that cannot be inlined.
+    square + " sq = nil; print sq(1);",
+    square + " fun f() { sq = nil; } print sq(1);",
+    square + " var sq; print sq(1);",
+    square + " fun sq(x) { return x; } print sq(1);",
+    "fun f(x) { return f(x); } print f(1);",
+    "fun f(x) { return g(x); } print f(1);",
+    "fun f(x) { return x = 1; } print f(1);",
+    "fun f(x) { print x; return x; } print f(1);",
+    "fun f(x) { return " + " + ".join(["x"] * 9) + "; } print f(1);",
+]
+
+
+@pytest.mark.parametrize("source", kept)
+def test_kept(source: str) -> None:
+    assert "inline" not in " ".join(inline(source))
+
+
+def test_lazy() -> None:
+    # Bodies not parsed yet are neither inlined nor inlined into, and any
+    # assignment in them counts.
+    assert inline(square + " print sq(2);", lazy=True)[-1] == "(print (call sq 2.0))"
+    source = square + " fun f() { sq = nil; } print sq(2);"
+    assert inline(source, lazy=True)[-1] == "(print (call sq 2.0))"
+
+
+def same_output(sources: list[str], capfd: pytest.CaptureFixture[str]) -> bool:
+    return run(sources, LEVELS[2], capfd) == run(sources, [], capfd)
+
+
+@pytest.mark.parametrize(
+    "sources",
+    [
+        # The guard finds another function or none at all.
+        [
+            square + " fun f() { return sq(3); } print f();",
+            "fun sq(x) { return x; } print f();",
+        ],
+        [square + " fun f() { return sq(3); }", "var sq = 1; print f();"],
+        ["fun f() { return sq(3); } print f(); " + square],
+        # Errors happen where they would in the call.
+        ["fun f(x) { return x + y; } print f(1);"],
+        ["fun f(x, y) { return x < y; } { var a = nil; print f(a, 1); }"],
+    ],
+)
+def test_guard(sources: list[str], capfd: pytest.CaptureFixture[str]) -> None:
+    assert same_output(sources, capfd)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [case[0] for case in lox_interpreter_test.statements if not case[3]]
+    + [source for source, _ in inlinings]
+    + kept,
+)
+def test_same_output(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    assert same_output([source], capfd)
+
+
+def program(rng: random.Random, first: bool) -> str:
+    # Random programs with small helpers over parameters and globals, called
+    # with all kinds of arguments from globals, blocks, loops and functions.
+    # Helper i takes i % 3 parameters. The first program declares them all;
+    # any may declare one again or assign to one.
+    def expression(depth: int, names: str) -> str:
+        choice = rng.randrange(13 if depth > 0 else 7)
+        if choice < 7:
+            odd = rng.choice(["nil", '"s"'])
+            return ["1", "2", odd, rng.choice(names), rng.choice(names), "g", "g"][
+                choice
+            ]
+        if choice < 9:
+            return call(depth - 1, names)
+        if choice == 9:
+            return "-" + expression(depth - 1, names)
+        operator = ["+", "<", "or", "=="][choice - 9]
+        left, right = expression(depth - 1, names), expression(depth - 1, names)
+        return f"({left} {operator} {right})"
+
+    def call(depth: int, names: str) -> str:
+        i = rng.randrange(4)
+        count = i % 3 if rng.random() < 0.9 else rng.randrange(3)
+        return f"h{i}({', '.join(expression(depth, names) for _ in range(count))})"
+
+    def helper(i: int) -> str:
+        params = ["", "p", "p, q"][i % 3]
+        names = params.replace(", ", "") or "g"
+        body = expression(2, names) if rng.random() < 0.9 else call(1, names)
+        return f"fun h{i}({params}) {{ return {body}; }}"
+
+    def statement(depth: int) -> str:
+        choice = rng.randrange(9 if depth > 0 else 5)
+        if choice < 2:
+            return f"print {call(2, 'ab')};"
+        if choice == 2:
+            return f"var {rng.choice('ab')} = {expression(1, 'ab')};"
+        if choice == 3:
+            if rng.random() < 0.1:
+                target = rng.randrange(4)
+                value = rng.choice(["nil", "h0", "h1", "h2", "h3"])
+                return f"h{target} = {value};"
+            return f"{rng.choice('abg')} = {expression(1, 'ab')};"
+        if choice == 4:
+            if rng.random() < 0.1:
+                return helper(rng.randrange(4))
+            return f"print {expression(2, 'ab')};"
+        body = " ".join(statement(depth - 1) for _ in range(rng.randrange(4)))
+        if choice == 5:
+            return f"{{ var a = 1; var b = 2; {body} }}"
+        if choice == 6:
+            return f"for (var i = 0; i < 2; i = i + 1) {{ var b = i; {body} }}"
+        if choice == 7:
+            return f"fun f(a, b) {{ {body} }} f(1, 2);"
+        return f"if ({expression(1, 'ab')}) {{ {body} }}"
+
+    parts = ["var g = 1; var a = 1; var b = 2;"] if first else []
+    parts += [helper(i) for i in range(4) if first]
+    parts += [statement(3) for _ in range(rng.randrange(1, 6))]
+    return " ".join(parts)
+
+
+def test_same_output_random(capfd: pytest.CaptureFixture[str]) -> None:
+    rng = random.Random(1)
+    for _ in range(500):
+        sources = [program(rng, i == 0) for i in range(rng.randrange(1, 3))]
+        assert same_output(sources, capfd), sources
@@ -1,4 +1,6 @@
-from typing import Any
+import itertools
+import operator
+from typing import Any, cast
 
 from lox_error import LoxError
 from lox_runtime_error import LoxRuntimeError
@@ -9,15 +11,64 @@ from lox_environment import Environment
 from lox_callable import LoxCallable, Clock
 from lox_function import LoxFunction
 from lox_return import ReturnException
+from lox_parser import Parser
+from lox_resolver import Resolver
 
 # TODO: use operator module
 
+_COMPARISONS = {
+    TT.GREATER: operator.gt,
+    TT.GREATER_EQUAL: operator.ge,
+    TT.LESS: operator.lt,
+    TT.LESS_EQUAL: operator.le,
+}
+
+
+def _may_assign(node: Any, name: str) -> bool:
+    # Whether anything under node could assign to a variable called name.
+    if isinstance(node, EXPR.Assign) and node.name.lexeme == name:
+        return True
+    if isinstance(node, STMT.Function) and node.tokens is not None:
+        return any(token.lexeme == name for token in node.tokens)
+    if isinstance(node, (EXPR.Expr, STMT.Stmt)):
+        return any(_may_assign(getattr(node, slot), name) for slot in node.__slots__)
+    if isinstance(node, list):
+        return any(_may_assign(child, name) for child in cast(list[Any], node))
+    return False
+
+
+def _is_counted_loop(stmt: STMT.For) -> bool:
+    # for (var i = a; i < b; i = i + step) where nothing else assigns to i.
+    # i is then always the number the loop itself last stored.
+    initializer, condition, increment = stmt.initializer, stmt.condition, stmt.increment
+    if not isinstance(initializer, STMT.Var):
+        return False
+    name = initializer.name.lexeme
+    try:
+        return (
+            isinstance(condition, EXPR.Binary)
+            and condition.operator.token_type in _COMPARISONS
+            and isinstance(condition.left, EXPR.Variable)
+            and condition.left.name.lexeme == name
+            and isinstance(increment, EXPR.Assign)
+            and increment.name.lexeme == name
+            and isinstance(increment.value, EXPR.Binary)
+            and increment.value.operator.token_type in (TT.PLUS, TT.MINUS)
+            and isinstance(increment.value.left, EXPR.Variable)
+            and increment.value.left.name.lexeme == name
+            and isinstance(increment.value.right, EXPR.Literal)
+            and isinstance(increment.value.right.value, float)
+            and not _may_assign(condition.right, name)
+            and not _may_assign(stmt.body, name)
+        )
+    except RecursionError:
+        return False
+
 
 class Interpreter(EXPR.Visitor[Any], STMT.Visitor[None]):
     def __init__(self) -> None:
         self.__globals = Environment()
         self.__environment = self.__globals
-        self.__locals: dict[EXPR.Expr, int] = {}
 
         self.__globals.define("clock", Clock())
 
@@ -29,13 +80,24 @@ class Interpreter(EXPR.Visitor[Any], STMT.Visitor[None]):
             LoxError.runtime_error(e)
 
     def __evaluate(self, expr: EXPR.Expr) -> Any:
-        return expr.accept(self)
+        return self.expr_visitors[type(expr)](self, expr)
 
     def __execute(self, stmt: STMT.Stmt) -> None:
-        stmt.accept(self)
-
-    def resolve(self, expr: EXPR.Expr, depth: int) -> None:
-        self.__locals[expr] = depth
+        self.stmt_visitors[type(stmt)](self, stmt)
+
+    def load_body(self, function: STMT.Function) -> None:
+        assert function.tokens is not None
+        eof = Token(TT.EOF, "", None, function.tokens[-1].line)
+        tokens = itertools.chain(function.tokens, [eof])
+        function.body = Parser(tokens, lazy=True).function_body()
+        assert function.scopes is not None
+        if not LoxError.had_error:
+            Resolver().resolve_body(function, function.scopes)
+        if LoxError.had_error:
+            raise LoxRuntimeError(function.name, "Error in function body.")
+
+        function.tokens = None
+        function.scopes = None
 
     def execute_block(self, statements: list[STMT.Stmt], environment: Environment) -> None:
         previous = self.__environment
@@ -54,6 +116,66 @@ class Interpreter(EXPR.Visitor[Any], STMT.Visitor[None]):
     def visit_expression_stmt(self, stmt: STMT.Expression) -> None:
         self.__evaluate(stmt.expression)
 
+    def visit_for_stmt(self, stmt: STMT.For) -> None:
+        if stmt.initializer is None:
+            self.__loop(stmt)
+            return
+
+        previous = self.__environment
+        try:
+            self.__environment = Environment(previous)
+            self.__execute(stmt.initializer)
+
+            counted = stmt.counted
+            if counted is None:
+                counted = stmt.counted = _is_counted_loop(stmt)
+            if counted:
+                self.__counted_loop(stmt)
+            else:
+                self.__loop(stmt)
+        finally:
+            self.__environment = previous
+
+    def __loop(self, stmt: STMT.For) -> None:
+        while stmt.condition is None or self.__is_truthy(
+            self.__evaluate(stmt.condition)
+        ):
+            self.__execute(stmt.body)
+            if stmt.increment is not None:
+                self.__evaluate(stmt.increment)
+
+    def __counted_loop(self, stmt: STMT.For) -> None:
+        # Keeps the counter in a Python variable and only stores it for the
+        # body to read. The limit is evaluated on every iteration, as the
+        # condition would be.
+        initializer, condition = stmt.initializer, stmt.condition
+        increment = stmt.increment
+        assert isinstance(initializer, STMT.Var)
+        assert isinstance(condition, EXPR.Binary)
+        assert isinstance(increment, EXPR.Assign)
+        assert isinstance(increment.value, EXPR.Binary)
+        assert isinstance(increment.value.right, EXPR.Literal)
+
+        name = initializer.name.lexeme
+        compare = _COMPARISONS[condition.operator.token_type]
+        limit = condition.right
+        step = increment.value.right.value
+        if increment.value.operator.token_type == TT.MINUS:
+            step = -step
+
+        environment = self.__environment
+        body = stmt.body
+        counter = environment.get_at(0, name)
+        while True:
+            bound = self.__evaluate(limit)
+            if not (isinstance(counter, float) and isinstance(bound, float)):
+                raise LoxRuntimeError(condition.operator, "Operands must be numbers.")
+            if not compare(counter, bound):
+                return
+            self.__execute(body)
+            counter += step
+            environment.define(name, counter)
+
     def visit_function_stmt(self, stmt: "STMT.Function") -> None:
         function = LoxFunction(stmt, self.__environment)
         self.__environment.define(stmt.name.lexeme, function)
@@ -88,9 +210,8 @@ class Interpreter(EXPR.Visitor[Any], STMT.Visitor[None]):
 
     def visit_assign_expr(self, expr: EXPR.Assign) -> Any:
         value = self.__evaluate(expr.value)
-        if expr in self.__locals:
-            distance = self.__locals[expr]
-            self.__environment.assign_at(distance, expr.name, value)
+        if expr.depth >= 0:
+            self.__environment.assign_at(expr.depth, expr.name, value)
         else:
             self.__globals.assign(expr.name, value)
         return value
@@ -159,6 +280,12 @@ class Interpreter(EXPR.Visitor[Any], STMT.Visitor[None]):
     def visit_grouping_expr(self, expr: EXPR.Grouping) -> Any:
         return self.__evaluate(expr.expression)
 
+    def visit_inline_expr(self, expr: EXPR.Inline) -> Any:
+        callee = self.__evaluate(expr.call.callee)
+        if isinstance(callee, LoxFunction) and callee.declaration.name is expr.declared:
+            return self.__evaluate(expr.body)
+        return self.visit_call_expr(expr.call)
+
     def visit_literal_expr(self, expr: EXPR.Literal) -> Any:
         return expr.value
 
@@ -187,13 +314,10 @@ class Interpreter(EXPR.Visitor[Any], STMT.Visitor[None]):
         return None
 
     def visit_variable_expr(self, expr: EXPR.Variable) -> Any:
-        return self.__lookup_variable(expr.name, expr)
-
-    def __lookup_variable(self, name: Token, expr: EXPR.Expr) -> Any:
-        if expr in self.__locals:
-            return self.__environment.get_at(self.__locals[expr], name.lexeme)
+        if expr.depth >= 0:
+            return self.__environment.get_at(expr.depth, expr.name.lexeme)
         else:
-            return self.__globals.get(name)
+            return self.__globals.get(expr.name)
 
     def __check_number_operand(self, operator: Token, operand: Any) -> None:
         if isinstance(operand, float):
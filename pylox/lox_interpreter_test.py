@@ -1,4 +1,4 @@
-from typing import Generator
+import pathlib
 
 import pytest
 from lox_error import LoxError
@@ -6,13 +6,8 @@ from lox_scanner import Scanner
 from lox_parser import Parser
 from lox_resolver import Resolver
 from lox_interpreter import Interpreter
-
-
-@pytest.fixture(autouse=True)
-def clear_error() -> Generator[None, None, None]:
-    yield
-    LoxError.had_error = False
-    LoxError.had_runtime_error = False
+from lox import Lox
+import lox_stmt as STMT
 
 
 statements: list[tuple[str, str, str, bool, bool]] = [
@@ -25,8 +20,8 @@ statements: list[tuple[str, str, str, bool, bool]] = [
     ("print nil;", "nil", "", False, False),
     ("print -1;", "-1", "", False, False),
     ("print --1;", "1", "", False, False),
-    ("print -true;", "", "Operand must be a number.\n[line 1]", False, True),
-    ('print -"aaa";', "", "Operand must be a number.\n[line 1]", False, True),
+    ("print -true;", "", "Operand must be a number.\n[line 1:7]", False, True),
+    ('print -"aaa";', "", "Operand must be a number.\n[line 1:7]", False, True),
     ("print !nil;", "true", "", False, False),
     ("print !true;", "false", "", False, False),
     ("print !false;", "true", "", False, False),
@@ -37,40 +32,40 @@ statements: list[tuple[str, str, str, bool, bool]] = [
     (
         'print 2+"aaa";',
         "",
-        "Operands must be two numbers or two strings.\n[line 1]",
+        "Operands must be two numbers or two strings.\n[line 1:8]",
         False,
         True,
     ),
     (
         'print "aaa"+2;',
         "",
-        "Operands must be two numbers or two strings.\n[line 1]",
+        "Operands must be two numbers or two strings.\n[line 1:12]",
         False,
         True,
     ),
     ("print 5-3;", "2", "", False, False),
-    ("print 5-true;", "", "Operands must be numbers.\n[line 1]", False, True),
-    ("print nil-3;", "", "Operands must be numbers.\n[line 1]", False, True),
+    ("print 5-true;", "", "Operands must be numbers.\n[line 1:8]", False, True),
+    ("print nil-3;", "", "Operands must be numbers.\n[line 1:10]", False, True),
     ("print 2*3;", "6", "", False, False),
-    ("print nil*3;", "", "Operands must be numbers.\n[line 1]", False, True),
+    ("print nil*3;", "", "Operands must be numbers.\n[line 1:10]", False, True),
     ("print 4/2;", "2", "", False, False),
-    ("print 4/nil;", "", "Operands must be numbers.\n[line 1]", False, True),
+    ("print 4/nil;", "", "Operands must be numbers.\n[line 1:8]", False, True),
     ("print 2>1;", "true", "", False, False),
     ("print 1>2;", "false", "", False, False),
     ("print 1>1;", "false", "", False, False),
-    ("print 1>nil;", "", "Operands must be numbers.\n[line 1]", False, True),
+    ("print 1>nil;", "", "Operands must be numbers.\n[line 1:8]", False, True),
     ("print 2>=1;", "true", "", False, False),
     ("print 1>=2;", "false", "", False, False),
     ("print 1>=1;", "true", "", False, False),
-    ("print 1>=nil;", "", "Operands must be numbers.\n[line 1]", False, True),
+    ("print 1>=nil;", "", "Operands must be numbers.\n[line 1:8]", False, True),
     ("print 1<2;", "true", "", False, False),
     ("print 2<1;", "false", "", False, False),
     ("print 1<1;", "false", "", False, False),
-    ("print 1<nil;", "", "Operands must be numbers.\n[line 1]", False, True),
+    ("print 1<nil;", "", "Operands must be numbers.\n[line 1:8]", False, True),
     ("print 1<=2;", "true", "", False, False),
     ("print 2<=1;", "false", "", False, False),
     ("print 1<=1;", "true", "", False, False),
-    ("print 1<=nil;", "", "Operands must be numbers.\n[line 1]", False, True),
+    ("print 1<=nil;", "", "Operands must be numbers.\n[line 1:8]", False, True),
     ("print 1==1;", "true", "", False, False),
     ("print 2==1;", "false", "", False, False),
     ('print "aaa"=="aaa";', "true", "", False, False),
@@ -101,14 +96,14 @@ statements: list[tuple[str, str, str, bool, bool]] = [
     (
         'print a; var a = "too late!";',
         "",
-        "Undefined variable 'a'.\n[line 1]",
+        "Undefined variable 'a'.\n[line 1:7]",
         False,
         True,
     ),
     (
         "a = 1;",
         "",
-        "Undefined variable 'a'.\n[line 1]",
+        "Undefined variable 'a'.\n[line 1:1]",
         False,
         True,
     ),
@@ -129,7 +124,7 @@ statements: list[tuple[str, str, str, bool, bool]] = [
     (
         "{var a = 1; print a;",
         "",
-        "[line 1] Error at end: Expect '}' after block.",
+        "[line 1:21] Error at end: Expect '}' after block.",
         True,
         False,
     ),
@@ -228,7 +223,7 @@ global c""",
         print a; // Error! No more "a".
         """,
         "",
-        "Undefined variable 'a'.\n[line 4]",
+        "Undefined variable 'a'.\n[line 4:15]",
         False,
         True,
     ),
@@ -263,14 +258,14 @@ global c""",
     (
         "if false) print 1; else print 2;",
         "",
-        "[line 1] Error at 'false': Expect '(' after 'if'.",
+        "[line 1:4] Error at 'false': Expect '(' after 'if'.",
         True,
         False,
     ),
     (
         "if (false print 1; else print 2;",
         "",
-        "[line 1] Error at 'print': Expect ')' after if condition.",
+        "[line 1:11] Error at 'print': Expect ')' after if condition.",
         True,
         False,
     ),
@@ -300,14 +295,14 @@ global c""",
     (
         "var i = 0; while i < 3) {print i; i = i + 1;}",
         "",
-        "[line 1] Error at 'i': Expect '(' after 'while'.",
+        "[line 1:18] Error at 'i': Expect '(' after 'while'.",
         True,
         False,
     ),
     (
         "var i = 0; while (i < 3 {print i; i = i + 1;}",
         "",
-        "[line 1] Error at '{': Expect ')' after condition.",
+        "[line 1:25] Error at '{': Expect ')' after condition.",
         True,
         False,
     ),
@@ -330,14 +325,14 @@ global c""",
     (
         '"totally not a function"();',
         "",
-        "Can only call functions and classes.\n[line 1]",
+        "Can only call functions and classes.\n[line 1:26]",
         False,
         True,
     ),
     (
         "print clock(1);",
         "",
-        "Expected 0 arguments but got 1.\n[line 1]",
+        "Expected 0 arguments but got 1.\n[line 1:14]",
         False,
         True,
     ),
@@ -534,7 +529,7 @@ global c""",
         }
         """,
         "",
-        "[line 3] Error at 'a': Already a variable with this name in this scope.",
+        "[line 3:17] Error at 'a': Already a variable with this name in this scope.",
         True,
         False,
     ),
@@ -543,7 +538,7 @@ global c""",
         return "at top level";
         """,
         "",
-        "[line 1] Error at 'return': Can't return from top-level code.",
+        "[line 1:9] Error at 'return': Can't return from top-level code.",
         True,
         False,
     ),
@@ -578,6 +573,82 @@ global c""",
     #     False,
     #     False,
     # ),
+    (
+        """\
+        for (var i = 3; i > 0; i = i - 1) print i;
+        for (var i = 0; i <= 1; i = i + 0.5) print i;
+        for (var i = 5; i < 3; i = i + 1) print i;
+        """,
+        "3\n2\n1\n0\n0.5\n1",
+        "",
+        False,
+        False,
+    ),
+    (
+        """\
+        var n = 3;
+        for (var i = 0; i < n; i = i + 1) { print i; n = n - 1; }
+        """,
+        "0\n1",
+        "",
+        False,
+        False,
+    ),
+    (
+        """\
+        var f; var g;
+        for (var i = 0; i < 2; i = i + 1) {
+            fun get() { return i; }
+            fun set() { i = 10; }
+            if (i == 0) f = get; else g = set;
+        }
+        print f();
+        """,
+        "2",
+        "",
+        False,
+        False,
+    ),
+    (
+        """\
+        var f;
+        for (var i = 0; i < 3; i = i + 1) {
+            fun get() { return i; }
+            f = get;
+            print i;
+        }
+        print f();
+        """,
+        "0\n1\n2\n3",
+        "",
+        False,
+        False,
+    ),
+    (
+        """\
+        for (var i = 0; i < 5; i = i + 1) { print i; i = i + 2; }
+        for (var i = 0; i < 5; i = i + 1)
+          for (var j = 0; j < i; j = j + 1) print i * 10 + j;
+        """,
+        "0\n3\n10\n20\n21\n30\n31\n32\n40\n41\n42\n43",
+        "",
+        False,
+        False,
+    ),
+    (
+        'for (var i = "a"; i < 3; i = i + 1) print i;',
+        "",
+        "Operands must be numbers.\n[line 1:21]",
+        False,
+        True,
+    ),
+    (
+        'var n = 2; for (var i = 0; i < n; i = i + 1) { print i; n = "x"; }',
+        "0",
+        "Operands must be numbers.\n[line 1:30]",
+        False,
+        True,
+    ),
 ]
 
 
@@ -599,7 +670,7 @@ def test_statements(
         assert had_error
     if not LoxError.had_error:
         interpreter = Interpreter()
-        resolver = Resolver(interpreter)
+        resolver = Resolver()
         resolver.resolve_statements(stmts)
         assert LoxError.had_error == had_error
         if not LoxError.had_error:
@@ -633,3 +704,133 @@ def test_clock(
     assert err.strip() == ""
     assert LoxError.had_error is False
     assert LoxError.had_runtime_error is False
+
+
+@pytest.mark.parametrize(
+    "source, out_expected, err_expected, had_error, had_runtime_error",
+    [case for case in statements if not case[3]],
+)
+def test_statements_lazy(
+    source: str,
+    out_expected: str,
+    err_expected: str,
+    had_error: bool,
+    had_runtime_error: bool,
+    capfd: pytest.CaptureFixture[str],
+) -> None:
+    stmts = Parser(Scanner(source).scanTokens(), lazy=True).parse()
+    assert LoxError.had_error is False
+    interpreter = Interpreter()
+    Resolver().resolve_statements(stmts)
+    interpreter.interpret(stmts)
+
+    out, err = capfd.readouterr()
+    assert out.strip() == out_expected
+    assert err.strip().startswith(err_expected)
+    assert LoxError.had_error is had_error
+    assert LoxError.had_runtime_error is had_runtime_error
+
+
+def test_lazy_body_errors(capfd: pytest.CaptureFixture[str]) -> None:
+    # Resolver errors in a body are found when it is first called.
+    source = """\
+fun unused() { var a; var a; }
+fun broken() { var a; var a; }
+print "before";
+broken();
+print "after";
+"""
+    stmts = Parser(Scanner(source).scanTokens(), lazy=True).parse()
+    assert LoxError.had_error is False
+    interpreter = Interpreter()
+    Resolver().resolve_statements(stmts)
+    interpreter.interpret(stmts)
+
+    out, err = capfd.readouterr()
+    assert out.strip() == "before"
+    assert err.strip() == (
+        "[line 2:27] Error at 'a': Already a variable with this name in this scope.\n"
+        "Error in function body.\n[line 2:5]"
+    )
+    assert LoxError.had_error is True
+    assert LoxError.had_runtime_error is True
+
+
+def test_lazy_syntax_errors(
+    tmp_path: pathlib.Path, capfd: pytest.CaptureFixture[str]
+) -> None:
+    # Syntax errors in a body are reported as by a full parse, before
+    # anything runs.
+    source = 'print "before";\nfun broken() {\n  var;\n}\n'
+    Parser(Scanner(source).scanTokens()).parse()
+    expected = capfd.readouterr().err
+    assert expected == "[line 3:6] Error at ';': Expect variable name.\n"
+    LoxError.had_error = False
+
+    path = tmp_path / "broken.lox"
+    path.write_text(source)
+    with pytest.raises(SystemExit) as raised:
+        Lox.main(["lox.py", "--lazy", "--no-cache", str(path)])
+    assert raised.value.code == 65
+    assert capfd.readouterr() == ("", expected)
+
+
+@pytest.mark.parametrize(
+    "source, options, code",
+    [
+        ("print " + "(" * 1500 + "1" + ")" * 1500 + ";", [], 65),
+        ("print " + "(" * 1500 + "1" + ")" * 1500 + ";", ["--stack-parser"], 65),
+        ('print "before";\nfun f(n) { return f(n + 1); }\nf(0);', [], 70),
+    ],
+)
+def test_too_deep(
+    tmp_path: pathlib.Path,
+    capfd: pytest.CaptureFixture[str],
+    source: str,
+    options: list[str],
+    code: int,
+) -> None:
+    # Running out of Python stack is reported as an error, not a traceback.
+    path = tmp_path / "deep.lox"
+    path.write_text(source)
+    with pytest.raises(SystemExit) as raised:
+        Lox.main(["lox.py", "--no-cache", *options, str(path)])
+    assert raised.value.code == code
+    out, err = capfd.readouterr()
+    assert out == ("before\n" if code == 70 else "")
+    assert err == "Error: Too deeply nested.\n"
+
+
+def test_lazy_body_scopes(capfd: pytest.CaptureFixture[str]) -> None:
+    # A body sees the scopes as they were where the function was declared.
+    source = """\
+var a = "global";
+{
+  fun show() { print a; }
+  show();
+  var a = "local";
+  show();
+}
+"""
+    stmts = Parser(Scanner(source).scanTokens(), lazy=True).parse()
+    block = stmts[1]
+    assert isinstance(block, STMT.Block)
+    function = block.statements[0]
+    assert isinstance(function, STMT.Function) and function.tokens is not None
+    Resolver().resolve_statements(stmts)
+    assert function.scopes is not None
+    Interpreter().interpret(stmts)
+
+    assert capfd.readouterr().out == "global\nglobal\n"
+    # Only the parsed body is kept.
+    assert (function.tokens, function.scopes) == (None, None)
+
+
+def test_counted_on_node() -> None:
+    source = "for (var i = 0; i < 3; i = i + 1) {} for (var i = 0; i < 3;) i = 3;"
+    stmts = Parser(Scanner(source).scanTokens(), resolver=Resolver()).parse()
+    Interpreter().interpret(stmts)
+    assert [stmt.counted for stmt in stmts if isinstance(stmt, STMT.For)] == [
+        True,
+        False,
+    ]
@@ -0,0 +1,67 @@
+import mmap
+import re
+from array import array
+from bisect import bisect_right
+from typing import Optional
+
+
+class LineIndex:
+    # Offsets at which each line starts, recorded once per source on the first
+    # lookup. Lines and columns are only needed for diagnostics, so tokens keep
+    # just an offset and ask the index when an error is reported.
+    __NEWLINE = re.compile("\n")
+    __NEWLINE_BYTES = re.compile(b"\n")
+
+    def __init__(
+        self,
+        source: str | bytes | memoryview | mmap.mmap,
+        line: int = 1,
+        column: int = 1,
+        offset: int = 0,
+    ) -> None:
+        # The position of the first character, for sources that are a slice of
+        # a larger one. Offsets passed in are into the larger one.
+        self.__line = line
+        self.__column = column
+        self.__offset = offset
+        # Columns count characters, so byte sources are kept for decoding.
+        self.__source = source
+        self.__line_starts: Optional["array[int]"] = None
+
+    def line(self, offset: int) -> int:
+        return bisect_right(self.__starts(), offset - self.__offset) + self.__line - 1
+
+    def column(self, offset: int) -> int:
+        offset -= self.__offset
+        starts = self.__starts()
+        index = bisect_right(starts, offset) - 1
+        start = starts[index]
+        if isinstance(self.__source, str):
+            width = offset - start
+        else:
+            width = len(bytes(self.__source[start:offset]).decode("utf-8", "replace"))
+        if index == 0:
+            width += self.__column - 1
+        return width + 1
+
+    def edit(self, offset: int, removed: int, inserted: str) -> None:
+        # Line starts before the edit are kept, the ones in the removed text are
+        # dropped and the ones after it are shifted.
+        offset -= self.__offset
+        starts = self.__starts()
+        first = bisect_right(starts, offset)
+        last = bisect_right(starts, offset + removed)
+        delta = len(inserted) - removed
+        added = [offset + match.end() for match in self.__NEWLINE.finditer(inserted)]
+        starts[first:] = array("q", added + [start + delta for start in starts[last:]])
+
+    def __starts(self) -> "array[int]":
+        if self.__line_starts is None:
+            source = self.__source
+            starts = self.__line_starts = array("q", [0])
+            if isinstance(source, str):
+                starts.extend(match.end() for match in self.__NEWLINE.finditer(source))
+            else:
+                newlines = self.__NEWLINE_BYTES.finditer(source)
+                starts.extend(match.end() for match in newlines)
+        return self.__line_starts
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+from lox_bytes_scanner import BytesScanner
+from lox_line_index import LineIndex
+from lox_regex_scanner import RegexScanner
+from lox_scanner import Scanner
+from lox_token import TokenType as TT
+
+source = 'var a = 1;\n\nprint a;\n  "two\nlines";\n'
+
+
+def naive(source: str, offset: int) -> tuple[int, int]:
+    before = source[:offset]
+    return before.count("\n") + 1, offset - (before.rfind("\n") + 1) + 1
+
+
+@pytest.mark.parametrize("offset", range(len(source) + 1))
+def test_line_and_column(offset: int) -> None:
+    lines = LineIndex(source)
+    assert (lines.line(offset), lines.column(offset)) == naive(source, offset)
+
+
+def test_bytes_columns_count_characters() -> None:
+    text = "é = 1;\nx € y;"
+    lines = LineIndex(text.encode("utf-8"))
+    for offset in range(len(text)):
+        byte_offset = len(text[:offset].encode("utf-8"))
+        assert (lines.line(byte_offset), lines.column(byte_offset)) == naive(
+            text, offset
+        )
+
+
+def test_first_position() -> None:
+    lines = LineIndex("ab\ncd", 5, 3)
+    assert (lines.line(1), lines.column(1)) == (5, 4)
+    assert (lines.line(4), lines.column(4)) == (6, 2)
+
+
+def test_edit_random() -> None:
+    rng = random.Random(1)
+    current = source
+    lines = LineIndex(current)
+    for _ in range(300):
+        offset = rng.randrange(len(current) + 1)
+        removed = rng.randrange(min(4, len(current) - offset) + 1)
+        inserted = "".join(rng.choice("a\n ") for _ in range(rng.randrange(4)))
+        lines.edit(offset, removed, inserted)
+        current = current[:offset] + inserted + current[offset + removed :]
+        for offset in range(len(current) + 1):
+            assert (lines.line(offset), lines.column(offset)) == naive(current, offset)
+
+
+def test_token_positions() -> None:
+    tokens = RegexScanner(source).scanTokens()
+    expected = Scanner(source).scanTokens()
+    assert [(t.line, t.column) for t in tokens] == [
+        (t.line, t.column) for t in expected
+    ]
+    positions = {t.lexeme: (t.line, t.column) for t in tokens}
+    assert positions["print"] == (3, 1)
+    # A string is reported on its last line, at its closing quote.
+    assert positions['"two\nlines"'] == (5, 6)
+
+    buffer = RegexScanner(source).scan_buffer()
+    assert [(buffer.line(i), buffer.column(i)) for i in range(len(buffer))] == [
+        (t.line, t.column) for t in tokens
+    ]
+
+
+@pytest.mark.parametrize(
+    "text", ['print 1 "ab\ncd\nef";', 'print 1 "ab\r\nc€\n€f";', '"\n";']
+)
+def test_string_positions(text: str) -> None:
+    # The line and column of a string spanning lines are those of one
+    # character, its closing quote, for each of the scanners.
+    end = text.rindex('"')
+    expected = naive(text, end)
+    string = [t for t in Scanner(text).scanTokens() if t.token_type == TT.STRING]
+    assert [(t.line, t.column) for t in string] == [expected]
+    for tokens in (
+        RegexScanner(text).scanTokens(),
+        BytesScanner(text.encode("utf-8")).scanTokens(),
+    ):
+        string = [t for t in tokens if t.token_type == TT.STRING]
+        assert [(t.line, t.column) for t in string] == [expected]
+    buffer = RegexScanner(text).scan_buffer()
+    (index,) = [i for i in range(len(buffer)) if buffer.token_type(i) == TT.STRING]
+    assert (buffer.line(index), buffer.column(index)) == expected
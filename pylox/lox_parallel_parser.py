@@ -0,0 +1,134 @@
+import contextlib
+import io
+import os
+import pickle
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from lox_cache import TreePickler, TreeUnpickler
+from lox_error import LoxError
+from lox_line_index import LineIndex
+from lox_parallel_scanner import ParallelScanner
+from lox_parser import Parser
+from lox_token import TokenType as TT
+from lox_token_buffer import Columns, TokenBuffer
+import lox_stmt as STMT
+
+
+def _parse_chunk(
+    chunk: str, columns: Columns, offset: int, line: int, column: int
+) -> Optional[bytes]:
+    # Runs in a worker process. Returns the pickled statements, or None if the
+    # chunk has a syntax error and has to be parsed again by the parent.
+    LoxError.had_error = False
+    lines = LineIndex(chunk, line, column, offset)
+    buffer = TokenBuffer(chunk, lines, offset)
+    buffer.extend(columns)
+    buffer.append(TT.EOF, offset + len(chunk), offset + len(chunk))
+
+    with contextlib.redirect_stderr(io.StringIO()):
+        statements = Parser(iter(buffer)).parse()
+    if LoxError.had_error:
+        return None
+
+    payload = io.BytesIO()
+    try:
+        TreePickler(payload, pickle.HIGHEST_PROTOCOL).dump(statements)
+    except RecursionError:
+        return None
+    return payload.getvalue()
+
+
+class ParallelParser:
+    # Splits the tokens between top-level declarations and parses the pieces in
+    # worker processes. A piece that does not parse cleanly makes the whole
+    # source be parsed again serially, so that errors and recovery are exactly
+    # Parser's.
+    __OPENING = {TT.LEFT_PAREN.value, TT.LEFT_BRACE.value}
+    __CLOSING = {TT.RIGHT_PAREN.value, TT.RIGHT_BRACE.value}
+    __ENDS = {TT.SEMICOLON.value, TT.RIGHT_BRACE.value}
+
+    def __init__(
+        self,
+        source: str,
+        workers: Optional[int] = None,
+        min_chunk: int = 1 << 16,
+    ) -> None:
+        self.__source = source
+        self.__workers = workers or os.cpu_count() or 1
+        # In tokens. Smaller chunks are not worth the cost of starting
+        # processes.
+        self.__min_chunk = min_chunk
+
+    def parse(self) -> list[STMT.Stmt]:
+        source = self.__source
+        buffer = ParallelScanner(source, self.__workers).scan_buffer()
+        types, starts, ends = buffer.columns()
+        bounds = self.__split(types)
+        if len(bounds) <= 2:
+            return Parser(iter(buffer)).parse()
+
+        lines = buffer.lines
+        chunks: list[str] = []
+        columns: list[Columns] = []
+        offsets: list[int] = []
+        first_lines: list[int] = []
+        first_columns: list[int] = []
+        text_ends = [starts[bound] for bound in bounds[1:-1]] + [len(source)]
+        for first, last, text_end in zip(bounds, bounds[1:], text_ends):
+            offset = starts[first]
+            chunks.append(source[offset:text_end])
+            columns.append((types[first:last], starts[first:last], ends[first:last]))
+            offsets.append(offset)
+            first_lines.append(lines.line(offset))
+            first_columns.append(lines.column(offset))
+
+        with ProcessPoolExecutor(len(chunks)) as executor:
+            payloads = list(
+                executor.map(
+                    _parse_chunk, chunks, columns, offsets, first_lines, first_columns
+                )
+            )
+
+        if any(payload is None for payload in payloads):
+            return Parser(iter(buffer)).parse()
+
+        statements: list[STMT.Stmt] = []
+        for payload in payloads:
+            assert payload is not None
+            statements.extend(TreeUnpickler(io.BytesIO(payload), lines).load())
+        return statements
+
+    def __split(self, types: "array[int]") -> list[int]:
+        # A top-level declaration ends with a ';' or '}' outside any brackets,
+        # unless an 'else' follows. The EOF token is left out of every chunk.
+        count = min(self.__workers, len(types) // self.__min_chunk)
+        opening, closing, ends = self.__OPENING, self.__CLOSING, self.__ENDS
+        else_value = TT.ELSE.value
+        last = len(types) - 1
+
+        bounds = [0]
+        k = 1
+        target = last * k // count if count > 1 else last
+        depth = 0
+        for index, type_id in enumerate(types):
+            if k >= count:
+                break
+            if type_id in opening:
+                depth += 1
+            elif type_id in closing:
+                depth -= 1
+            if (
+                depth == 0
+                and type_id in ends
+                and index + 1 >= target
+                and index + 1 < last
+                and types[index + 1] != else_value
+            ):
+                bounds.append(index + 1)
+                k += 1
+                target = last * k // count
+
+        bounds.append(last)
+        return bounds
@@ -0,0 +1,86 @@
+from typing import Any
+
+import pytest
+from lox_error import LoxError
+from lox_ast_printer import AstPrinter
+from lox_parallel_parser import ParallelParser
+from lox_parser import Parser
+from lox_regex_scanner import RegexScanner
+import lox_expr as EXPR
+import lox_stmt as STMT
+
+program = """\
+var a = 1;
+fun add(x, y) {
+  return x + y;
+}
+{ print "é"; }
+if (a > 0) { print add(a, 2); }
+else print "no";
+if (a) print a; else { print -a; }
+for (var i = 0; i < 2; i = i + 1) print (i);
+while (false) {}
+{ var b = "multi
+line"; print b; }
+"""
+
+sources = [
+    "",
+    program,
+    program * 8,
+    program * 4 + "print (1;\nvar = 2;\n" + program * 4,
+    program * 4 + "fun f( { print 1; }\n" + program * 4,
+    program * 4 + "{ print 1;\n" + program * 4,
+    program * 4 + '"unterminated\n',
+]
+
+
+@pytest.mark.parametrize("source", sources)
+@pytest.mark.parametrize("workers", [2, 3])
+def test_same_as_parser(
+    source: str, workers: int, capfd: pytest.CaptureFixture[str]
+) -> None:
+    # Scan errors come out before parse errors, as when the whole source is
+    # scanned first.
+    tokens = RegexScanner(source).scan_buffer()
+    expected = AstPrinter().print(Parser(iter(tokens)).parse())
+    expected_err = capfd.readouterr().err
+    expected_had_error = LoxError.had_error
+    LoxError.had_error = False
+
+    actual = ParallelParser(source, workers, min_chunk=16).parse()
+    assert AstPrinter().print(actual) == expected
+    assert capfd.readouterr().err == expected_err
+    assert LoxError.had_error is expected_had_error
+
+
+def positions(statements: list[STMT.Stmt]) -> list[tuple[Any, ...]]:
+    found: list[tuple[Any, ...]] = []
+    for statement in statements:
+        if isinstance(statement, STMT.Var):
+            name = statement.name
+            found.append((name.lexeme, name.line, name.column))
+        elif isinstance(statement, STMT.Print) and isinstance(
+            statement.expression, EXPR.Variable
+        ):
+            name = statement.expression.name
+            found.append((name.lexeme, name.line, name.column))
+    return found
+
+
+def test_token_positions() -> None:
+    source = "var a = 1;  var b = 2;\n" * 50 + "  print a;\n" * 50
+    expected = positions(Parser(RegexScanner(source).iter_tokens()).parse())
+    actual = positions(ParallelParser(source, 3, min_chunk=16).parse())
+    assert actual == expected
+    assert ("b", 50, 17) in actual
+    assert ("a", 51, 9) in actual
+
+
+def test_split_keeps_else_with_if() -> None:
+    source = "if (true) print 1;\nelse print 2;\n" * 40
+    actual = ParallelParser(source, 3, min_chunk=4).parse()
+    assert len(actual) == 40
+    for statement in actual:
+        assert isinstance(statement, STMT.If)
+        assert statement.else_branch is not None
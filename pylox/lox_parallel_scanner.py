@@ -0,0 +1,103 @@
+import contextlib
+import io
+import os
+import re
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from lox_error import LoxError
+from lox_line_index import LineIndex
+from lox_regex_scanner import RegexScanner
+from lox_token import Token, TokenType as TT
+from lox_token_buffer import Columns, TokenBuffer
+
+
+def _scan_chunk(chunk: str, offset: int, line: int) -> tuple[Columns, str, bool]:
+    # Runs in a worker process. Errors are captured and replayed by the parent
+    # so that they come out in source order.
+    LoxError.had_error = False
+    errors = io.StringIO()
+    with contextlib.redirect_stderr(errors):
+        # Chunks start at the beginning of a line, which is all the chunk's
+        # own index needs to know to report errors at their real position.
+        buffer = RegexScanner(chunk, 0, LineIndex(chunk, line)).scan_buffer()
+
+    # Drop the chunk's EOF and make offsets relative to the whole source.
+    types, starts, ends = buffer.columns()
+    columns = (
+        types[:-1],
+        array("q", [start + offset for start in starts[:-1]]),
+        array("q", [end + offset for end in ends[:-1]]),
+    )
+    return columns, errors.getvalue(), LoxError.had_error
+
+
+class ParallelScanner:
+    # Only string literals can span lines. Comments are matched as well so that
+    # quotes inside them are not mistaken for the start of a string.
+    __STRINGS = re.compile(r'"[^"]*"?|//[^\n]*')
+
+    def __init__(
+        self,
+        source: str,
+        workers: Optional[int] = None,
+        min_chunk: int = 1 << 20,
+    ) -> None:
+        self.__source = source
+        self.__workers = workers or os.cpu_count() or 1
+        # Smaller chunks are not worth the cost of starting processes.
+        self.__min_chunk = min_chunk
+
+    def scanTokens(self) -> list[Token]:
+        return list(self.scan_buffer())
+
+    def scan_buffer(self) -> TokenBuffer:
+        source = self.__source
+        bounds = self.__split()
+        if len(bounds) <= 2:
+            return RegexScanner(source).scan_buffer()
+
+        lines = LineIndex(source)
+        chunks = [source[start:end] for start, end in zip(bounds, bounds[1:])]
+        first_lines = [lines.line(start) for start in bounds[:-1]]
+
+        buffer = TokenBuffer(source, lines)
+        with ProcessPoolExecutor(len(chunks)) as executor:
+            for columns, errors, had_error in executor.map(
+                _scan_chunk, chunks, bounds, first_lines
+            ):
+                sys.stderr.write(errors)
+                if had_error:
+                    LoxError.had_error = True
+                buffer.extend(columns)
+
+        buffer.append(TT.EOF, len(source), len(source))
+        return buffer
+
+    def __split(self) -> list[int]:
+        # Split at newlines that are provably outside string literals, so that
+        # each chunk starts in the scanner's initial state.
+        source = self.__source
+        count = min(self.__workers, len(source) // self.__min_chunk)
+        strings = self.__STRINGS.finditer(source)
+        string = next(strings, None)
+
+        bounds = [0]
+        for k in range(1, count):
+            position = max(len(source) * k // count, bounds[-1])
+            newline = source.find("\n", position)
+            while newline >= 0:
+                while string is not None and string.end() <= newline:
+                    string = next(strings, None)
+                if string is None or string.start() > newline:
+                    break
+                # The newline is inside a string; look past its end.
+                newline = source.find("\n", string.end())
+            if newline < 0:
+                break
+            bounds.append(newline + 1)
+
+        bounds.append(len(source))
+        return bounds
@@ -0,0 +1,38 @@
+from typing import Any
+
+import pytest
+from lox_error import LoxError
+from lox_parallel_scanner import ParallelScanner
+from lox_regex_scanner import RegexScanner
+from lox_token import Token
+
+
+def summarize(tokens: list[Token]) -> list[tuple[Any, ...]]:
+    return [(t.token_type, t.lexeme, t.literal, t.line, t.offset) for t in tokens]
+
+
+sources = [
+    "",
+    "print 1;\n" * 40,
+    'var s = "a\nstring\nthat\nspans\nmany\nlines\nof\nthe\nsource";\nprint s;\n' * 5,
+    '// "not a string\nprint 1;\n' * 20,
+    '"// not a comment\n";\nprint 2;\n' * 20,
+    "print 1;\n@\nprint 2;\n" * 10 + '"unterminated\n\n\n\n\n\n\n',
+    "no newlines at all; " * 20,
+]
+
+
+@pytest.mark.parametrize("source", sources)
+@pytest.mark.parametrize("workers", [2, 7])
+def test_same_as_regex_scanner(
+    source: str, workers: int, capfd: pytest.CaptureFixture[str]
+) -> None:
+    expected = summarize(RegexScanner(source).scanTokens())
+    expected_err = capfd.readouterr().err
+    expected_had_error = LoxError.had_error
+    LoxError.had_error = False
+
+    actual = ParallelScanner(source, workers, min_chunk=16).scanTokens()
+    assert summarize(actual) == expected
+    assert capfd.readouterr().err == expected_err
+    assert LoxError.had_error is expected_had_error
@@ -1,6 +1,9 @@
-from typing import Optional
+import contextlib
+from enum import IntEnum
+from typing import Callable, Generator, Iterable, Iterator, Optional
 
 from lox_error import LoxError
+from lox_resolver import FunctionType, Resolver
 from lox_token import Token, TokenType as TT
 import lox_expr as EXPR
 import lox_stmt as STMT
@@ -10,19 +13,69 @@ class ParseError(Exception):
     pass
 
 
+# Binding power of infix operators, loosest first.
+Precedence = IntEnum(
+    "Precedence",
+    [
+        "ASSIGNMENT",
+        "OR",
+        "AND",
+        "EQUALITY",
+        "COMPARISON",
+        "TERM",
+        "FACTOR",
+        "UNARY",
+        "CALL",
+    ],
+)
+
+
 class Parser:
-    def __init__(self, tokens: list[Token]) -> None:
-        self.__tokens = tokens
-        self.__current = 0
+    def __init__(
+        self,
+        tokens: Iterable[Token],
+        lazy: bool = False,
+        resolver: Optional[Resolver] = None,
+    ) -> None:
+        # Tokens are pulled on demand, so only the current and the previous
+        # token are held here even when the scanner is a generator.
+        self.__tokens = iter(tokens)
+        self.__current_token = next(self.__tokens)
+        self.__previous_token = self.__current_token
+        # Skip function bodies, to be parsed when first called.
+        self.__lazy = lazy
+        self.__skipped: Optional[list[Token]] = None
+        # Resolve names while parsing instead of in a pass of their own.
+        # Resolver errors are only reported if there was no syntax error, as
+        # when the resolver runs after the parser.
+        self.__resolver = resolver
+        self.__unresolved: list[EXPR.Variable | EXPR.Assign] = []
+        if resolver is not None:
+            resolver.hold_errors()
 
     def parse(self) -> list[STMT.Stmt]:
         statements: list[STMT.Stmt] = []
-        while not self.__is_at_end():
-            statement = self.__declaration()
+        for statement in self.declarations():
             if statement is not None:
                 statements.append(statement)
         return statements
 
+    def declarations(self) -> Iterator[Optional[STMT.Stmt]]:
+        # One top-level declaration at a time, or None for one that had a
+        # syntax error.
+        while not self.__is_at_end():
+            yield self.__declaration()
+        if self.__resolver is not None:
+            self.__resolver.release_errors(not LoxError.had_error)
+
+    def function_body(self) -> list[STMT.Stmt]:
+        # Parses the tokens of a body skipped in lazy mode.
+        try:
+            self.__consume(TT.LEFT_BRACE, "Expect '{' before function body.")
+            return self.__block()
+        except ParseError:
+            return []
+
     def __declaration(self) -> Optional[STMT.Stmt]:
         try:
             if self.__match(TT.FUN):
@@ -32,6 +85,7 @@ class Parser:
 
             return self.__statement()
         except ParseError:
+            self.__unresolved.clear()
             self.__syncronize()
             return None
 
@@ -47,44 +101,40 @@ class Parser:
         if self.__match(TT.WHILE):
             return self.__while_statement()
         if self.__match(TT.LEFT_BRACE):
-            return STMT.Block(self.__block())
+            with self.__scope():
+                return STMT.Block(self.__block())
 
         return self.__expression_statement()
 
     def __for_statement(self) -> STMT.Stmt:
         self.__consume(TT.LEFT_PAREN, "Expect '(' after 'for'.")
 
-        initializer: Optional[STMT.Stmt] = (
-            None
-            if self.__match(TT.SEMICOLON)
-            else self.__var_declaration()
-            if self.__match(TT.VAR)
-            else self.__expression_statement()
-        )
-
-        condition = None if self.__check(TT.SEMICOLON) else self.__expression()
-        self.__consume(TT.SEMICOLON, "Expect ';' after loop condition.")
-
-        increment = None if self.__check(TT.RIGHT_PAREN) else self.__expression()
-        self.__consume(TT.RIGHT_PAREN, "Expect ')' after for clauses.")
-
-        body = self.__statement()
+        has_initializer = not self.__match(TT.SEMICOLON)
+        with self.__scope(has_initializer):
+            initializer: Optional[STMT.Stmt] = (
+                None
+                if not has_initializer
+                else self.__var_declaration()
+                if self.__match(TT.VAR)
+                else self.__expression_statement()
+            )
 
-        if increment is not None:
-            body = STMT.Block([body, STMT.Expression(increment)])
+            condition = None if self.__check(TT.SEMICOLON) else self.__expression()
+            self.__resolve_names()
+            self.__consume(TT.SEMICOLON, "Expect ';' after loop condition.")
 
-        if condition is None:
-            condition = EXPR.Literal(True)
-        body = STMT.While(condition, body)
+            increment = None if self.__check(TT.RIGHT_PAREN) else self.__expression()
+            self.__resolve_names()
+            self.__consume(TT.RIGHT_PAREN, "Expect ')' after for clauses.")
 
-        if initializer is not None:
-            body = STMT.Block([initializer, body])
+            body = self.__statement()
 
-        return body
+        return STMT.For(initializer, condition, increment, body)
 
     def __if_statement(self) -> STMT.Stmt:
         self.__consume(TT.LEFT_PAREN, "Expect '(' after 'if'.")
         condition = self.__expression()
+        self.__resolve_names()
         self.__consume(TT.RIGHT_PAREN, "Expect ')' after if condition.")
 
         then_branch = self.__statement()
@@ -96,24 +146,33 @@ class Parser:
 
     def __print_statement(self) -> STMT.Stmt:
         value = self.__expression()
+        self.__resolve_names()
         self.__consume(TT.SEMICOLON, "Expect ';' after value.")
         return STMT.Print(value)
 
     def __return_statement(self) -> STMT.Stmt:
         keyword = self.__previous()
+        if self.__resolver is not None:
+            self.__resolver.check_return(keyword)
         value = None
         if not self.__check(TT.SEMICOLON):
             value = self.__expression()
+            self.__resolve_names()
 
         self.__consume(TT.SEMICOLON, "Expect ';' after return value.")
         return STMT.Return(keyword, value)
 
     def __var_declaration(self) -> STMT.Stmt:
         name = self.__consume(TT.IDENTIFIER, "Expect variable name.")
+        if self.__resolver is not None:
+            self.__resolver.declare(name)
 
         initializer = None
         if self.__match(TT.EQUAL):
             initializer = self.__expression()
+            self.__resolve_names()
+        if self.__resolver is not None:
+            self.__resolver.define(name)
 
         self.__consume(TT.SEMICOLON, "Expect ';' after variable declaration.")
         return STMT.Var(name, initializer)
@@ -121,6 +180,7 @@ class Parser:
     def __while_statement(self) -> STMT.Stmt:
         self.__consume(TT.LEFT_PAREN, "Expect '(' after 'while'.")
         condition = self.__expression()
+        self.__resolve_names()
         self.__consume(TT.RIGHT_PAREN, "Expect ')' after condition.")
         body = self.__statement()
 
@@ -128,27 +188,30 @@ class Parser:
 
     def __expression_statement(self) -> STMT.Stmt:
         expr = self.__expression()
+        self.__resolve_names()
         self.__consume(TT.SEMICOLON, "Expect ';' after expression.")
         return STMT.Expression(expr)
 
     def __function(self, kind: str) -> STMT.Function:
         name = self.__consume(TT.IDENTIFIER, "Expect " + kind + " name.")
-        self.__consume(TT.LEFT_PAREN, "Expect '(' after " + kind + " name.")
-        parameters: list[Token] = []
-        if not self.__check(TT.RIGHT_PAREN):
-            while True:
-                if len(parameters) >= 255:
-                    self.__error(self.__peek(), "Can't have more than 255 prameters.")
-
-                parameters.append(
-                    self.__consume(TT.IDENTIFIER, "Expect parameter name.")
-                )
-                if not self.__match(TT.COMMA):
-                    break
-        self.__consume(TT.RIGHT_PAREN, "Expect ')' after parameters.")
-
+        parameters = self.__parameters(kind)
         self.__consume(TT.LEFT_BRACE, "Expect '{' before " + kind + " body.")
-        body = self.__block()
+        resolver = self.__resolver
+        if self.__lazy:
+            function = STMT.Function(name, parameters, [], self.__skip_body())
+            if resolver is not None:
+                resolver.visit_function_stmt(function)
+            return function
+        if resolver is None:
+            return STMT.Function(name, parameters, self.__block())
+
+        resolver.declare(name)
+        resolver.define(name)
+        enclosing = resolver.begin_function(FunctionType.FUNCTION, parameters)
+        try:
+            body = self.__block()
+        finally:
+            resolver.end_function(enclosing)
         return STMT.Function(name, parameters, body)
 
     def __block(self) -> list[STMT.Stmt]:
@@ -162,98 +225,199 @@ class Parser:
         self.__consume(TT.RIGHT_BRACE, "Expect '}' after block.")
         return statements
 
-    def __expression(self) -> EXPR.Expr:
-        return self.__assignment()
-
-    def __assignment(self) -> EXPR.Expr:
-        expr = self.__or()
-
-        if self.__match(TT.EQUAL):
-            equals = self.__previous()
-            value = self.__assignment()
-
-            if isinstance(expr, EXPR.Variable):
-                name = expr.name
-                return EXPR.Assign(name, value)
-
-            self.__error(equals, "Invalid assignment target.")
-
-        return expr
-
-    def __or(self) -> EXPR.Expr:
-        expr = self.__and()
-
-        while self.__match(TT.OR):
-            operator = self.__previous()
-            right = self.__and()
-            expr = EXPR.Logical(expr, operator, right)
-
-        return expr
-
-    def __and(self) -> EXPR.Expr:
-        expr = self.__equality()
-
-        while self.__match(TT.AND):
-            operator = self.__previous()
-            right = self.__equality()
-            expr = EXPR.Logical(expr, operator, right)
-
-        return expr
-
-    def __equality(self) -> EXPR.Expr:
-        expr = self.__comparison()
-
-        while self.__match(TT.BANG_EQUAL, TT.EQUAL_EQUAL):
-            operator = self.__previous()
-            right = self.__comparison()
-            expr = EXPR.Binary(expr, operator, right)
-
-        return expr
+    def __parameters(self, kind: str) -> list[Token]:
+        self.__consume(TT.LEFT_PAREN, "Expect '(' after " + kind + " name.")
+        parameters: list[Token] = []
+        if not self.__check(TT.RIGHT_PAREN):
+            while True:
+                if len(parameters) >= 255:
+                    self.__error(self.__peek(), "Can't have more than 255 prameters.")
 
-    def __comparison(self) -> EXPR.Expr:
-        expr = self.__term()
+                parameters.append(
+                    self.__consume(TT.IDENTIFIER, "Expect parameter name.")
+                )
+                if not self.__match(TT.COMMA):
+                    break
+        self.__consume(TT.RIGHT_PAREN, "Expect ')' after parameters.")
+        return parameters
 
-        while self.__match(
-            TT.GREATER,
-            TT.GREATER_EQUAL,
-            TT.LESS,
-            TT.LESS_EQUAL,
-        ):
-            operator = self.__previous()
-            right = self.__term()
-            expr = EXPR.Binary(expr, operator, right)
+    # Lazy mode checks the syntax of a body without building it. The methods
+    # below follow the grammar of the ones above, consuming the same tokens
+    # and reporting the same errors, so a syntax error in a body is reported
+    # before anything runs and the body ends where a full parse would end it.
 
-        return expr
+    def __skip_body(self) -> list[Token]:
+        # The tokens of the body from its '{', to be parsed when first called.
+        tokens = self.__skipped = [self.__previous()]
+        try:
+            self.__skip_block()
+        finally:
+            self.__skipped = None
+        return tokens
 
-    def __term(self) -> EXPR.Expr:
-        expr = self.__factor()
+    def __skip_declaration(self) -> None:
+        try:
+            if self.__match(TT.FUN):
+                self.__consume(TT.IDENTIFIER, "Expect function name.")
+                self.__parameters("function")
+                self.__consume(TT.LEFT_BRACE, "Expect '{' before function body.")
+                self.__skip_block()
+            elif self.__match(TT.VAR):
+                self.__skip_var_declaration()
+            else:
+                self.__skip_statement()
+        except ParseError:
+            self.__syncronize()
 
-        while self.__match(TT.MINUS, TT.PLUS):
-            operator = self.__previous()
-            right = self.__factor()
-            expr = EXPR.Binary(expr, operator, right)
+    def __skip_statement(self) -> None:
+        if self.__match(TT.FOR):
+            self.__consume(TT.LEFT_PAREN, "Expect '(' after 'for'.")
+            if self.__match(TT.SEMICOLON):
+                pass
+            elif self.__match(TT.VAR):
+                self.__skip_var_declaration()
+            else:
+                self.__skip_expression_statement()
+            if not self.__check(TT.SEMICOLON):
+                self.__skip_expression()
+            self.__consume(TT.SEMICOLON, "Expect ';' after loop condition.")
+            if not self.__check(TT.RIGHT_PAREN):
+                self.__skip_expression()
+            self.__consume(TT.RIGHT_PAREN, "Expect ')' after for clauses.")
+            self.__skip_statement()
+        elif self.__match(TT.IF):
+            self.__consume(TT.LEFT_PAREN, "Expect '(' after 'if'.")
+            self.__skip_expression()
+            self.__consume(TT.RIGHT_PAREN, "Expect ')' after if condition.")
+            self.__skip_statement()
+            if self.__match(TT.ELSE):
+                self.__skip_statement()
+        elif self.__match(TT.PRINT):
+            self.__skip_expression()
+            self.__consume(TT.SEMICOLON, "Expect ';' after value.")
+        elif self.__match(TT.RETURN):
+            if not self.__check(TT.SEMICOLON):
+                self.__skip_expression()
+            self.__consume(TT.SEMICOLON, "Expect ';' after return value.")
+        elif self.__match(TT.WHILE):
+            self.__consume(TT.LEFT_PAREN, "Expect '(' after 'while'.")
+            self.__skip_expression()
+            self.__consume(TT.RIGHT_PAREN, "Expect ')' after condition.")
+            self.__skip_statement()
+        elif self.__match(TT.LEFT_BRACE):
+            self.__skip_block()
+        else:
+            self.__skip_expression_statement()
+
+    def __skip_var_declaration(self) -> None:
+        self.__consume(TT.IDENTIFIER, "Expect variable name.")
+        if self.__match(TT.EQUAL):
+            self.__skip_expression()
+        self.__consume(TT.SEMICOLON, "Expect ';' after variable declaration.")
 
-        return expr
+    def __skip_expression_statement(self) -> None:
+        self.__skip_expression()
+        self.__consume(TT.SEMICOLON, "Expect ';' after expression.")
 
-    def __factor(self) -> EXPR.Expr:
-        expr = self.__unary()
+    def __skip_block(self) -> None:
+        while not self.__check(TT.RIGHT_BRACE) and not self.__is_at_end():
+            self.__skip_declaration()
+        self.__consume(TT.RIGHT_BRACE, "Expect '}' after block.")
 
-        while self.__match(TT.SLASH, TT.STAR):
-            operator = self.__previous()
-            right = self.__unary()
-            expr = EXPR.Binary(expr, operator, right)
+    def __skip_expression(
+        self, precedence: Precedence = Precedence.ASSIGNMENT
+    ) -> bool:
+        # Returns whether the expression is a variable, which can be assigned.
+        token = self.__current_token
+        if token.token_type not in self.__PREFIX:
+            raise self.__error(token, "Expect expression.")
+        self.__advance()
+        assignable = token.token_type == TT.IDENTIFIER
+        if token.token_type == TT.LEFT_PAREN:
+            self.__skip_expression()
+            self.__consume(TT.RIGHT_PAREN, "Expect ')' after expression.")
+        elif token.token_type in (TT.BANG, TT.MINUS):
+            self.__skip_expression(Precedence.UNARY)
 
-        return expr
+        while True:
+            token = self.__current_token
+            rule = self.__INFIX.get(token.token_type)
+            if rule is None or rule[0] < precedence:
+                return assignable
+            self.__advance()
+            if token.token_type == TT.EQUAL:
+                self.__skip_expression()
+                if not assignable:
+                    self.__error(token, "Invalid assignment target.")
+            elif token.token_type == TT.LEFT_PAREN:
+                self.__skip_arguments()
+            else:
+                self.__skip_expression(Precedence(rule[0] + 1))
+            assignable = False
 
-    def __unary(self) -> EXPR.Expr:
-        if self.__match(TT.BANG, TT.MINUS):
-            operator = self.__previous()
-            right = self.__unary()
-            return EXPR.Unary(operator, right)
+    def __skip_arguments(self) -> None:
+        count = 0
+        if not self.__check(TT.RIGHT_PAREN):
+            while True:
+                if count >= 255:
+                    self.__error(self.__peek(), "Can't have more than 255 arguments.")
+                self.__skip_expression()
+                count += 1
+                if not self.__match(TT.COMMA):
+                    break
+        self.__consume(TT.RIGHT_PAREN, "Expect ')' after arguments")
 
-        return self.__call()
+    def __expression(self) -> EXPR.Expr:
+        return self.__parse_precedence(Precedence.ASSIGNMENT)
+
+    def __parse_precedence(self, precedence: Precedence) -> EXPR.Expr:
+        # Pratt parsing: a prefix rule parses the operand, then infix rules
+        # extend it as long as they bind at least as tightly as precedence.
+        token = self.__current_token
+        prefix = self.__PREFIX.get(token.token_type)
+        if prefix is None:
+            raise self.__error(token, "Expect expression.")
+        self.__advance()
+        expr = prefix(self, token)
 
-    def __finish_call(self, callee: EXPR.Expr) -> EXPR.Expr:
+        while True:
+            token = self.__current_token
+            rule = self.__INFIX.get(token.token_type)
+            if rule is None or rule[0] < precedence:
+                return expr
+            self.__advance()
+            expr = rule[1](self, expr, token)
+
+    def __assignment(self, target: EXPR.Expr, equals: Token) -> EXPR.Expr:
+        # Right-associative.
+        value = self.__parse_precedence(Precedence.ASSIGNMENT)
+
+        if isinstance(target, EXPR.Variable):
+            name = target.name
+            assign = EXPR.Assign(name, value)
+            if self.__resolver is not None:
+                self.__unresolved.remove(target)
+                self.__unresolved.append(assign)
+            return assign
+
+        self.__error(equals, "Invalid assignment target.")
+        return target
+
+    def __logical(self, left: EXPR.Expr, operator: Token) -> EXPR.Expr:
+        precedence = self.__INFIX[operator.token_type][0]
+        right = self.__parse_precedence(Precedence(precedence + 1))
+        return EXPR.Logical(left, operator, right)
+
+    def __binary(self, left: EXPR.Expr, operator: Token) -> EXPR.Expr:
+        precedence = self.__INFIX[operator.token_type][0]
+        right = self.__parse_precedence(Precedence(precedence + 1))
+        return EXPR.Binary(left, operator, right)
+
+    def __unary(self, operator: Token) -> EXPR.Expr:
+        right = self.__parse_precedence(Precedence.UNARY)
+        return EXPR.Unary(operator, right)
+
+    def __call(self, callee: EXPR.Expr, paren: Token) -> EXPR.Expr:
         arguments: list[EXPR.Expr] = []
         if not self.__check(TT.RIGHT_PAREN):
             while True:
@@ -266,37 +430,59 @@ class Parser:
         paren = self.__consume(TT.RIGHT_PAREN, "Expect ')' after arguments")
         return EXPR.Call(callee, paren, arguments)
 
-    def __call(self) -> EXPR.Expr:
-        expr = self.__primary()
-
-        while True:
-            if self.__match(TT.LEFT_PAREN):
-                expr = self.__finish_call(expr)
-            else:
-                break
-
-        return expr
+    def __literal(self, token: Token) -> EXPR.Expr:
+        return EXPR.Literal(token.literal)
 
-    def __primary(self) -> EXPR.Expr:
-        if self.__match(TT.FALSE):
-            return EXPR.Literal(False)
-        if self.__match(TT.TRUE):
-            return EXPR.Literal(True)
-        if self.__match(TT.NIL):
-            return EXPR.Literal(None)
+    def __false(self, token: Token) -> EXPR.Expr:
+        return EXPR.Literal(False)
 
-        if self.__match(TT.NUMBER, TT.STRING):
-            return EXPR.Literal(self.__previous().literal)
+    def __true(self, token: Token) -> EXPR.Expr:
+        return EXPR.Literal(True)
 
-        if self.__match(TT.IDENTIFIER):
-            return EXPR.Variable(self.__previous())
+    def __nil(self, token: Token) -> EXPR.Expr:
+        return EXPR.Literal(None)
 
-        if self.__match(TT.LEFT_PAREN):
-            expr = self.__expression()
-            self.__consume(TT.RIGHT_PAREN, "Expect ')' after expression.")
-            return EXPR.Grouping(expr)
+    def __variable(self, token: Token) -> EXPR.Expr:
+        expr = EXPR.Variable(token)
+        if self.__resolver is not None:
+            self.__unresolved.append(expr)
+        return expr
 
-        raise self.__error(self.__peek(), "Expect expression.")
+    def __grouping(self, token: Token) -> EXPR.Expr:
+        expr = self.__expression()
+        self.__consume(TT.RIGHT_PAREN, "Expect ')' after expression.")
+        return EXPR.Grouping(expr)
+
+    __PREFIX: dict[TT, Callable[["Parser", Token], EXPR.Expr]] = {
+        TT.FALSE: __false,
+        TT.TRUE: __true,
+        TT.NIL: __nil,
+        TT.NUMBER: __literal,
+        TT.STRING: __literal,
+        TT.IDENTIFIER: __variable,
+        TT.LEFT_PAREN: __grouping,
+        TT.BANG: __unary,
+        TT.MINUS: __unary,
+    }
+
+    __INFIX: dict[
+        TT, tuple[Precedence, Callable[["Parser", EXPR.Expr, Token], EXPR.Expr]]
+    ] = {
+        TT.EQUAL: (Precedence.ASSIGNMENT, __assignment),
+        TT.OR: (Precedence.OR, __logical),
+        TT.AND: (Precedence.AND, __logical),
+        TT.BANG_EQUAL: (Precedence.EQUALITY, __binary),
+        TT.EQUAL_EQUAL: (Precedence.EQUALITY, __binary),
+        TT.GREATER: (Precedence.COMPARISON, __binary),
+        TT.GREATER_EQUAL: (Precedence.COMPARISON, __binary),
+        TT.LESS: (Precedence.COMPARISON, __binary),
+        TT.LESS_EQUAL: (Precedence.COMPARISON, __binary),
+        TT.MINUS: (Precedence.TERM, __binary),
+        TT.PLUS: (Precedence.TERM, __binary),
+        TT.SLASH: (Precedence.FACTOR, __binary),
+        TT.STAR: (Precedence.FACTOR, __binary),
+        TT.LEFT_PAREN: (Precedence.CALL, __call),
+    }
 
     def __match(self, *token_types: TT) -> bool:
         for tt in token_types:
@@ -318,17 +504,38 @@ class Parser:
 
     def __advance(self) -> Token:
         if not self.__is_at_end():
-            self.__current += 1
-        return self.__previous()
+            self.__previous_token = self.__current_token
+            if self.__skipped is not None:
+                self.__skipped.append(self.__previous_token)
+            self.__current_token = next(self.__tokens)
+        return self.__previous_token
 
     def __is_at_end(self) -> bool:
         return self.__peek().token_type == TT.EOF
 
     def __peek(self) -> Token:
-        return self.__tokens[self.__current]
+        return self.__current_token
 
     def __previous(self) -> Token:
-        return self.__tokens[self.__current - 1]
+        return self.__previous_token
+
+    @contextlib.contextmanager
+    def __scope(self, enter: bool = True) -> Generator[None, None, None]:
+        if self.__resolver is None or not enter:
+            yield
+            return
+        self.__resolver.begin_scope()
+        try:
+            yield
+        finally:
+            self.__resolver.end_scope()
+
+    def __resolve_names(self) -> None:
+        if self.__resolver is None:
+            return
+        for expr in self.__unresolved:
+            self.__resolver.resolve_name(expr)
+        self.__unresolved.clear()
 
     def __error(self, token: Token, message: str) -> ParseError:
         LoxError.parse_error(token, message)
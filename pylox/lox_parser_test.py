@@ -1,42 +1,72 @@
-from typing import Generator
+import random
 
 import pytest
 from lox_error import LoxError
 from lox_ast_printer import AstPrinter
 from lox_scanner import Scanner
+from lox_regex_scanner import RegexScanner
 from lox_parser import Parser
 
 
-@pytest.fixture(autouse=True)
-def clear_error() -> Generator[None, None, None]:
-    yield
-    LoxError.had_error = False
-
-
 statements: list[tuple[str, list[str], str, bool]] = [
     ("1;", ["(expr 1.0)"], "", False),
-    ("1", [], "[line 1] Error at end: Expect ';' after expression.", True),
+    ("1", [], "[line 1:2] Error at end: Expect ';' after expression.", True),
     ("print 1;", ["(print 1.0)"], "", False),
     (
         "print +*/;\n print 1;",
         ["(print 1.0)"],
-        "[line 1] Error at '+': Expect expression.",
+        "[line 1:7] Error at '+': Expect expression.",
         True,
     ),
     (
         "print +*/;\n print 1",
         [],
-        "[line 1] Error at '+': Expect expression.\n[line 2] Error at end: Expect ';' after value.",
+        "[line 1:7] Error at '+': Expect expression.\n[line 2:9] Error at end: Expect ';' after value.",
         True,
     ),
     ("var a = 1; a = 2;", ["(vardecl a 1.0)", "(expr (assign a 2.0))"], "", False),
     (
         "var a = 1; (a) = 2;",
         [],
-        "[line 1] Error at '=': Invalid assignment target.",
+        "[line 1:16] Error at '=': Invalid assignment target.",
         True,
     ),
-    ("1 + 1 = 2;", [], "[line 1] Error at '=': Invalid assignment target.", True),
+    ("1 + 1 = 2;", [], "[line 1:7] Error at '=': Invalid assignment target.", True),
+    ("a or b = c;", [], "[line 1:8] Error at '=': Invalid assignment target.", True),
+    (
+        "1 - 2 - 3 * 4 / 5;",
+        ["(expr (- (- 1.0 2.0) (/ (* 3.0 4.0) 5.0)))"],
+        "",
+        False,
+    ),
+    ("a = b = c;", ["(expr (assign a (assign b c)))"], "", False),
+    (
+        "!-a == b or c and d < e;",
+        ["(expr (or (== (! (- a)) b) (and c (< d e))))"],
+        "",
+        False,
+    ),
+    ("f(1)(2, 3);", ["(expr (call (call f 1.0) 2.0 3.0))"], "", False),
+    ("-f();", ["(expr (- (call f)))"], "", False),
+    (
+        "print (1 + 2) * 3 >= 4 != nil;",
+        ["(print (!= (>= (* (group (+ 1.0 2.0)) 3.0) 4.0) nil))"],
+        "",
+        False,
+    ),
+    (
+        "for (var i = 0; i < 3; i = i + 1) print i;",
+        ["(for (vardecl i 0.0) (< i 3.0) (assign i (+ i 1.0)) (print i))"],
+        "",
+        False,
+    ),
+    ("for (;;) {}", ["(for nil nil nil (block))"], "", False),
+    (
+        "for (i = 0; ; ) f();",
+        ["(for (expr (assign i 0.0)) nil nil (expr (call f)))"],
+        "",
+        False,
+    ),
 ]
 
 
@@ -59,3 +89,68 @@ def test_parser(
     assert LoxError.had_error is had_error
     if not had_error:
         assert AstPrinter().print(stmts) == expected
+
+
+@pytest.mark.parametrize("source, expected, err_expected, had_error", statements)
+def test_parser_streaming(
+    source: str,
+    expected: list[str],
+    err_expected: str,
+    had_error: bool,
+    capfd: pytest.CaptureFixture[str],
+) -> None:
+    stmts = Parser(RegexScanner(source).iter_tokens()).parse()
+
+    out, err = capfd.readouterr()
+    assert out.strip() == ""
+    assert err.strip() == err_expected
+    assert LoxError.had_error is had_error
+    if not had_error:
+        assert AstPrinter().print(stmts) == expected
+
+
+@pytest.mark.parametrize("source, expected, err_expected, had_error", statements)
+def test_parser_token_buffer(
+    source: str,
+    expected: list[str],
+    err_expected: str,
+    had_error: bool,
+    capfd: pytest.CaptureFixture[str],
+) -> None:
+    stmts = Parser(RegexScanner(source).scan_buffer()).parse()
+
+    out, err = capfd.readouterr()
+    assert out.strip() == ""
+    assert err.strip() == err_expected
+    assert LoxError.had_error is had_error
+    if not had_error:
+        assert AstPrinter().print(stmts) == expected
+
+
+def lazy_and_eager_errors(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    LoxError.had_error = False
+    Parser(RegexScanner(source).iter_tokens()).parse()
+    eager = capfd.readouterr().err, LoxError.had_error
+    LoxError.had_error = False
+    Parser(RegexScanner(source).iter_tokens(), lazy=True).parse()
+    assert (capfd.readouterr().err, LoxError.had_error) == eager, source
+
+
+@pytest.mark.parametrize("source, expected, err_expected, had_error", statements)
+def test_parser_lazy_body(
+    source: str,
+    expected: list[str],
+    err_expected: str,
+    had_error: bool,
+    capfd: pytest.CaptureFixture[str],
+) -> None:
+    # A body skipped in lazy mode has the syntax errors it has when parsed.
+    lazy_and_eager_errors("fun f() {\n" + source + "\n}\nprint 1;", capfd)
+
+
+def test_parser_lazy_body_random(capfd: pytest.CaptureFixture[str]) -> None:
+    rng = random.Random(1)
+    words = "fun f ( ) { } ; , var a = 1 + * ! - or print return if else for while"
+    for _ in range(2000):
+        body = " ".join(rng.choice(words.split()) for _ in range(rng.randrange(12)))
+        lazy_and_eager_errors("fun g(x) { " + body + " } print 1; }", capfd)
@@ -0,0 +1,125 @@
+import time
+import typing
+from typing import Any, Callable, TextIO, Union, cast
+
+from lox_constant_folder import ConstantFolder
+from lox_dead_code import DeadCodeEliminator
+from lox_inliner import Inliner
+import lox_expr as EXPR
+import lox_stmt as STMT
+
+# A pass takes resolved statements and returns the statements to run, which
+# it may have rewritten in place.
+Pass = Callable[[list[STMT.Stmt]], list[STMT.Stmt]]
+
+# Called with the name of each pass and the statements it returned.
+Hook = Callable[[str, list[STMT.Stmt]], None]
+
+# Each pass by name. A new instance is made for every run.
+PASSES: dict[str, Callable[[], Pass]] = {
+    "fold": lambda: ConstantFolder().fold,
+    "inline": lambda: Inliner().inline,
+    "dead-code": lambda: DeadCodeEliminator().eliminate,
+}
+
+# The passes of each optimization level, in order.
+LEVELS: dict[int, list[str]] = {
+    0: [],
+    1: ["fold"],
+    # Folding first turns arguments such as -1 into literals, which may then
+    # be inlined, and again after to fold what was inlined.
+    2: ["fold", "inline", "fold", "dead-code"],
+}
+
+
+class PassManager:
+    # Runs passes in order between resolution and execution, timing each one
+    # and calling the hooks after it.
+    def __init__(self, names: list[str]) -> None:
+        self.__names = names
+        self.__hooks: list[Hook] = []
+        # Time spent in each pass over all runs, for all its places in names.
+        self.timings: dict[str, float] = {name: 0.0 for name in names}
+
+    @staticmethod
+    def for_level(level: int) -> "PassManager":
+        return PassManager(LEVELS[level])
+
+    @property
+    def names(self) -> list[str]:
+        return self.__names
+
+    def add_hook(self, hook: Hook) -> None:
+        self.__hooks.append(hook)
+
+    def run(self, statements: list[STMT.Stmt]) -> list[STMT.Stmt]:
+        for name in self.__names:
+            start = time.perf_counter()
+            statements = PASSES[name]()(statements)
+            self.timings[name] += time.perf_counter() - start
+            for hook in self.__hooks:
+                hook(name, statements)
+        return statements
+
+    def report(self, f: TextIO) -> None:
+        for name in self.timings:
+            print(f"{name:<32} {self.timings[name] * 1000:10.3f} ms", file=f)
+
+
+class PassVerificationError(Exception):
+    def __init__(self, name: str, message: str) -> None:
+        super().__init__(f"After {name}: {message}")
+
+
+def _accepts(hint: Any, value: Any) -> bool:
+    if typing.get_origin(hint) is Union:
+        return any(_accepts(arg, value) for arg in typing.get_args(hint))
+    if typing.get_origin(hint) is list:
+        (item,) = typing.get_args(hint)
+        if not isinstance(value, list):
+            return False
+        return all(_accepts(item, v) for v in cast(list[Any], value))
+    if hint is Any:
+        return True
+    if typing.get_origin(hint) is not None:
+        return isinstance(value, typing.get_origin(hint))
+    if hint is type(None):
+        return value is None
+    return isinstance(value, hint)
+
+
+# The type of each field of each node class.
+_FIELDS: dict[type, list[tuple[str, Any]]] = {
+    cls: [(name, typing.get_type_hints(cls.__init__)[name]) for name in cls.__slots__]
+    for cls in EXPR.Expr.__subclasses__() + STMT.Stmt.__subclasses__()
+}
+
+
+def verify(name: str, statements: list[STMT.Stmt]) -> None:
+    # A hook that checks that what the pass named name returned is still a
+    # tree of nodes whose fields have the types the node classes declare.
+    seen: set[int] = set()
+    stack: list[Any] = list(statements)
+    if not all(isinstance(statement, STMT.Stmt) for statement in stack):
+        raise PassVerificationError(name, "top level is not a list of statements")
+
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            raise PassVerificationError(name, f"{type(node).__name__} appears twice")
+        seen.add(id(node))
+
+        for field, hint in _FIELDS[type(node)]:
+            value: Any = getattr(node, field)
+            if not _accepts(hint, value):
+                raise PassVerificationError(
+                    name, f"{type(node).__name__}.{field} is a {type(value).__name__}"
+                )
+            if field == "depth" and value < -1:
+                raise PassVerificationError(
+                    name, f"{type(node).__name__}.depth is {value}"
+                )
+            children = cast(list[Any], value) if isinstance(value, list) else [value]
+            for child in children:
+                if isinstance(child, (EXPR.Expr, STMT.Stmt)):
+                    stack.append(child)
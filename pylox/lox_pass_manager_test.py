@@ -0,0 +1,78 @@
+import pytest
+from lox_error import LoxError
+from lox_ast_printer import AstPrinter
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_pass_manager import PASSES, PassManager, PassVerificationError, verify
+import lox_stmt as STMT
+
+source = "{ var x = 1 + 2; print (60 * 60); if (false) print 3; }"
+
+
+def parse(text: str) -> list[STMT.Stmt]:
+    statements = Parser(RegexScanner(text).iter_tokens(), resolver=Resolver()).parse()
+    assert LoxError.had_error is False
+    return statements
+
+
+@pytest.mark.parametrize(
+    "level, expected",
+    [
+        (
+            0,
+            "(block (vardecl x (+ 1.0 2.0)) (print (group (* 60.0 60.0)))"
+            " (if False (print 3.0) nil))",
+        ),
+        (1, "(block (vardecl x 3.0) (print 3600.0) (if False (print 3.0) nil))"),
+        (2, "(block (print 3600.0))"),
+    ],
+)
+def test_levels(level: int, expected: str) -> None:
+    statements = PassManager.for_level(level).run(parse(source))
+    assert AstPrinter().print(statements) == [expected]
+
+
+def test_hooks_and_timings() -> None:
+    passes = PassManager(["fold", "dead-code", "fold"])
+    seen: list[tuple[str, list[str]]] = []
+    passes.add_hook(verify)
+    passes.add_hook(
+        lambda name, statements: seen.append((name, AstPrinter().print(statements)))
+    )
+    passes.run(parse(source))
+    passes.run(parse(source))
+
+    assert [name for name, _ in seen] == ["fold", "dead-code", "fold"] * 2
+    assert seen[1][1] == ["(block (print 3600.0))"]
+    assert set(passes.timings) == {"fold", "dead-code"}
+    assert all(timing > 0 for timing in passes.timings.values())
+
+
+def test_verify_catches_broken_pass(monkeypatch: pytest.MonkeyPatch) -> None:
+    def share(statements: list[STMT.Stmt]) -> list[STMT.Stmt]:
+        return statements + statements
+
+    def misplace(statements: list[STMT.Stmt]) -> list[STMT.Stmt]:
+        statement = statements[0]
+        assert isinstance(statement, STMT.Print)
+        setattr(statement, "expression", STMT.Block([]))
+        return statements
+
+    monkeypatch.setitem(PASSES, "share", lambda: share)
+    monkeypatch.setitem(PASSES, "misplace", lambda: misplace)
+    for name, message in [
+        ("share", "After share: Print appears twice"),
+        ("misplace", "After misplace: Print.expression is a Block"),
+    ]:
+        passes = PassManager([name])
+        passes.add_hook(verify)
+        with pytest.raises(PassVerificationError, match=message):
+            passes.run(parse("print 1;"))
+
+
+def test_verify_accepts_parsed_trees() -> None:
+    text = "fun f(a, b) { for (var i = 0; i < a; i = i + 1) { if (b) return -i; } }"
+    text += " print f(1, !nil);"
+    verify("parse", parse(text))
+    verify("lazy", Parser(RegexScanner(text).iter_tokens(), lazy=True).parse())
@@ -0,0 +1,36 @@
+import pytest
+from lox_error import LoxError
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_interpreter import Interpreter
+from lox_pass_manager import PassManager
+
+
+def run(
+    sources: list[str],
+    passes: list[str],
+    capfd: pytest.CaptureFixture[str],
+    times: int = 1,
+) -> tuple[str, str, bool]:
+    # Runs each source in turn with the same interpreter, as the prompt does,
+    # after the passes named, the given number of times. Returns the output, the errors and whether there
+    # was a runtime error, or the syntax errors if there were any. Python
+    # errors the interpreter lets through are printed, so that where they
+    # happen is compared too.
+    LoxError.had_error = False
+    LoxError.had_runtime_error = False
+    interpreter = Interpreter()
+    for source in sources:
+        tokens = RegexScanner(source).iter_tokens()
+        statements = Parser(tokens, resolver=Resolver()).parse()
+        if LoxError.had_error:
+            return capfd.readouterr().err, "", True
+        statements = PassManager(passes).run(statements)
+        try:
+            for _ in range(times):
+                interpreter.interpret(statements)
+        except (ZeroDivisionError, RecursionError) as e:
+            print(type(e).__name__)
+    out, err = capfd.readouterr()
+    return out, err, LoxError.had_runtime_error
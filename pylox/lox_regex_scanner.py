@@ -0,0 +1,164 @@
+import re
+from typing import Iterator, Optional
+
+from lox_error import LoxError
+from lox_line_index import LineIndex
+from lox_token import KEYWORDS, Token, TokenType as TT
+from lox_token_buffer import TokenBuffer
+
+
+def _identifier_length(text: str) -> int:
+    # How much of a run of word characters Scanner takes as an identifier. \w
+    # also matches numeric characters such as ½, which are not letters or
+    # digits to Scanner.
+    for i, c in enumerate(text):
+        if not (c.isalpha() or c.isdigit() or c == "_"):
+            return i
+    return len(text)
+
+
+class RegexScanner:
+    # One master pattern: skip whitespace and comments, then capture exactly one
+    # lexeme. The whole source is tokenized by a single finditer() loop.
+    __PATTERN = re.compile(
+        r"""
+        (?:[ \r\t\n]|//[^\n]*)*
+        (?:
+              ([^\W\d]\w*)
+            | ([!=<>]=?|[(){},.\-+;*/])
+            | (\d+(?:\.\d+)?)
+            | ("[^"]*"?)
+            | (\Z)
+            | .
+        )
+        """,
+        re.VERBOSE,
+    )
+
+    __OPERATORS = {
+        "(": TT.LEFT_PAREN,
+        ")": TT.RIGHT_PAREN,
+        "{": TT.LEFT_BRACE,
+        "}": TT.RIGHT_BRACE,
+        ",": TT.COMMA,
+        ".": TT.DOT,
+        "-": TT.MINUS,
+        "+": TT.PLUS,
+        ";": TT.SEMICOLON,
+        "/": TT.SLASH,
+        "*": TT.STAR,
+        "!": TT.BANG,
+        "!=": TT.BANG_EQUAL,
+        "=": TT.EQUAL,
+        "==": TT.EQUAL_EQUAL,
+        ">": TT.GREATER,
+        ">=": TT.GREATER_EQUAL,
+        "<": TT.LESS,
+        "<=": TT.LESS_EQUAL,
+    }
+
+    def __init__(
+        self, source: str, start: int = 0, lines: Optional[LineIndex] = None
+    ) -> None:
+        self.__source = source
+        self.__start = start
+        self.__lines = lines or LineIndex(source)
+
+    def scanTokens(self) -> list[Token]:
+        return list(self.iter_tokens())
+
+    def iter_tokens(self) -> Iterator[Token]:
+        lines = self.__lines
+
+        for match in self.__matches():
+            if isinstance(match, int):
+                self.__error(match, "Unexpected character.")
+                continue
+            identifier, operator, number, string, end = match.groups()
+
+            if identifier is not None:
+                token_type = KEYWORDS.get(identifier, TT.IDENTIFIER)
+                yield Token(token_type, identifier, None, 0, match.start(1), lines)
+            elif operator is not None:
+                yield Token(
+                    self.__OPERATORS[operator], operator, None, 0, match.start(2), lines
+                )
+            elif number is not None:
+                yield Token(TT.NUMBER, number, float(number), 0, match.start(3), lines)
+            elif string is not None:
+                if len(string) < 2 or string[-1] != '"':
+                    self.__error(match.end(), "Unterminated string.")
+                else:
+                    # Trim the surrounding quotes.
+                    yield Token(
+                        TT.STRING, string, string[1:-1], 0, match.start(4), lines
+                    )
+            elif end is not None:
+                break
+            else:
+                self.__error(match.end() - 1, "Unexpected character.")
+
+        yield Token(TT.EOF, "", None, 0, len(self.__source), lines)
+
+    def scan_buffer(self) -> TokenBuffer:
+        buffer = TokenBuffer(self.__source, self.__lines)
+
+        for match in self.__matches():
+            if isinstance(match, int):
+                self.__error(match, "Unexpected character.")
+                continue
+            identifier, operator, number, string, end = match.groups()
+
+            if identifier is not None:
+                token_type = KEYWORDS.get(identifier, TT.IDENTIFIER)
+                buffer.append(token_type, match.start(1), match.end())
+            elif operator is not None:
+                buffer.append(self.__OPERATORS[operator], match.start(2), match.end())
+            elif number is not None:
+                buffer.append(TT.NUMBER, match.start(3), match.end())
+            elif string is not None:
+                if len(string) < 2 or string[-1] != '"':
+                    self.__error(match.end(), "Unterminated string.")
+                else:
+                    buffer.append(TT.STRING, match.start(4), match.end())
+            elif end is not None:
+                break
+            else:
+                self.__error(match.end() - 1, "Unexpected character.")
+
+        buffer.append(TT.EOF, len(self.__source), len(self.__source))
+        return buffer
+
+    def __matches(self) -> Iterator["re.Match[str] | int"]:
+        # The matches of the pattern, except that an identifier is cut before
+        # the first character Scanner does not allow in one. The offset of
+        # that character is given instead, and matching goes on after it.
+        position = self.__start
+        while True:
+            for match in self.__PATTERN.finditer(self.__source, position):
+                identifier = match.group(1)
+                if identifier is None or identifier.isascii():
+                    yield match
+                    continue
+                length = _identifier_length(identifier)
+                if length == len(identifier):
+                    yield match
+                    continue
+
+                position = match.start(1) + length
+                if length > 0:
+                    prefix = self.__PATTERN.match(
+                        self.__source, match.start(), position
+                    )
+                    assert prefix is not None
+                    yield prefix
+                yield position
+                position += 1
+                break
+            else:
+                return
+
+    def __error(self, offset: int, message: str) -> None:
+        LoxError.scan_error(
+            self.__lines.line(offset), message, self.__lines.column(offset)
+        )
@@ -0,0 +1,96 @@
+import random
+from typing import Any
+
+import pytest
+from lox_error import LoxError
+from lox_regex_scanner import RegexScanner
+from lox_scanner import Scanner
+from lox_token import Token
+
+
+def summarize(tokens: list[Token]) -> list[tuple[Any, ...]]:
+    return [(t.token_type, t.lexeme, t.literal, t.line, t.offset) for t in tokens]
+
+
+def assert_same_scan(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    LoxError.had_error = False
+    expected = summarize(Scanner(source).scanTokens())
+    expected_err = capfd.readouterr().err
+    expected_had_error = LoxError.had_error
+    LoxError.had_error = False
+
+    actual = summarize(RegexScanner(source).scanTokens())
+    actual_err = capfd.readouterr().err
+
+    assert actual == expected
+    assert actual_err == expected_err
+    assert LoxError.had_error is expected_had_error
+
+
+sources = [
+    "",
+    " \t\r\n",
+    "(){},.-+;*!!====<<=>>=/",
+    "var a = 1; print a + 2.5 * (3 - .4) / 5.;",
+    "fun add(a, b) {\n  return a + b;\n}\nprint add(1, 2);",
+    "// comment only",
+    "print 1; // trailing comment\nprint 2;",
+    "a/b//c\n/d",
+    '"abc"',
+    '"multi\nline\nstring" print x;',
+    '""',
+    '"unterminated\nstring',
+    '"',
+    "@ # $ ^ : ? \\ ~ `",
+    "and class else false for fun if nil or print return super this true var while",
+    "andy classy _ _a a_1 x123 fortune",
+    "123abc 1.2.3 1..2",
+    "üñíçødé = 1; print üñíçødé;",
+    "½ a½b ½1.5 x٣ ٣",
+    'a\n\n\nb\n@\n"x\ny" c',
+    "0 00 007 1.0 1.50",
+]
+
+
+@pytest.mark.parametrize("source", sources)
+def test_same_as_scanner(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    assert_same_scan(source, capfd)
+
+
+def test_same_as_scanner_random(capfd: pytest.CaptureFixture[str]) -> None:
+    alphabet = [
+        *'(){},.-+;*!=<>/ \t\r\n"_@:',
+        "//",
+        "and",
+        "for",
+        "var",
+        "x",
+        "y1",
+        "0",
+        "42",
+        "3.14",
+        "é",
+        "½",
+    ]
+    rng = random.Random(1)
+    for _ in range(300):
+        source = "".join(rng.choice(alphabet) for _ in range(rng.randrange(40)))
+        assert_same_scan(source, capfd)
+
+
+@pytest.mark.parametrize("source", sources)
+def test_buffer_same_as_token_list(
+    source: str, capfd: pytest.CaptureFixture[str]
+) -> None:
+    expected = summarize(RegexScanner(source).scanTokens())
+    expected_err = capfd.readouterr().err
+
+    buffer = RegexScanner(source).scan_buffer()
+    assert capfd.readouterr().err == expected_err
+    assert summarize(list(buffer)) == expected
+    assert len(buffer) == len(expected)
+    for i, (token_type, lexeme, literal, line, _) in enumerate(expected):
+        assert buffer.token_type(i) == token_type
+        assert buffer.lexeme(i) == lexeme
+        assert buffer.literal(i) == literal
+        assert buffer.line(i) == line
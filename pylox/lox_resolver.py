@@ -1,80 +1,141 @@
 from enum import Enum
+from typing import Optional
 from lox_error import LoxError
 from lox_token import Token
 import lox_expr as EXPR
 import lox_stmt as STMT
-from lox_interpreter import Interpreter
 
 FunctionType = Enum("FunctionType", ["NONE", "FUNCTION"])
 
 
 class Resolver(EXPR.Visitor[None], STMT.Visitor[None]):
-    def __init__(self, interpreter: Interpreter) -> None:
-        self.__interpreter = interpreter
-        self.__scopes: list[dict[str, bool]] = []
+    def __init__(self) -> None:
+        # The depth of each variable is stored on its node.
+        self.__scopes: list[dict[int, bool]] = []
         self.__currentFunction = FunctionType.NONE
+        # Errors kept back between hold_errors() and release_errors().
+        self.__held_errors: Optional[list[tuple[Token, str]]] = None
 
-    def __begin_scope(self):
+    # The parser calls the public methods below when it resolves names while
+    # parsing. Names in an expression are resolved when the whole expression
+    # has been parsed, since only then is it known which are assigned to.
+
+    def hold_errors(self) -> None:
+        self.__held_errors = []
+
+    def release_errors(self, report: bool) -> None:
+        held, self.__held_errors = self.__held_errors or [], None
+        if report:
+            for token, message in held:
+                LoxError.parse_error(token, message)
+
+    def begin_scope(self) -> None:
         self.__scopes.append({})
 
-    def __end_scope(self):
+    def end_scope(self) -> None:
         self.__scopes.pop()
 
-    def __declare(self, name: Token):
+    def declare(self, name: Token) -> None:
         if len(self.__scopes) == 0:
             return
         scope = self.__scopes[-1]
-        if name.lexeme in scope:
-            LoxError.parse_error(
-                name, "Already a variable with this name in this scope."
-            )
-        scope[name.lexeme] = False
+        if name.symbol in scope:
+            self.__error(name, "Already a variable with this name in this scope.")
+        scope[name.symbol] = False
 
-    def __define(self, name: Token):
+    def define(self, name: Token) -> None:
         if len(self.__scopes) == 0:
             return
-        self.__scopes[-1][name.lexeme] = True
+        self.__scopes[-1][name.symbol] = True
+
+    def begin_function(self, type: FunctionType, params: list[Token]) -> FunctionType:
+        enclosingFunction = self.__currentFunction
+        self.__currentFunction = type
+
+        self.begin_scope()
+        for param in params:
+            self.declare(param)
+            self.define(param)
+        return enclosingFunction
+
+    def end_function(self, enclosingFunction: FunctionType) -> None:
+        self.end_scope()
+        self.__currentFunction = enclosingFunction
+
+    def check_return(self, keyword: Token) -> None:
+        if self.__currentFunction == FunctionType.NONE:
+            self.__error(keyword, "Can't return from top-level code.")
+
+    def resolve_name(self, expr: EXPR.Variable | EXPR.Assign) -> None:
+        if isinstance(expr, EXPR.Variable):
+            self.visit_variable_expr(expr)
+        else:
+            self.__resolve_local(expr, expr.name)
 
-    def __resolve_local(self, expr: EXPR.Expr, name: Token):
+    def __error(self, token: Token, message: str) -> None:
+        if self.__held_errors is not None:
+            self.__held_errors.append((token, message))
+        else:
+            LoxError.parse_error(token, message)
+
+    def __resolve_local(self, expr: EXPR.Variable | EXPR.Assign, name: Token):
         for i in reversed(range(len(self.__scopes))):
-            if name.lexeme in self.__scopes[i]:
-                self.__interpreter.resolve(expr, len(self.__scopes) - 1 - i)
+            if name.symbol in self.__scopes[i]:
+                expr.depth = len(self.__scopes) - 1 - i
                 return
+        expr.depth = -1
 
     def __resolve_expression(self, expr: EXPR.Expr) -> None:
-        expr.accept(self)
+        self.expr_visitors[type(expr)](self, expr)
 
     def __resolve_statement(self, stmt: STMT.Stmt) -> None:
-        stmt.accept(self)
+        self.stmt_visitors[type(stmt)](self, stmt)
 
     def resolve_statements(self, statements: list[STMT.Stmt]) -> None:
         for statement in statements:
             self.__resolve_statement(statement)
 
-    def __resolve_function(self, function: STMT.Function, type: FunctionType) -> None:
-        enclosingFunction = self.__currentFunction
-        self.__currentFunction = type
+    def resolve_body(
+        self, function: STMT.Function, scopes: list[dict[int, bool]]
+    ) -> None:
+        # A lazily parsed body, resolved in the scopes around its declaration.
+        self.__scopes = scopes
+        self.__resolve_function(function, FunctionType.FUNCTION)
 
-        self.__begin_scope()
-        for param in function.params:
-            self.__declare(param)
-            self.__define(param)
+    def __resolve_function(self, function: STMT.Function, type: FunctionType) -> None:
+        enclosingFunction = self.begin_function(type, function.params)
         self.resolve_statements(function.body)
-        self.__end_scope()
-        self.__currentFunction = enclosingFunction
+        self.end_function(enclosingFunction)
 
     def visit_block_stmt(self, stmt: STMT.Block) -> None:
-        self.__begin_scope()
+        self.begin_scope()
         self.resolve_statements(stmt.statements)
-        self.__end_scope()
+        self.end_scope()
 
     def visit_expression_stmt(self, stmt: STMT.Expression) -> None:
         self.__resolve_expression(stmt.expression)
 
+    def visit_for_stmt(self, stmt: STMT.For) -> None:
+        if stmt.initializer is not None:
+            self.begin_scope()
+            self.__resolve_statement(stmt.initializer)
+        if stmt.condition is not None:
+            self.__resolve_expression(stmt.condition)
+        if stmt.increment is not None:
+            self.__resolve_expression(stmt.increment)
+        self.__resolve_statement(stmt.body)
+        if stmt.initializer is not None:
+            self.end_scope()
+
     def visit_function_stmt(self, stmt: STMT.Function) -> None:
-        self.__declare(stmt.name)
-        self.__define(stmt.name)
+        self.declare(stmt.name)
+        self.define(stmt.name)
 
+        if stmt.tokens is not None:
+            # Not parsed yet. Declarations that come later must stay invisible
+            # to the body, so the scopes are copied.
+            stmt.scopes = [scope.copy() for scope in self.__scopes]
+            return
         self.__resolve_function(stmt, FunctionType.FUNCTION)
 
     def visit_if_stmt(self, stmt: STMT.If) -> None:
@@ -87,16 +148,15 @@ class Resolver(EXPR.Visitor[None], STMT.Visitor[None]):
         self.__resolve_expression(stmt.expression)
 
     def visit_return_stmt(self, stmt: STMT.Return) -> None:
-        if self.__currentFunction == FunctionType.NONE:
-            LoxError.parse_error(stmt.keyword, "Can't return from top-level code.")
+        self.check_return(stmt.keyword)
         if stmt.value is not None:
             self.__resolve_expression(stmt.value)
 
     def visit_var_stmt(self, stmt: STMT.Var) -> None:
-        self.__declare(stmt.name)
+        self.declare(stmt.name)
         if stmt.initializer != None:
             self.__resolve_expression(stmt.initializer)
-        self.__define(stmt.name)
+        self.define(stmt.name)
 
     def visit_while_stmt(self, stmt: STMT.While) -> None:
         self.__resolve_expression(stmt.condition)
@@ -119,6 +179,11 @@ class Resolver(EXPR.Visitor[None], STMT.Visitor[None]):
     def visit_grouping_expr(self, expr: EXPR.Grouping) -> None:
         self.__resolve_expression(expr.expression)
 
+    def visit_inline_expr(self, expr: EXPR.Inline) -> None:
+        # The depths in body were set by the inliner; resolving them again
+        # here would bind the globals it reads to locals of the same name.
+        self.__resolve_expression(expr.call)
+
     def visit_literal_expr(self, expr: EXPR.Literal) -> None:
         pass
 
@@ -129,12 +194,10 @@ class Resolver(EXPR.Visitor[None], STMT.Visitor[None]):
     def visit_variable_expr(self, expr: EXPR.Variable) -> None:
         if (
             not len(self.__scopes) == 0
-            and expr.name.lexeme in self.__scopes[-1]
-            and self.__scopes[-1][expr.name.lexeme] == False
+            and expr.name.symbol in self.__scopes[-1]
+            and self.__scopes[-1][expr.name.symbol] == False
         ):
-            LoxError.parse_error(
-                expr.name, "Can't read local variable in its own initializer."
-            )
+            self.__error(expr.name, "Can't read local variable in its own initializer.")
 
         self.__resolve_local(expr, expr.name)
 
@@ -0,0 +1,104 @@
+import random
+from typing import Any, cast
+
+import pytest
+from lox_error import LoxError
+from lox_ast_printer import AstPrinter
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+import lox_expr as EXPR
+import lox_stmt as STMT
+import lox_interpreter_test
+import lox_parser_test
+
+
+def summarize(statements: list[STMT.Stmt]) -> list[tuple[Any, ...]]:
+    # The offset, kind and depth of every resolved local variable.
+    found: list[tuple[Any, ...]] = []
+    stack: list[Any] = list(statements)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (EXPR.Variable, EXPR.Assign)) and node.depth >= 0:
+            found.append((node.name.offset, type(node).__name__, node.depth))
+        for slot in node.__slots__:
+            value: Any = getattr(node, slot)
+            children = cast(list[Any], value) if isinstance(value, list) else [value]
+            for child in children:
+                if isinstance(child, (EXPR.Expr, STMT.Stmt)):
+                    stack.append(child)
+    return sorted(found)
+
+
+def assert_same_as_two_passes(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    LoxError.had_error = False
+    resolver = Resolver()
+    statements = Parser(RegexScanner(source).iter_tokens()).parse()
+    if not LoxError.had_error:
+        resolver.resolve_statements(statements)
+    expected = AstPrinter().print(statements), summarize(statements)
+    expected_err = capfd.readouterr().err
+    expected_had_error = LoxError.had_error
+    LoxError.had_error = False
+
+    resolver = Resolver()
+    statements = Parser(RegexScanner(source).iter_tokens(), resolver=resolver).parse()
+    assert capfd.readouterr().err == expected_err
+    assert LoxError.had_error is expected_had_error
+    # After a syntax error the depths may differ and are not compared.
+    if LoxError.had_error:
+        assert AstPrinter().print(statements) == expected[0]
+    else:
+        assert (AstPrinter().print(statements), summarize(statements)) == expected
+
+
+sources = [statement[0] for statement in lox_parser_test.statements] + [
+    statement[0] for statement in lox_interpreter_test.statements
+]
+
+sources += [
+    "{ var a = 1; var a = 2; }",
+    "{ var a = a; }",
+    "return 1;",
+    "fun f(a, a) { return a; }",
+    "fun f() { var b = 1; { var b = b; } return; } return;",
+    "{ var a = 1; fun a() {} }",
+    "var a = 1; { var b = 2; { a = b = a + b; print a; } }",
+    "{ var i = 0; for (i = 1; i < 3; i = i + 1) { var i = i; print i; } }",
+    "for (var i = 0; i < 3; i = i + 1) { var j = i; print j; }",
+    "for (var i = 0; i < 3;) print i; for (; false; ) {}",
+    "{ var i = 0; for (; i < 3; i = i + 1) print i; }",
+    "fun f() { return; } { var x; return x; } (a) = 1;",
+    "{ var a = 1; print a; print (; var a = 2; }",
+]
+
+
+@pytest.mark.parametrize("source", sources)
+def test_same_as_two_passes(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    assert_same_as_two_passes(source, capfd)
+
+
+def test_same_as_two_passes_random(capfd: pytest.CaptureFixture[str]) -> None:
+    pieces = ["{", "}", "(", ")", ";", "=", "+", ",", "a", "b", "1", "var a"]
+    pieces += ["var b", "fun", "return", "for", "if", "else", "while", "print"]
+    rng = random.Random(1)
+    for _ in range(2000):
+        source = " ".join(rng.choice(pieces) for _ in range(rng.randrange(30)))
+        assert_same_as_two_passes(source, capfd)
+
+
+def test_depth_on_nodes() -> None:
+    source = "var a; { var b; { a = b; } }"
+    statements = Parser(RegexScanner(source).iter_tokens(), resolver=Resolver()).parse()
+    (block,) = statements[1:]
+    assert isinstance(block, STMT.Block) and isinstance(block.statements[1], STMT.Block)
+    statement = block.statements[1].statements[0]
+    assert isinstance(statement, STMT.Expression)
+    assign = statement.expression
+    assert isinstance(assign, EXPR.Assign) and isinstance(assign.value, EXPR.Variable)
+    assert (assign.depth, assign.value.depth) == (-1, 1)
+
+    # Resolving again overwrites what an earlier resolution left.
+    assign.depth = 0
+    Resolver().resolve_statements(statements)
+    assert (assign.depth, assign.value.depth) == (-1, 1)
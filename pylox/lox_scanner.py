@@ -1,35 +1,18 @@
 from typing import Any
 
 from lox_error import LoxError
-from lox_token import Token, TokenType as TT
+from lox_line_index import LineIndex
+from lox_token import KEYWORDS, Token, TokenType as TT
 
 
 class Scanner:
-    __KEYWORDS = {
-        "and": TT.AND,
-        "class": TT.CLASS,
-        "else": TT.ELSE,
-        "false": TT.FALSE,
-        "for": TT.FOR,
-        "fun": TT.FUN,
-        "if": TT.IF,
-        "nil": TT.NIL,
-        "or": TT.OR,
-        "print": TT.PRINT,
-        "return": TT.RETURN,
-        "super": TT.SUPER,
-        "this": TT.THIS,
-        "true": TT.TRUE,
-        "var": TT.VAR,
-        "while": TT.WHILE,
-    }
-
     def __init__(self, source: str) -> None:
         self.__source = source
         self.__tokens: list[Token] = []
         self.__start = 0
         self.__current = 0
         self.__line = 1
+        self.__lines = LineIndex(source)
 
     def scanTokens(self) -> list[Token]:
         while not self.__is_at_end():
@@ -37,7 +20,7 @@ class Scanner:
             self.__start = self.__current
             self.__scanToken()
 
-        self.__tokens.append(Token(TT.EOF, "", None, self.__line))
+        self.__tokens.append(Token(TT.EOF, "", None, self.__line, self.__current, self.__lines))
         return self.__tokens
 
     def __scanToken(self) -> None:
@@ -89,16 +72,18 @@ class Scanner:
         elif self.__is_alpha(c):
             self.__identifier()
         else:
-            LoxError.scan_error(self.__line, "Unexpected character.")
+            LoxError.scan_error(
+                self.__line,
+                "Unexpected character.",
+                self.__lines.column(self.__start),
+            )
 
     def __identifier(self) -> None:
         while self.__is_alpha_numeric(self.__peek()):
             self.__advance()
 
         text = self.__source[self.__start : self.__current]
-        self.__add_token(
-            self.__KEYWORDS[text] if text in self.__KEYWORDS else TT.IDENTIFIER
-        )
+        self.__add_token(KEYWORDS[text] if text in KEYWORDS else TT.IDENTIFIER)
 
     def __number(self) -> None:
         while self.__peek().isdigit():
@@ -121,7 +106,11 @@ class Scanner:
             self.__advance()
 
         if self.__is_at_end():
-            LoxError.scan_error(self.__line, "Unterminated string.")
+            LoxError.scan_error(
+                self.__line,
+                "Unterminated string.",
+                self.__lines.column(self.__current),
+            )
             return
 
         # The closing ".
@@ -168,4 +157,6 @@ class Scanner:
 
     def __add_token(self, token_type: TT, literal: Any = None) -> None:
         text = self.__source[self.__start : self.__current]
-        self.__tokens.append(Token(token_type, text, literal, self.__line))
+        self.__tokens.append(
+            Token(token_type, text, literal, self.__line, self.__start, self.__lines)
+        )
@@ -1,5 +1,5 @@
 import sys
-from typing import Any, Generator
+from typing import Any
 
 import pytest
 from lox_error import LoxError
@@ -7,12 +7,6 @@ from lox_scanner import Scanner
 from lox_token import TokenType as TT
 
 
-@pytest.fixture(autouse=True)
-def clear_error() -> Generator[None, None, None]:
-    yield
-    LoxError.had_error = False
-
-
 def test_null_source() -> None:
     tokens = Scanner("").scanTokens()
     assert LoxError.had_error is False
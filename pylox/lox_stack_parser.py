@@ -0,0 +1,367 @@
+from typing import Any, Callable, Generator, Iterable, Optional, TypeVar
+
+from lox_error import LoxError
+from lox_parser import ParseError, Precedence
+from lox_token import Token, TokenType as TT
+import lox_expr as EXPR
+import lox_stmt as STMT
+
+T = TypeVar("T")
+
+# A grammar rule that yields the rules it depends on and gets their results
+# back, instead of calling them.
+Rule = Generator["Rule[Any]", Any, T]
+
+
+class StackParser:
+    # Same grammar, trees and errors as Parser, but nesting is kept on an
+    # explicit stack of suspended rules rather than on Python's call stack, so
+    # the depth of the input is limited by memory only.
+    def __init__(self, tokens: Iterable[Token]) -> None:
+        self.__tokens = iter(tokens)
+        self.__current_token = next(self.__tokens)
+        self.__previous_token = self.__current_token
+
+    def parse(self) -> list[STMT.Stmt]:
+        statements: list[STMT.Stmt] = []
+        while not self.__is_at_end():
+            statement = self.__run(self.__declaration())
+            if statement is not None:
+                statements.append(statement)
+        return statements
+
+    def __run(self, rule: Rule[T]) -> T:
+        # Resume the innermost rule with the result of the rule it waited for,
+        # or throw the error that rule raised into it.
+        stack: list[Rule[Any]] = [rule]
+        value: Any = None
+        error: Optional[ParseError] = None
+        while True:
+            top = stack[-1]
+            try:
+                if error is None:
+                    request = top.send(value)
+                else:
+                    thrown, error = error, None
+                    request = top.throw(thrown)
+            except StopIteration as stop:
+                stack.pop()
+                if not stack:
+                    return stop.value
+                value = stop.value
+                continue
+            except ParseError as e:
+                stack.pop()
+                if not stack:
+                    raise
+                error = e
+                continue
+            stack.append(request)
+            value = None
+
+    def __declaration(self) -> Rule[Optional[STMT.Stmt]]:
+        try:
+            if self.__match(TT.FUN):
+                return (yield self.__function("function"))
+            if self.__match(TT.VAR):
+                return (yield self.__var_declaration())
+
+            return (yield self.__statement())
+        except ParseError:
+            self.__syncronize()
+            return None
+
+    def __statement(self) -> Rule[STMT.Stmt]:
+        if self.__match(TT.FOR):
+            return (yield self.__for_statement())
+        if self.__match(TT.IF):
+            return (yield self.__if_statement())
+        if self.__match(TT.PRINT):
+            return (yield self.__print_statement())
+        if self.__match(TT.RETURN):
+            return (yield self.__return_statement())
+        if self.__match(TT.WHILE):
+            return (yield self.__while_statement())
+        if self.__match(TT.LEFT_BRACE):
+            return STMT.Block((yield self.__block()))
+
+        return (yield self.__expression_statement())
+
+    def __for_statement(self) -> Rule[STMT.Stmt]:
+        self.__consume(TT.LEFT_PAREN, "Expect '(' after 'for'.")
+
+        initializer: Optional[STMT.Stmt]
+        if self.__match(TT.SEMICOLON):
+            initializer = None
+        elif self.__match(TT.VAR):
+            initializer = yield self.__var_declaration()
+        else:
+            initializer = yield self.__expression_statement()
+
+        condition = None
+        if not self.__check(TT.SEMICOLON):
+            condition = yield self.__expression()
+        self.__consume(TT.SEMICOLON, "Expect ';' after loop condition.")
+
+        increment = None
+        if not self.__check(TT.RIGHT_PAREN):
+            increment = yield self.__expression()
+        self.__consume(TT.RIGHT_PAREN, "Expect ')' after for clauses.")
+
+        body = yield self.__statement()
+        return STMT.For(initializer, condition, increment, body)
+
+    def __if_statement(self) -> Rule[STMT.Stmt]:
+        self.__consume(TT.LEFT_PAREN, "Expect '(' after 'if'.")
+        condition = yield self.__expression()
+        self.__consume(TT.RIGHT_PAREN, "Expect ')' after if condition.")
+
+        then_branch = yield self.__statement()
+        else_branch = None
+        if self.__match(TT.ELSE):
+            else_branch = yield self.__statement()
+
+        return STMT.If(condition, then_branch, else_branch)
+
+    def __print_statement(self) -> Rule[STMT.Stmt]:
+        value = yield self.__expression()
+        self.__consume(TT.SEMICOLON, "Expect ';' after value.")
+        return STMT.Print(value)
+
+    def __return_statement(self) -> Rule[STMT.Stmt]:
+        keyword = self.__previous()
+        value = None
+        if not self.__check(TT.SEMICOLON):
+            value = yield self.__expression()
+
+        self.__consume(TT.SEMICOLON, "Expect ';' after return value.")
+        return STMT.Return(keyword, value)
+
+    def __var_declaration(self) -> Rule[STMT.Stmt]:
+        name = self.__consume(TT.IDENTIFIER, "Expect variable name.")
+
+        initializer = None
+        if self.__match(TT.EQUAL):
+            initializer = yield self.__expression()
+
+        self.__consume(TT.SEMICOLON, "Expect ';' after variable declaration.")
+        return STMT.Var(name, initializer)
+
+    def __while_statement(self) -> Rule[STMT.Stmt]:
+        self.__consume(TT.LEFT_PAREN, "Expect '(' after 'while'.")
+        condition = yield self.__expression()
+        self.__consume(TT.RIGHT_PAREN, "Expect ')' after condition.")
+        body = yield self.__statement()
+
+        return STMT.While(condition, body)
+
+    def __expression_statement(self) -> Rule[STMT.Stmt]:
+        expr = yield self.__expression()
+        self.__consume(TT.SEMICOLON, "Expect ';' after expression.")
+        return STMT.Expression(expr)
+
+    def __function(self, kind: str) -> Rule[STMT.Function]:
+        name = self.__consume(TT.IDENTIFIER, "Expect " + kind + " name.")
+        self.__consume(TT.LEFT_PAREN, "Expect '(' after " + kind + " name.")
+        parameters: list[Token] = []
+        if not self.__check(TT.RIGHT_PAREN):
+            while True:
+                if len(parameters) >= 255:
+                    self.__error(self.__peek(), "Can't have more than 255 prameters.")
+
+                parameters.append(
+                    self.__consume(TT.IDENTIFIER, "Expect parameter name.")
+                )
+                if not self.__match(TT.COMMA):
+                    break
+        self.__consume(TT.RIGHT_PAREN, "Expect ')' after parameters.")
+
+        self.__consume(TT.LEFT_BRACE, "Expect '{' before " + kind + " body.")
+        body = yield self.__block()
+        return STMT.Function(name, parameters, body)
+
+    def __block(self) -> Rule[list[STMT.Stmt]]:
+        statements: list[STMT.Stmt] = []
+
+        while not self.__check(TT.RIGHT_BRACE) and not self.__is_at_end():
+            statement = yield self.__declaration()
+            if statement is not None:
+                statements.append(statement)
+
+        self.__consume(TT.RIGHT_BRACE, "Expect '}' after block.")
+        return statements
+
+    def __expression(self) -> Rule[EXPR.Expr]:
+        return self.__parse_precedence(Precedence.ASSIGNMENT)
+
+    def __parse_precedence(self, precedence: int) -> Rule[EXPR.Expr]:
+        token = self.__current_token
+        atom = self.__ATOMS.get(token.token_type)
+        if atom is not None:
+            # Operands that contain no subexpression are built in place.
+            self.__advance()
+            expr = atom(self, token)
+        else:
+            prefix = self.__PREFIX.get(token.token_type)
+            if prefix is None:
+                raise self.__error(token, "Expect expression.")
+            self.__advance()
+            expr = yield prefix(self, token)
+
+        while True:
+            token = self.__current_token
+            rule = self.__INFIX.get(token.token_type)
+            if rule is None or rule[0] < precedence:
+                return expr
+            self.__advance()
+            expr = yield rule[1](self, expr, token)
+
+    def __assignment(self, target: EXPR.Expr, equals: Token) -> Rule[EXPR.Expr]:
+        # Right-associative.
+        value = yield self.__parse_precedence(Precedence.ASSIGNMENT)
+
+        if isinstance(target, EXPR.Variable):
+            name = target.name
+            return EXPR.Assign(name, value)
+
+        self.__error(equals, "Invalid assignment target.")
+        return target
+
+    def __logical(self, left: EXPR.Expr, operator: Token) -> Rule[EXPR.Expr]:
+        precedence = self.__INFIX[operator.token_type][0]
+        right = yield self.__parse_precedence(precedence + 1)
+        return EXPR.Logical(left, operator, right)
+
+    def __binary(self, left: EXPR.Expr, operator: Token) -> Rule[EXPR.Expr]:
+        precedence = self.__INFIX[operator.token_type][0]
+        right = yield self.__parse_precedence(precedence + 1)
+        return EXPR.Binary(left, operator, right)
+
+    def __unary(self, operator: Token) -> Rule[EXPR.Expr]:
+        right = yield self.__parse_precedence(Precedence.UNARY)
+        return EXPR.Unary(operator, right)
+
+    def __call(self, callee: EXPR.Expr, paren: Token) -> Rule[EXPR.Expr]:
+        arguments: list[EXPR.Expr] = []
+        if not self.__check(TT.RIGHT_PAREN):
+            while True:
+                if len(arguments) >= 255:
+                    self.__error(self.__peek(), "Can't have more than 255 arguments.")
+                arguments.append((yield self.__expression()))
+                if not self.__match(TT.COMMA):
+                    break
+
+        paren = self.__consume(TT.RIGHT_PAREN, "Expect ')' after arguments")
+        return EXPR.Call(callee, paren, arguments)
+
+    def __grouping(self, token: Token) -> Rule[EXPR.Expr]:
+        expr = yield self.__expression()
+        self.__consume(TT.RIGHT_PAREN, "Expect ')' after expression.")
+        return EXPR.Grouping(expr)
+
+    def __literal(self, token: Token) -> EXPR.Expr:
+        return EXPR.Literal(token.literal)
+
+    def __false(self, token: Token) -> EXPR.Expr:
+        return EXPR.Literal(False)
+
+    def __true(self, token: Token) -> EXPR.Expr:
+        return EXPR.Literal(True)
+
+    def __nil(self, token: Token) -> EXPR.Expr:
+        return EXPR.Literal(None)
+
+    def __variable(self, token: Token) -> EXPR.Expr:
+        return EXPR.Variable(token)
+
+    __ATOMS: dict[TT, Callable[["StackParser", Token], EXPR.Expr]] = {
+        TT.FALSE: __false,
+        TT.TRUE: __true,
+        TT.NIL: __nil,
+        TT.NUMBER: __literal,
+        TT.STRING: __literal,
+        TT.IDENTIFIER: __variable,
+    }
+
+    __PREFIX: dict[TT, Callable[["StackParser", Token], Rule[EXPR.Expr]]] = {
+        TT.LEFT_PAREN: __grouping,
+        TT.BANG: __unary,
+        TT.MINUS: __unary,
+    }
+
+    __INFIX: dict[
+        TT,
+        tuple[int, Callable[["StackParser", EXPR.Expr, Token], Rule[EXPR.Expr]]],
+    ] = {
+        TT.EQUAL: (Precedence.ASSIGNMENT, __assignment),
+        TT.OR: (Precedence.OR, __logical),
+        TT.AND: (Precedence.AND, __logical),
+        TT.BANG_EQUAL: (Precedence.EQUALITY, __binary),
+        TT.EQUAL_EQUAL: (Precedence.EQUALITY, __binary),
+        TT.GREATER: (Precedence.COMPARISON, __binary),
+        TT.GREATER_EQUAL: (Precedence.COMPARISON, __binary),
+        TT.LESS: (Precedence.COMPARISON, __binary),
+        TT.LESS_EQUAL: (Precedence.COMPARISON, __binary),
+        TT.MINUS: (Precedence.TERM, __binary),
+        TT.PLUS: (Precedence.TERM, __binary),
+        TT.SLASH: (Precedence.FACTOR, __binary),
+        TT.STAR: (Precedence.FACTOR, __binary),
+        TT.LEFT_PAREN: (Precedence.CALL, __call),
+    }
+
+    def __match(self, *token_types: TT) -> bool:
+        for tt in token_types:
+            if self.__check(tt):
+                self.__advance()
+                return True
+        return False
+
+    def __consume(self, token_type: TT, message: str) -> Token:
+        if self.__check(token_type):
+            return self.__advance()
+
+        raise self.__error(self.__peek(), message)
+
+    def __check(self, token_type: TT) -> bool:
+        if self.__is_at_end():
+            return False
+        return self.__peek().token_type == token_type
+
+    def __advance(self) -> Token:
+        if not self.__is_at_end():
+            self.__previous_token = self.__current_token
+            self.__current_token = next(self.__tokens)
+        return self.__previous_token
+
+    def __is_at_end(self) -> bool:
+        return self.__peek().token_type == TT.EOF
+
+    def __peek(self) -> Token:
+        return self.__current_token
+
+    def __previous(self) -> Token:
+        return self.__previous_token
+
+    def __error(self, token: Token, message: str) -> ParseError:
+        LoxError.parse_error(token, message)
+        return ParseError()
+
+    def __syncronize(self) -> None:
+        self.__advance()
+
+        while not self.__is_at_end():
+            if self.__previous().token_type == TT.SEMICOLON:
+                return
+            if self.__peek().token_type in (
+                TT.CLASS,
+                TT.FUN,
+                TT.VAR,
+                TT.FOR,
+                TT.IF,
+                TT.WHILE,
+                TT.PRINT,
+                TT.RETURN,
+            ):
+                return
+
+            self.__advance()
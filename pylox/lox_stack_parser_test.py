@@ -0,0 +1,80 @@
+import random
+
+import pytest
+from lox_error import LoxError
+from lox_ast_printer import AstPrinter
+from lox_regex_scanner import RegexScanner
+from lox_parser import Parser
+from lox_stack_parser import StackParser
+import lox_expr as EXPR
+import lox_stmt as STMT
+import lox_interpreter_test
+import lox_parser_test
+
+
+def assert_same_parse(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    LoxError.had_error = False
+    expected = AstPrinter().print(Parser(RegexScanner(source).iter_tokens()).parse())
+    expected_err = capfd.readouterr().err
+    expected_had_error = LoxError.had_error
+    LoxError.had_error = False
+
+    actual = AstPrinter().print(StackParser(RegexScanner(source).iter_tokens()).parse())
+    assert actual == expected
+    assert capfd.readouterr().err == expected_err
+    assert LoxError.had_error is expected_had_error
+
+
+sources = [statement[0] for statement in lox_parser_test.statements] + [
+    statement[0] for statement in lox_interpreter_test.statements
+]
+
+
+@pytest.mark.parametrize("source", sources)
+def test_same_as_parser(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    assert_same_parse(source, capfd)
+
+
+def test_same_as_parser_random(capfd: pytest.CaptureFixture[str]) -> None:
+    pieces = [*"(){},.-+;*!=<>/", "==", "a", "1", "var", "fun", "if", "else"]
+    pieces += ["while", "for", "print", "return", "and", "or", "nil", "true"]
+    rng = random.Random(1)
+    for _ in range(500):
+        source = " ".join(rng.choice(pieces) for _ in range(rng.randrange(30)))
+        assert_same_parse(source, capfd)
+
+
+def test_deep_grouping() -> None:
+    depth = 100_000
+    statements = StackParser(
+        RegexScanner("(" * depth + "1" + ")" * depth + ";").iter_tokens()
+    ).parse()
+
+    assert isinstance(statements[0], STMT.Expression)
+    expr = statements[0].expression
+    for _ in range(depth):
+        assert isinstance(expr, EXPR.Grouping)
+        expr = expr.expression
+    assert isinstance(expr, EXPR.Literal) and expr.value == 1.0
+
+
+def test_deep_else_if() -> None:
+    depth = 20_000
+    source = "if (a) print 0;" + " else if (a) print 1;" * depth
+    statements = StackParser(RegexScanner(source).iter_tokens()).parse()
+
+    stmt = statements[0]
+    for _ in range(depth):
+        assert isinstance(stmt, STMT.If)
+        assert stmt.else_branch is not None
+        stmt = stmt.else_branch
+    assert isinstance(stmt, STMT.If) and stmt.else_branch is None
+
+
+def test_deep_error() -> None:
+    depth = 20_000
+    source = "{" * depth + "-" * depth + ";" + "}" * depth + " print 1;"
+    statements = StackParser(RegexScanner(source).iter_tokens()).parse()
+    assert LoxError.had_error
+    # Recovery resumes inside the innermost block.
+    assert len(statements) == 2
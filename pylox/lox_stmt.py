@@ -1,6 +1,7 @@
+# Generated by tool/generate_ast.py. Do not edit.
+
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Generic, Optional, TypeVar
+from typing import Any, Callable, ClassVar, Generic, Optional, TypeVar
 
 from lox_token import Token
 from lox_expr import Expr
@@ -9,6 +10,24 @@ R = TypeVar("R")
 
 
 class Visitor(ABC, Generic[R]):
+    # The visit methods of each subclass by node class, so that
+    # self.stmt_visitors[type(node)](self, node) dispatches with a single call.
+    stmt_visitors: ClassVar[dict[type["Stmt"], Callable[[Any, Any], Any]]]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.stmt_visitors = {
+            Block: cls.visit_block_stmt,
+            Expression: cls.visit_expression_stmt,
+            For: cls.visit_for_stmt,
+            Function: cls.visit_function_stmt,
+            If: cls.visit_if_stmt,
+            Print: cls.visit_print_stmt,
+            Return: cls.visit_return_stmt,
+            Var: cls.visit_var_stmt,
+            While: cls.visit_while_stmt,
+        }
+
     @abstractmethod
     def visit_block_stmt(self, stmt: "Block") -> R:
         raise NotImplementedError()
@@ -17,13 +36,17 @@ class Visitor(ABC, Generic[R]):
     def visit_expression_stmt(self, stmt: "Expression") -> R:
         raise NotImplementedError()
 
+    @abstractmethod
+    def visit_for_stmt(self, stmt: "For") -> R:
+        raise NotImplementedError()
+
     @abstractmethod
     def visit_function_stmt(self, stmt: "Function") -> R:
         raise NotImplementedError()
 
     @abstractmethod
     def visit_if_stmt(self, stmt: "If") -> R:
-        raise NotImplementedError
+        raise NotImplementedError()
 
     @abstractmethod
     def visit_print_stmt(self, stmt: "Print") -> R:
@@ -43,77 +66,140 @@ class Visitor(ABC, Generic[R]):
 
 
 class Stmt:
+    __slots__: tuple[str, ...] = ()
+
     @abstractmethod
     def accept(self, visitor: Visitor[R]) -> R:
         raise NotImplementedError()
 
+    def __repr__(self) -> str:
+        fields = (repr(getattr(self, name)) for name in self.__slots__)
+        return f"{type(self).__name__}({', '.join(fields)})"
+
 
-@dataclass
 class Block(Stmt):
-    statements: list[Stmt]
+    __slots__ = ("statements",)
+
+    def __init__(self, statements: list[Stmt]) -> None:
+        self.statements = statements
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_block_stmt(self)
 
 
-@dataclass
 class Expression(Stmt):
-    expression: Expr
+    __slots__ = ("expression",)
+
+    def __init__(self, expression: Expr) -> None:
+        self.expression = expression
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_expression_stmt(self)
 
 
-@dataclass
+class For(Stmt):
+    # The initializer gets a scope of its own, shared by all the iterations.
+    # counted is set when the loop first runs, by the interpreter.
+    __slots__ = ("initializer", "condition", "increment", "body", "counted")
+
+    def __init__(
+        self,
+        initializer: Optional[Stmt],
+        condition: Optional[Expr],
+        increment: Optional[Expr],
+        body: Stmt,
+        counted: Optional[bool] = None,
+    ) -> None:
+        self.initializer = initializer
+        self.condition = condition
+        self.increment = increment
+        self.body = body
+        self.counted = counted
+
+    def accept(self, visitor: Visitor[R]) -> R:
+        return visitor.visit_for_stmt(self)
+
+
 class Function(Stmt):
-    name: Token
-    params: list[Token]
-    body: list[Stmt]
+    # In lazy mode, the body's tokens from '{' to '}' until the first call
+    # parses them into body.
+    # scopes are the resolver's scopes around the declaration, kept with
+    # the tokens to resolve the body in.
+    __slots__ = ("name", "params", "body", "tokens", "scopes")
+
+    def __init__(
+        self,
+        name: Token,
+        params: list[Token],
+        body: list[Stmt],
+        tokens: Optional[list[Token]] = None,
+        scopes: Optional[list[dict[int, bool]]] = None,
+    ) -> None:
+        self.name = name
+        self.params = params
+        self.body = body
+        self.tokens = tokens
+        self.scopes = scopes
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_function_stmt(self)
 
 
-@dataclass
 class If(Stmt):
-    condition: Expr
-    then_branch: Stmt
-    else_branch: Optional[Stmt]
+    __slots__ = ("condition", "then_branch", "else_branch")
+
+    def __init__(
+        self,
+        condition: Expr,
+        then_branch: Stmt,
+        else_branch: Optional[Stmt],
+    ) -> None:
+        self.condition = condition
+        self.then_branch = then_branch
+        self.else_branch = else_branch
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_if_stmt(self)
 
 
-@dataclass
 class Print(Stmt):
-    expression: Expr
+    __slots__ = ("expression",)
+
+    def __init__(self, expression: Expr) -> None:
+        self.expression = expression
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_print_stmt(self)
 
 
-@dataclass
 class Return(Stmt):
-    keyword: Token
-    value: Optional[Expr]
+    __slots__ = ("keyword", "value")
+
+    def __init__(self, keyword: Token, value: Optional[Expr]) -> None:
+        self.keyword = keyword
+        self.value = value
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_return_stmt(self)
 
 
-@dataclass
 class Var(Stmt):
-    name: Token
-    initializer: Optional[Expr]
+    __slots__ = ("name", "initializer")
+
+    def __init__(self, name: Token, initializer: Optional[Expr]) -> None:
+        self.name = name
+        self.initializer = initializer
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_var_stmt(self)
 
 
-@dataclass
 class While(Stmt):
-    condition: Expr
-    body: Stmt
+    __slots__ = ("condition", "body")
+
+    def __init__(self, condition: Expr, body: Stmt) -> None:
+        self.condition = condition
+        self.body = body
 
     def accept(self, visitor: Visitor[R]) -> R:
         return visitor.visit_while_stmt(self)
@@ -0,0 +1,62 @@
+import re
+from typing import Iterable, Iterator
+
+from lox_line_index import LineIndex
+from lox_regex_scanner import RegexScanner
+from lox_token import Token, TokenType as TT
+
+
+class StreamScanner:
+    # Scans lines as they are read, so that the first tokens are available
+    # before the rest of the input exists. Only string literals span lines; a
+    # line that ends inside one is scanned together with the lines that follow,
+    # up to the one that closes it. Each piece has its own line index, which is
+    # dropped with the piece's tokens.
+    __STRINGS = re.compile(r'"[^"]*"?|//[^\n]*')
+
+    def __init__(self, stream: Iterable[str]) -> None:
+        self.__stream = stream
+
+    def scanTokens(self) -> list[Token]:
+        return list(self.iter_tokens())
+
+    def iter_tokens(self) -> Iterator[Token]:
+        line = 1
+        piece = ""
+        # Where a string that is still open starts in piece, or -1.
+        string = -1
+        lines = LineIndex(piece)
+        end = 0
+
+        for text in self.__stream:
+            piece += text
+            string = self.__open_string(piece, max(string, 0))
+            if string >= 0:
+                continue
+            lines = LineIndex(piece, line)
+            yield from self.__scan(piece, lines)
+            line += piece.count("\n")
+            end, piece = len(piece), ""
+
+        if piece:
+            # The input ends inside a string.
+            lines = LineIndex(piece, line)
+            yield from self.__scan(piece, lines)
+            end = len(piece)
+        # At the end of the last piece, where a scanner given all the input
+        # would put it.
+        yield Token(TT.EOF, "", None, 0, end, lines)
+
+    def __scan(self, piece: str, lines: LineIndex) -> Iterator[Token]:
+        for token in RegexScanner(piece, 0, lines).iter_tokens():
+            if token.token_type == TT.EOF:
+                return
+            yield token
+
+    def __open_string(self, text: str, start: int) -> int:
+        string = -1
+        for match in self.__STRINGS.finditer(text, start):
+            lexeme = match.group()
+            if lexeme[0] == '"' and (len(lexeme) < 2 or lexeme[-1] != '"'):
+                string = match.start()
+        return string
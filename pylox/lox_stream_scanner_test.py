@@ -0,0 +1,55 @@
+import io
+from typing import Any, Iterator
+
+import pytest
+from lox_error import LoxError
+from lox_regex_scanner import RegexScanner
+from lox_stream_scanner import StreamScanner
+from lox_token import Token, TokenType as TT
+
+
+def summarize(tokens: list[Token]) -> list[tuple[Any, ...]]:
+    return [(t.token_type, t.lexeme, t.literal, t.line, t.column) for t in tokens]
+
+
+sources = [
+    "",
+    "\n",
+    "print 1;",
+    "print 1;\nprint 2;\n",
+    'var s = "a\nstring\nthat\nspans\nlines";\nprint s;\n',
+    '// "not a string\nprint 1;\n',
+    '"// not a comment\n";\nprint 2; "a" "b\n" "c\n\n";\n',
+    "print 1;\n@\nprint 2;\n",
+    'print 1;\n"unterminated\n\n',
+    'print "é";\nprint "é\né";',
+]
+
+
+@pytest.mark.parametrize("source", sources)
+def test_same_as_regex_scanner(source: str, capfd: pytest.CaptureFixture[str]) -> None:
+    expected = summarize(RegexScanner(source).scanTokens())
+    expected_err = capfd.readouterr().err
+    expected_had_error = LoxError.had_error
+    LoxError.had_error = False
+
+    actual = StreamScanner(io.StringIO(source)).scanTokens()
+    assert summarize(actual) == expected
+    assert capfd.readouterr().err == expected_err
+    assert LoxError.had_error is expected_had_error
+
+
+def test_tokens_before_end_of_input() -> None:
+    read: list[str] = []
+
+    def lines() -> Iterator[str]:
+        for line in ["print 1;\n", 'print "a\n', 'b";\n', "print 3;\n"]:
+            read.append(line)
+            yield line
+
+    tokens = StreamScanner(lines()).iter_tokens()
+    assert [next(tokens).lexeme for _ in range(3)] == ["print", "1", ";"]
+    assert len(read) == 1
+    assert [next(tokens).lexeme for _ in range(3)] == ["print", '"a\nb"', ";"]
+    assert len(read) == 3
+    assert [token.token_type for token in tokens][-1] == TT.EOF
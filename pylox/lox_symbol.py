@@ -0,0 +1,23 @@
+import sys
+
+
+class SymbolTable:
+    # Every identifier is interned once for the whole process. The interned
+    # string is shared by all tokens with that name, so environment lookups
+    # compare by identity, and the id is a small int for resolver scopes.
+    __ids: dict[str, int] = {}
+    __names: list[str] = []
+
+    @staticmethod
+    def intern(name: str) -> int:
+        symbol = SymbolTable.__ids.get(name)
+        if symbol is None:
+            symbol = len(SymbolTable.__names)
+            name = sys.intern(name)
+            SymbolTable.__ids[name] = symbol
+            SymbolTable.__names.append(name)
+        return symbol
+
+    @staticmethod
+    def name(symbol: int) -> str:
+        return SymbolTable.__names[symbol]
@@ -1,5 +1,8 @@
 from enum import Enum
-from typing import Any
+from typing import Any, Optional
+
+from lox_line_index import LineIndex
+from lox_symbol import SymbolTable
 
 TokenType = Enum(
     "TokenType",
@@ -50,15 +53,101 @@ TokenType = Enum(
     ],
 )
 
+KEYWORDS = {
+    "and": TokenType.AND,
+    "class": TokenType.CLASS,
+    "else": TokenType.ELSE,
+    "false": TokenType.FALSE,
+    "for": TokenType.FOR,
+    "fun": TokenType.FUN,
+    "if": TokenType.IF,
+    "nil": TokenType.NIL,
+    "or": TokenType.OR,
+    "print": TokenType.PRINT,
+    "return": TokenType.RETURN,
+    "super": TokenType.SUPER,
+    "this": TokenType.THIS,
+    "true": TokenType.TRUE,
+    "var": TokenType.VAR,
+    "while": TokenType.WHILE,
+}
+
+
+def _column(lexeme: str, lines: LineIndex, offset: int) -> int:
+    # A string that spans lines is reported on its last line, so the column is
+    # that of its closing quote.
+    last = lexeme.rfind("\n")
+    if last < 0:
+        return lines.column(offset)
+    return len(lexeme) - last - 1
+
 
 class Token:
+    __slots__ = (
+        "token_type",
+        "lexeme",
+        "literal",
+        "offset",
+        "symbol",
+        "__line",
+        "__lines",
+    )
+
     def __init__(
-        self, token_type: TokenType, lexeme: str, literal: Any, line: int
+        self,
+        token_type: TokenType,
+        lexeme: str,
+        literal: Any,
+        line: int,
+        offset: int = -1,
+        lines: Optional[LineIndex] = None,
     ) -> None:
         self.token_type = token_type
-        self.lexeme = lexeme
         self.literal = literal
-        self.line = line
+        # Position of the lexeme in the source, or -1 for synthesized tokens.
+        self.offset = offset
+        # Scanners pass line 0 and leave the line to the index.
+        self.__line = line
+        self.__lines = lines
+        if token_type == TokenType.IDENTIFIER:
+            self.symbol = SymbolTable.intern(lexeme)
+            self.lexeme = SymbolTable.name(self.symbol)
+        else:
+            self.symbol = -1
+            self.lexeme = lexeme
+
+    @property
+    def line(self) -> int:
+        if self.__line or self.__lines is None:
+            return self.__line
+        # Only strings span lines, and they are reported on their last line.
+        return self.__lines.line(self.offset) + self.lexeme.count("\n")
+
+    @property
+    def column(self) -> int:
+        # 0 if the token does not know where it came from.
+        if self.__lines is None or self.offset < 0:
+            return 0
+        return _column(self.lexeme, self.__lines, self.offset)
+
+    def locate(self, offset: int, lines: LineIndex) -> None:
+        self.offset = offset
+        self.__lines = lines
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Symbols are only meaningful within one process, so identifiers are
+        # interned again when a token is unpickled.
+        return (
+            Token,
+            (
+                self.token_type,
+                self.lexeme,
+                self.literal,
+                self.__line,
+                self.offset,
+                self.__lines,
+            ),
+        )
 
     def __str__(self) -> str:
         return f"{self.token_type} {self.lexeme} {self.literal}"
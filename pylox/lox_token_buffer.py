@@ -0,0 +1,95 @@
+from array import array
+from typing import Any, Iterator, Optional
+
+from lox_line_index import LineIndex
+from lox_token import Token, TokenType as TT
+
+# Type ids, start offsets and end offsets.
+Columns = tuple["array[int]", "array[int]", "array[int]"]
+
+
+class TokenBuffer:
+    # One token costs a type id and two source offsets in flat arrays. Lexemes
+    # and literals are sliced out of the source only when a token is
+    # materialized, and lines are looked up in the source's line index.
+    # Only the parallel scanner and parser build one: they pass whole token
+    # lists between processes. The serial path streams tokens from the
+    # scanner into the parser, which keeps only the few it looks at.
+    __TYPES = {tt.value: tt for tt in TT}
+
+    def __init__(
+        self, source: str, lines: Optional[LineIndex] = None, offset: int = 0
+    ) -> None:
+        self.__source = source
+        self.__lines = lines or LineIndex(source)
+        # Where source starts in the whole text, for a buffer over a slice of
+        # it. Offsets in the columns and in tokens are into the whole text.
+        self.__offset = offset
+        self.__types = array("B")
+        self.__starts = array("q")
+        self.__ends = array("q")
+
+    @property
+    def lines(self) -> LineIndex:
+        return self.__lines
+
+    def append(self, token_type: TT, start: int, end: int) -> None:
+        self.__types.append(token_type.value)
+        self.__starts.append(start)
+        self.__ends.append(end)
+
+    def columns(self) -> Columns:
+        return self.__types, self.__starts, self.__ends
+
+    def extend(self, columns: Columns) -> None:
+        types, starts, ends = columns
+        self.__types.extend(types)
+        self.__starts.extend(starts)
+        self.__ends.extend(ends)
+
+    def __len__(self) -> int:
+        return len(self.__types)
+
+    def __getitem__(self, index: int) -> Token:
+        token_type = self.token_type(index)
+        lexeme = self.lexeme(index)
+        literal = self.__literal(token_type, lexeme)
+        return Token(token_type, lexeme, literal, 0, self.__starts[index], self.__lines)
+
+    def __iter__(self) -> Iterator[Token]:
+        source, types, literal = self.__source, self.__TYPES, self.__literal
+        lines, base = self.__lines, self.__offset
+        for type_id, start, end in zip(self.__types, self.__starts, self.__ends):
+            token_type = types[type_id]
+            lexeme = source[start - base : end - base]
+            yield Token(
+                token_type, lexeme, literal(token_type, lexeme), 0, start, lines
+            )
+
+    def token_type(self, index: int) -> TT:
+        return self.__TYPES[self.__types[index]]
+
+    def lexeme(self, index: int) -> str:
+        base = self.__offset
+        return self.__source[self.__starts[index] - base : self.__ends[index] - base]
+
+    def literal(self, index: int) -> Any:
+        return self.__literal(self.token_type(index), self.lexeme(index))
+
+    def line(self, index: int) -> int:
+        # Only strings span lines, and they are reported on their last line.
+        return self.__lines.line(self.__starts[index]) + self.lexeme(index).count("\n")
+
+    def column(self, index: int) -> int:
+        # On the last line of a string, the column of its closing quote.
+        if "\n" in self.lexeme(index):
+            return self.__lines.column(self.__ends[index] - 1)
+        return self.__lines.column(self.__starts[index])
+
+    def __literal(self, token_type: TT, lexeme: str) -> Any:
+        if token_type == TT.NUMBER:
+            return float(lexeme)
+        if token_type == TT.STRING:
+            # Trim the surrounding quotes.
+            return lexeme[1:-1]
+        return None
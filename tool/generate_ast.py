@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# Writes lox_expr.py and lox_stmt.py, like jlox's GenerateAst.
+#
+#   python tool/generate_ast.py pylox
+
+import os
+import sys
+from typing import TextIO
+
+# Class name, then fields as "name: type", with "= default" on trailing ones.
+# Lines starting with "#" are comments placed before the class's fields.
+Schema = list[tuple[str, list[str]]]
+
+EXPR: Schema = [
+    (
+        "Assign",
+        [
+            "# Set by the resolver: how many scopes out the variable is, or -1 if",
+            "# it is global.",
+            "name: Token",
+            "value: Expr",
+            "depth: int = -1",
+        ],
+    ),
+    ("Binary", ["left: Expr", "operator: Token", "right: Expr"]),
+    ("Call", ["callee: Expr", "paren: Token", "arguments: list[Expr]"]),
+    ("Grouping", ["expression: Expr"]),
+    (
+        "Inline",
+        [
+            "# A call whose function's body was substituted by the inliner. body",
+            "# runs if the callee is still the function whose name token is",
+            "# declared; otherwise the call is made.",
+            "call: Call",
+            "declared: Token",
+            "body: Expr",
+        ],
+    ),
+    ("Literal", ["value: Any"]),
+    ("Logical", ["left: Expr", "operator: Token", "right: Expr"]),
+    ("Unary", ["operator: Token", "right: Expr"]),
+    (
+        "Variable",
+        ["# Set by the resolver, as for Assign.", "name: Token", "depth: int = -1"],
+    ),
+]
+
+STMT: Schema = [
+    ("Block", ["statements: list[Stmt]"]),
+    ("Expression", ["expression: Expr"]),
+    (
+        "For",
+        [
+            "# The initializer gets a scope of its own, shared by all the iterations.",
+            "initializer: Optional[Stmt]",
+            "condition: Optional[Expr]",
+            "increment: Optional[Expr]",
+            "body: Stmt",
+            "# counted is set when the loop first runs, by the interpreter.",
+            "counted: Optional[bool] = None",
+        ],
+    ),
+    (
+        "Function",
+        [
+            "name: Token",
+            "params: list[Token]",
+            "body: list[Stmt]",
+            "# In lazy mode, the body's tokens from '{' to '}' until the first call",
+            "# parses them into body.",
+            "tokens: Optional[list[Token]] = None",
+            "# scopes are the resolver's scopes around the declaration, kept with",
+            "# the tokens to resolve the body in.",
+            "scopes: Optional[list[dict[int, bool]]] = None",
+        ],
+    ),
+    ("If", ["condition: Expr", "then_branch: Stmt", "else_branch: Optional[Stmt]"]),
+    ("Print", ["expression: Expr"]),
+    ("Return", ["keyword: Token", "value: Optional[Expr]"]),
+    ("Var", ["name: Token", "initializer: Optional[Expr]"]),
+    ("While", ["condition: Expr", "body: Stmt"]),
+]
+
+
+def define_ast(f: TextIO, base: str, imports: list[str], schema: Schema) -> None:
+    suffix = base.lower()
+    table = f"{suffix}_visitors"
+
+    f.write("# Generated by tool/generate_ast.py. Do not edit.\n\n")
+    f.write("from abc import ABC, abstractmethod\n")
+    # Only the names the module uses.
+    names = ["Any", "Callable", "ClassVar", "Generic", "TypeVar"]
+    if any("Optional[" in line for _, lines in schema for line in lines):
+        names.insert(-1, "Optional")
+    f.write(f"from typing import {', '.join(names)}\n\n")
+    for line in imports:
+        f.write(line + "\n")
+    f.write('\nR = TypeVar("R")\n\n\n')
+
+    f.write("class Visitor(ABC, Generic[R]):\n")
+    f.write("    # The visit methods of each subclass by node class, so that\n")
+    f.write(
+        f"    # self.{table}[type(node)](self, node) dispatches with a single call.\n"
+    )
+    f.write(
+        f'    {table}: ClassVar[dict[type["{base}"], Callable[[Any, Any], Any]]]\n\n'
+    )
+    f.write("    def __init_subclass__(cls, **kwargs: Any) -> None:\n")
+    f.write("        super().__init_subclass__(**kwargs)\n")
+    f.write(f"        cls.{table} = {{\n")
+    for name, _ in schema:
+        f.write(f"            {name}: cls.visit_{name.lower()}_{suffix},\n")
+    f.write("        }\n")
+    for name, _ in schema:
+        f.write("\n    @abstractmethod\n")
+        f.write(
+            f'    def visit_{name.lower()}_{suffix}(self, {suffix}: "{name}") -> R:\n'
+        )
+        f.write("        raise NotImplementedError()\n")
+
+    f.write(f"\n\nclass {base}:\n")
+    f.write("    __slots__: tuple[str, ...] = ()\n\n")
+    f.write("    @abstractmethod\n")
+    f.write("    def accept(self, visitor: Visitor[R]) -> R:\n")
+    f.write("        raise NotImplementedError()\n\n")
+    f.write("    def __repr__(self) -> str:\n")
+    f.write("        fields = (repr(getattr(self, name)) for name in self.__slots__)\n")
+    f.write("        return f\"{type(self).__name__}({', '.join(fields)})\"\n")
+
+    for name, lines in schema:
+        define_type(f, base, name, lines)
+
+
+def define_type(f: TextIO, base: str, name: str, lines: list[str]) -> None:
+    comments = [line for line in lines if line.startswith("#")]
+    fields = [line for line in lines if not line.startswith("#")]
+    names = [field.split(":")[0] for field in fields]
+
+    f.write(f"\n\nclass {name}({base}):\n")
+    for comment in comments:
+        f.write(f"    {comment}\n")
+    slots = ", ".join(f'"{field_name}"' for field_name in names)
+    if len(names) == 1:
+        slots += ","
+    f.write(f"    __slots__ = ({slots})\n\n")
+
+    parameters = ", ".join(fields)
+    signature = f"    def __init__(self, {parameters}) -> None:\n"
+    if len(signature) > 89:
+        signature = "    def __init__(\n        self,\n"
+        signature += "".join(f"        {field},\n" for field in fields)
+        signature += "    ) -> None:\n"
+    f.write(signature)
+    for field_name in names:
+        f.write(f"        self.{field_name} = {field_name}\n")
+
+    f.write("\n    def accept(self, visitor: Visitor[R]) -> R:\n")
+    f.write(f"        return visitor.visit_{name.lower()}_{base.lower()}(self)\n")
+
+
+# File name, base class, imports and schema of each generated module.
+MODULES = [
+    ("lox_expr.py", "Expr", ["from lox_token import Token"], EXPR),
+    (
+        "lox_stmt.py",
+        "Stmt",
+        ["from lox_token import Token", "from lox_expr import Expr"],
+        STMT,
+    ),
+]
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: generate_ast.py <output directory>", file=sys.stderr)
+        sys.exit(64)
+
+    for file_name, base, imports, schema in MODULES:
+        with open(os.path.join(sys.argv[1], file_name), "w", encoding="utf-8") as f:
+            define_ast(f, base, imports, schema)